@@ -1,12 +1,38 @@
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from app.models.schemas import SearchRequest, SearchResponse
-from app.utils.llm import call_llm, summarize_with_llm
+from app.utils.llm import call_llm, summarize_with_llm, stream_summarize_with_llm
+import json
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+
+async def call_mcp_tool(mcp_manager, llm_response: dict):
+    """llm이 고른 mcp 툴 호출 (검색 결과 개수는 1~2개로 제한)"""
+    params = llm_response.get("params", {})
+
+    for key in ("count", "num"):
+        if key in params:
+            try:
+                params[key] = max(1, min(int(params[key]), 2))
+            except Exception:
+                params[key] = 1
+
+    mcp_result = await mcp_manager.call_tool(
+        llm_response["srvId"],
+        llm_response["method"],
+        params
+    )
+    logger.info(f"[search_endpoint] MCP 호출 결과: {str(mcp_result)[:200]}")
+    return mcp_result
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @router.post(
     "/",
     response_model=SearchResponse,
@@ -45,23 +71,8 @@ async def search_endpoint(
     elif llm_response.get("type") == "rpc":
         logger.info(f"[search_endpoint] MCP 호출: {llm_response}")
 
-        # mcp 서버의 툴 호출
-        params = llm_response.get("params", {})
-
-        for key in ("count", "num"):
-            if key in params:
-                try:
-                    params[key] = max(1, min(int(params[key]), 2))
-                except Exception:
-                    params[key] = 1
-
         # MCP 서버 툴 호출
-        mcp_result = await mcp_manager.call_tool(
-            llm_response["srvId"],
-            llm_response["method"],
-            params
-        )
-        logger.info(f"[search_endpoint] MCP 호출 결과: {str(mcp_result)[:200]}")
+        mcp_result = await call_mcp_tool(mcp_manager, llm_response)
 
         # mcp 서버 호출 결과 요약약
         summarized = await summarize_with_llm(mcp_result, prompt=body.query)
@@ -71,4 +82,57 @@ async def search_endpoint(
         return SearchResponse(answer=answer)
     else:
         logger.error("Invalid LLM response: %s", llm_response)
-        raise HTTPException(status_code=400, detail="Invalid LLM response")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail="Invalid LLM response")
+
+
+@router.post(
+    "/stream",
+    summary="검색 (스트리밍)",
+    description="검색 결과 요약을 생성되는 대로 SSE로 전송합니다.",
+    response_description="SSE 이벤트 (tool → token ... → done, 실패 시 error)"
+)
+async def search_stream_endpoint(
+    request: Request,
+    body: SearchRequest
+    ):
+    start = time.perf_counter()
+    query = body.query
+    logger.info(f"[search_stream_endpoint] 요청: query={query}")
+    mcp_manager = request.app.state.mcp_manager
+
+    async def event_stream():
+        answer = ""
+        try:
+            llm_response = await call_llm(query, mcp_manager.get_all_tools())
+            logger.info(f"[search_stream_endpoint] call_llm 결과: {llm_response}")
+
+            # llm이 바로 답한 경우 한 번에 전송
+            if llm_response.get("type") == "text":
+                answer = llm_response.get("content", "")
+                yield sse_event("token", {"text": answer})
+            elif llm_response.get("type") == "rpc":
+                yield sse_event("tool", {"srvId": llm_response["srvId"], "method": llm_response["method"]})
+                mcp_result = await call_mcp_tool(mcp_manager, llm_response)
+
+                # 요약은 생성되는 대로 조각 단위로 전송
+                async for text in stream_summarize_with_llm(mcp_result, prompt=query):
+                    answer += text
+                    yield sse_event("token", {"text": text})
+                answer = answer.strip()
+            else:
+                logger.error("Invalid LLM response: %s", llm_response)
+                yield sse_event("error", {"message": "Invalid LLM response", "status_code": 400})
+                return
+
+            elapsed = time.perf_counter() - start
+            logger.info(f"[search_stream_endpoint] 응답 완료, 소요 시간: {elapsed:.3f}초")
+            yield sse_event("done", {"answer": answer, "elapsed": round(elapsed, 3)})
+        except Exception as e:
+            logger.error(f"[search_stream_endpoint] 스트리밍 중 오류: {e}", exc_info=True)
+            yield sse_event("error", {"message": str(e), "status_code": 500})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -123,12 +123,8 @@ async def call_llm(query: str, tools_info: dict, settings=None) -> dict:
     }
 
 
-async def summarize_with_llm(rpc_result: dict, prompt: str = "", settings=None) -> dict:
-    """
-    MCP 툴 호출 결과를 OpenAI로 한글 자연어 요약
-    - rpc_result: MCP 서버에서 받은 raw 결과 (dict)
-    - prompt: 원래 사용자의 질문 (optional, 있으면 더 자연스럽게 요약 가능)
-    """
+def build_summary_messages(rpc_result: dict, prompt: str = "") -> list:
+    """MCP 툴 호출 결과 요약용 메시지 구성 (일반/스트리밍 요약 공용)"""
 
     # 1. rawResult 추출
     #   - rpc_result["content"]가 list면 type=text 인 것만 골라 text를 이어붙임
@@ -157,6 +153,16 @@ async def summarize_with_llm(rpc_result: dict, prompt: str = "", settings=None)
     if prompt:
         messages.append({"role": "user", "content": f"Original request:\n{prompt}"})
     messages.append({"role": "assistant", "content": f"Tool output:\n{rawResult}"})
+    return messages
+
+
+async def summarize_with_llm(rpc_result: dict, prompt: str = "", settings=None) -> dict:
+    """
+    MCP 툴 호출 결과를 OpenAI로 한글 자연어 요약
+    - rpc_result: MCP 서버에서 받은 raw 결과 (dict)
+    - prompt: 원래 사용자의 질문 (optional, 있으면 더 자연스럽게 요약 가능)
+    """
+    messages = build_summary_messages(rpc_result, prompt)
 
     # 3. OpenAI 요약 호출
     response = await client.chat.completions.create(
@@ -171,3 +177,15 @@ async def summarize_with_llm(rpc_result: dict, prompt: str = "", settings=None)
     return {"results": [{"description": friendly}]}
 
 
+async def stream_summarize_with_llm(rpc_result: dict, prompt: str = ""):
+    """MCP 툴 호출 결과 요약을 생성되는 대로 조각(str) 단위로 반환"""
+    stream = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=build_summary_messages(rpc_result, prompt),
+        max_tokens=1024,
+        temperature=0.4,
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
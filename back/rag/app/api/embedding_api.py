@@ -3,7 +3,8 @@
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from app.utils.embedding import get_text_embedding
+from app.utils.embedding import get_text_embedding_async, batcher, embedding_cache
+from app.utils.vector_store import index as vector_index
 
 router = APIRouter()
 
@@ -15,7 +16,19 @@ class TextRequest(BaseModel):
 @router.post("/embed")
 async def embed_text(request: TextRequest):
     try:
-        embedding = get_text_embedding(request.text)
+        embedding = await get_text_embedding_async(request.text)
         return JSONResponse(content={"embedding": embedding})
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
+
+
+@router.get("/embed/stats")
+async def embed_stats():
+    """임베딩 배치 처리 및 캐시 현황"""
+    return {"batcher": batcher.get_stats(), "cache": embedding_cache.get_stats()}
+
+
+@router.get("/vector/stats")
+async def vector_stats():
+    """벡터 저장소(Pinecone/로컬 복제본) 현황"""
+    return vector_index.get_stats()
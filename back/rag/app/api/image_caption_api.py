@@ -11,7 +11,7 @@ router = APIRouter()
 async def describe_image(file: UploadFile = File(...)):
     try:
         contents = await file.read()
-        caption = generate_image_caption(contents)
+        caption = await generate_image_caption(contents)
         return JSONResponse(content={"caption": caption})
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -1,156 +1,67 @@
 import logging
-import httpx
-import json
 from datetime import datetime
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from app.utils.image_classifier import classify_image_from_bytes
-from app.utils.image_captioner import generate_image_caption
-from app.utils.image_text_extractor import extract_text_from_image
-from app.utils.vector_store import save_text_to_pinecone
-from app.utils.schedule_parser import extract_schedule
+from fastapi.responses import JSONResponse
+from app.utils.upload_pipeline import IMAGE_TIME_FORMAT
+from app.utils.upload_job_queue import enqueue_upload_job, get_upload_job, upload_worker
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.post("/upload-image/")
+@router.post("/upload-image/", status_code=202)
 async def upload_image(
     user_id: str = Form(...),
     access_id: str = Form(...),
     image_time: str = Form(...),
     file: UploadFile = File(...),
 ):
-    try:
-        # logger.info(f"📥 이미지 처리 시작 - user_id={user_id}, access_id={access_id}")
-
-        # 문자열로 받은 image_time → datetime 변환
-        try:
-            image_time_obj = datetime.strptime(image_time, "%Y:%m:%d %H:%M:%S")
-        except ValueError as e:
-            logger.error(f"❌ image_time 파싱 실패: {e}")
-            raise HTTPException(
-                status_code=400,
-                detail="날짜 형식이 잘못되었습니다. (예: 2025:05:08 00:00:00)",
-            )
-
-        # logger.info(f"📥 이미지 업로드 시작 - user_id={user_id}, access_id={access_id}")
-
-        async with httpx.AsyncClient() as client:
-            # 중복 체크 요청
-            check_url = f"http://backend-service:8083/api/v1/images/check"
-            params = {"userId": user_id, "accessId": access_id}
-
-            check_response = await client.get(check_url, params=params)
-            # logger.info(f"🔍 중복 체크 응답: {check_response.status_code}")
-            # logger.debug(f"🔍 중복 체크 바디: {check_response.text}")
-
-            if check_response.status_code != 200:
-                raise HTTPException(status_code=500, detail="중복 확인 실패")
-
-            check_result = check_response.json().get("result", {})
-            if check_result.get("exist", False):
-                logger.warning(
-                    f"⚠️ 이미 존재하는 이미지입니다. 업로드 중단 - access_id={access_id}"
-                )
-                return {
-                    "access_id": access_id,
-                    "image_time": image_time,
-                    "status": "skipped",
-                    "message": "이미 등록된 이미지입니다.",
-                }
-
-        image_bytes = await file.read()
-        text_score = classify_image_from_bytes(image_bytes)
-        # logger.info(f"🔍 이미지 분류 점수: {text_score:.3f} (access_id={access_id})")
-
-        if text_score <= 0.09:  # photo
-            caption = generate_image_caption(image_bytes)
-            ocr_text = extract_text_from_image(image_bytes)
-
-            target = "photo"
-
-            # 두 개의 텍스트를 하나로 결합 (개행으로 구분)
-            content = f"[Caption]\n{caption}\n\n[OCR]\n{ocr_text}".strip()
-
-            # logger.info(f"🖼️ 이미지 설명 생성 완료 - {caption}")
-            # logger.info(f"🔤 OCR 텍스트 추출 완료 - {ocr_text}")
-        else:
-            extracted_text = extract_text_from_image(image_bytes)
-            target = "info"
-            content = extracted_text
-            # logger.info(f"📝 텍스트 추출 완료 - {extracted_text}")
-
-        text_for_embedding = f"{access_id} ({image_time}): {content}"
-        namespace = save_text_to_pinecone(user_id, text_for_embedding, target)
-        # logger.info(f"✅ 벡터 저장 완료 - namespace={namespace}")
+    """
+    이미지 처리 작업을 대기열에 등록하고 바로 202 반환
 
-        image_payload = {
-            "userId": user_id,
-            "accessId": access_id,
-            "imageTime": image_time,
-            "type": target,
-            "content": content,
-        }
-
-        async with httpx.AsyncClient() as client:
-            # logger.info(f"📤 이미지 정보 전송 → payload: {image_payload}")
-            # logger.info(
-            #     f"📤 JSON:\n{json.dumps(image_payload, ensure_ascii=False, indent=2)}"
-            # )
-
-            image_response = await client.post(
-                "http://backend-service:8083/api/v1/images", json=image_payload
-            )
-            # logger.info(f"📥 이미지 응답 상태: {image_response.status_code}")
-            # logger.debug(f"📥 이미지 응답 내용: {image_response.text}")
-
-            if image_response.status_code != 200:
-                raise HTTPException(status_code=500, detail="이미지 정보 저장 실패")
-
-            image_id = image_response.json().get("result", {}).get("imageId")
-
-            if target == "info":
-                schedule_result = extract_schedule(content)
-                if schedule_result.get("is_schedule") and schedule_result.get(
-                    "datetime"
-                ):
-                    plan_payload = {
-                        "userId": user_id,
-                        "planTime": image_time,
-                        "planContent": schedule_result.get("event", content),
-                        "imageId": image_id,
-                    }
-
-                    # logger.info(f"📤 일정 등록 전송 → payload: {plan_payload}")
-                    # logger.info(
-                    #     f"📤 JSON:\n{json.dumps(plan_payload, ensure_ascii=False, indent=2)}"
-                    # )
+    분류/캡션/OCR/벡터 저장/백엔드 등록은 워커가 처리하며 진행 상황은 상태 조회 API로 확인
+    같은 (user_id, access_id)를 다시 올리면 기존 작업을 반환 (최종 실패한 작업만 다시 등록)
+    """
+    # 형식이 잘못된 요청은 재시도해도 실패하므로 등록 전에 거절
+    try:
+        datetime.strptime(image_time, IMAGE_TIME_FORMAT)
+    except ValueError as e:
+        logger.error(f"❌ image_time 파싱 실패: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail="날짜 형식이 잘못되었습니다. (예: 2025:05:08 00:00:00)",
+        )
+
+    image_bytes = await file.read()
+    job, created = await enqueue_upload_job(user_id, access_id, image_time, image_bytes)
+    if created:
+        logger.info(f"📥 업로드 작업 등록 - job_id={job.job_id}, access_id={access_id}")
+    else:
+        logger.info(f"♻️ 기존 업로드 작업 반환 - job_id={job.job_id}, status={job.status}")
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job.job_id,
+            "access_id": access_id,
+            "image_time": image_time,
+            "status": job.status,
+            "status_url": f"/rag/upload-image/jobs/{job.job_id}",
+        },
+    )
 
-                    plan_response = await client.post(
-                        "http://backend-service:8083/api/v1/plans", json=plan_payload
-                    )
 
-                    if plan_response.status_code != 200:
-                        logger.warning(f"⚠️ 일정 등록 실패: {plan_response.text}")
-                    else:
-                        logger.info(f"📅 일정 등록 완료: {plan_payload}")
+@router.get("/upload-image/jobs/{job_id}")
+async def get_upload_image_job(job_id: str):
+    """업로드 작업 상태 (queued / running / succeeded / failed) 및 처리 결과"""
+    job = await get_upload_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job.model_dump(mode="json")
 
-        return {
-            "access_id": access_id,
-            "image_time": image_time,
-            "type": target,
-            "namespace": namespace,
-            "content": text_for_embedding,
-            "image_id": image_id,
-            "status": "success",
-        }
 
-    except Exception as e:
-        logger.error(f"❌ 처리 중 오류 발생 (access_id={access_id}): {e}")
-        return {
-            "access_id": access_id,
-            "image_time": image_time,
-            "status": "error",
-            "message": str(e),
-        }
+@router.get("/upload-image/stats")
+async def upload_image_stats():
+    """업로드 워커 처리 지표와 상태별 작업 수"""
+    return await upload_worker.get_stats()
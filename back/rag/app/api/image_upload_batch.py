@@ -0,0 +1,119 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import List
+from app.core.config import INGEST_MAX_IN_FLIGHT
+from app.utils.ingest_pipeline import ingest_image_keyword, get_stage_stats
+from app.utils.geocoding import geocoder
+from app.utils.image_fingerprint_store import fingerprint_store
+from app.utils.vision_ocr import vision_ocr
+from app.utils.llm_gateway import llm_gateway
+import asyncio
+import json
+import time
+import logging
+import traceback
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _ingest_one(user_id: str, item: dict, file: UploadFile, in_flight: asyncio.Semaphore) -> dict:
+    """이미지 한 장 처리 (동시에 메모리에 올리는 이미지 수 제한)"""
+    access_id = str(item.get("access_id", ""))
+    start_time = time.time()
+    async with in_flight:
+        try:
+            image_bytes = await file.read()
+            return await ingest_image_keyword(
+                user_id,
+                access_id,
+                item.get("image_time", ""),
+                str(item.get("latitude", "")),
+                str(item.get("longitude", "")),
+                image_bytes,
+            )
+        except Exception as e:
+            logger.error(f"❌ 배치 이미지 처리 실패 (access_id={access_id}): {str(e)}")
+            traceback.print_exc()
+            return {
+                "user_id": user_id,
+                "access_id": access_id,
+                "status": "error",
+                "message": str(e) or repr(e),
+                "processing_time": f"{time.time() - start_time:.3f}초",
+            }
+
+
+@router.post("/upload-image-keyword/batch/")
+async def upload_image_keyword_batch(
+    request: Request,
+    user_id: str = Form(...),
+    metadata: str = Form(...),  # [{"access_id", "image_time", "latitude", "longitude"}, ...] (files 순서와 동일)
+    files: List[UploadFile] = File(...),
+):
+    """여러 이미지를 한 번에 수집하고 이미지별 결과를 NDJSON으로 스트리밍"""
+    try:
+        items = json.loads(metadata)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="metadata는 JSON 배열이어야 합니다.")
+
+    if not isinstance(items, list) or len(items) != len(files):
+        raise HTTPException(
+            status_code=400,
+            detail=f"metadata 항목 수와 파일 수가 다릅니다. (metadata={len(items) if isinstance(items, list) else 0}, files={len(files)})",
+        )
+
+    logger.info(f"📦 배치 업로드 시작 - user_id: {user_id}, 이미지 {len(files)}개")
+
+    async def event_stream():
+        batch_start = time.time()
+        in_flight = asyncio.Semaphore(INGEST_MAX_IN_FLIGHT)
+        tasks = [
+            asyncio.create_task(_ingest_one(user_id, item, file, in_flight))
+            for item, file in zip(items, files)
+        ]
+        counts = {"success": 0, "skipped": 0, "error": 0}
+
+        try:
+            for completed in asyncio.as_completed(tasks):
+                result = await completed
+                counts[result.get("status", "error")] = counts.get(result.get("status", "error"), 0) + 1
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+
+                # 클라이언트 연결이 끊기면 남은 작업 중단
+                if await request.is_disconnected():
+                    logger.info("⚠️ 클라이언트 연결 종료 - 남은 배치 작업 취소")
+                    break
+
+            total_time = time.time() - batch_start
+            logger.info(f"🎉 배치 업로드 완료: {len(files)}개, {total_time:.3f}초 ({counts})")
+            yield json.dumps(
+                {
+                    "user_id": user_id,
+                    "status": "done",
+                    "total": len(files),
+                    "counts": counts,
+                    "processing_time": f"{total_time:.3f}초",
+                },
+                ensure_ascii=False,
+            ) + "\n"
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
+@router.get("/ingest/stats")
+async def ingest_stats():
+    """수집 파이프라인 단계별 동시 실행 현황, 주소 캐시 히트율, 유사 사진 재사용률, OCR 배치 크기, LLM 호출 지표"""
+    return {
+        "max_in_flight": INGEST_MAX_IN_FLIGHT,
+        "stages": get_stage_stats(),
+        "geocoding": geocoder.get_stats(),
+        "fingerprints": fingerprint_store.get_stats(),
+        "ocr": vision_ocr.get_stats(),
+        "llm": llm_gateway.get_stats(),
+    }
@@ -15,7 +15,7 @@ class ScheduleRequest(BaseModel):
 @router.post("/parse-schedule")
 async def parse_schedule_endpoint(request: ScheduleRequest):
     try:
-        result = extract_schedule(request.text)
+        result = await extract_schedule(request.text)
         # 이미 딕셔너리이므로 json.loads() 필요 없음
         return JSONResponse(content=result)
     except Exception as e:
@@ -4,11 +4,21 @@ from app.utils.semantic_search import (
     enhance_query_with_personal_context_v2,
     determine_query_intent,
     search_similar_items_enhanced,
-    search_similar_items_enhanced_optimized,
     filter_relevant_items_with_context,
     generate_answer_by_intent,
+    mentions_previous_context,
 )
-from app.utils.chat_vector_store import save_chat_vector_to_pinecone
+from app.utils.search_plan import (
+    SEARCH_MODES,
+    generate_answer_from_plan,
+    plan_search,
+    rerank_items,
+    search_latency,
+)
+from app.core.config import RAG_SEARCH_PLAN_MODE
+from app.utils.chat_vector_store import save_chat_vector_to_pinecone, search_chat_history
+from app.utils.vector_search import search_similar_items_async
+from app.utils.llm_gateway import llm_gateway
 import json, time
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
@@ -20,6 +30,18 @@ logger = logging.getLogger(__name__)
 # ThreadPoolExecutor 워커 수 증가
 executor = ThreadPoolExecutor(max_workers=20)  # 기존 5에서 20으로 증가
 
+# 성능 요약 로그의 단계 이름
+STAGE_LABELS = {
+    "context_retrieval": "대화 기록 검색",
+    "plan": "검색 계획 (확장/맥락/의도)",
+    "query_expansion": "쿼리 확장",
+    "intent_detection": "의도 파악",
+    "vector_search": "벡터 검색",
+    "filtering": "결과 필터링",
+    "reranking": "결과 재정렬",
+    "answer_generation": "답변 생성",
+}
+
 
 # 비동기 저장 함수들
 async def _save_query_async(user_id: str, role: str, content: str, timestamp: int):
@@ -42,17 +64,166 @@ async def _save_result_async(user_id: str, role: str, content: str, timestamp: i
         logger.error(f"❌ 결과 저장 실패: {user_id} - {str(e)}")
 
 
+async def _search_vectors(
+    user_id: str, expanded_queries: list, top_k_photo: int, top_k_info: int, timings: dict
+):
+    """확장 질문으로 정보/사진 벡터 검색 (병렬)"""
+    vector_search_start = time.time()
+    info_search, photo_search = await asyncio.gather(
+        search_similar_items_async(user_id, expanded_queries, "info", top_k_info, max_queries=3),
+        search_similar_items_async(user_id, expanded_queries, "photo", top_k_photo, max_queries=3),
+    )
+    timings["vector_search"] = time.time() - vector_search_start
+    logger.info(f"⏱️ 벡터 검색 (병렬): {timings['vector_search']:.3f}초")
+    return info_search.to_dicts(), photo_search.to_dicts()
+
+
+async def _load_chat_history(user_id: str, query: str, timings: dict) -> list:
+    loop = asyncio.get_event_loop()
+    context_start = time.time()
+    history = await loop.run_in_executor(executor, search_chat_history, user_id, query, 5)
+    timings["context_retrieval"] = timings.get("context_retrieval", 0.0) + time.time() - context_start
+    return history
+
+
+async def _plan_search(
+    user_id: str, query: str, top_k_photo: int, top_k_info: int, timings: dict
+) -> dict:
+    """
+    단일 계획 경로: 구조화 출력 1회(확장/맥락/의도) → 벡터 검색 → 로컬 재정렬 → 답변 생성
+
+    LLM 왕복은 계획과 답변 2회, 대화 기록은 필요할 때 한 번만 검색
+    """
+    # 1. 이전 대화를 언급하면 기록을 먼저 가져와 확장과 답변에 함께 사용
+    history = []
+    if mentions_previous_context(query):
+        history = await _load_chat_history(user_id, query, timings)
+
+    # 2. 검색 계획
+    plan_start = time.time()
+    plan = await plan_search(query, history)
+    timings["plan"] = time.time() - plan_start
+    logger.info(f"⏱️ 검색 계획: {timings['plan']:.3f}초")
+    logger.info(
+        f"🔍 의미 기반 확장 쿼리 (Top 3): {plan.expanded_queries[:3]}, 의도: {plan.intent}, 맥락 필요: {plan.needs_context}"
+    )
+
+    # 3. 벡터 검색 (병렬)
+    raw_info_results, raw_photo_results = await _search_vectors(
+        user_id, plan.expanded_queries, top_k_photo, top_k_info, timings
+    )
+
+    # 4. 결과 재정렬 (LLM 호출 없음)
+    rerank_start = time.time()
+    info_results = rerank_items(query, plan.expanded_queries, raw_info_results, plan.intent)
+    photo_results = rerank_items(query, plan.expanded_queries, raw_photo_results, plan.intent)
+    timings["reranking"] = time.time() - rerank_start
+    logger.info(f"⏱️ 결과 재정렬: {timings['reranking']:.3f}초")
+
+    # 5. 답변 생성 (맥락이 필요한 질문에만 대화 기록 포함)
+    answer_history = []
+    if plan.needs_context:
+        answer_history = history or await _load_chat_history(user_id, query, timings)
+    answer_start = time.time()
+    answer = await generate_answer_from_plan(query, info_results, photo_results, answer_history)
+    timings["answer_generation"] = time.time() - answer_start
+    logger.info(f"⏱️ 답변 생성: {timings['answer_generation']:.3f}초")
+
+    return {
+        "answer": answer,
+        "photo_results": photo_results[:5],
+        "info_results": info_results[:5],
+        "query_intent": plan.intent,
+    }
+
+
+async def _legacy_search(
+    user_id: str, query: str, top_k_photo: int, top_k_info: int, timings: dict
+) -> dict:
+    """기존 경로: 쿼리 확장 → 벡터 검색 → LLM 필터링 (병렬) → 맥락 판단 + 답변 생성"""
+    loop = asyncio.get_event_loop()
+
+    # 1. 쿼리 확장
+    expand_start = time.time()
+    expanded_queries = await loop.run_in_executor(
+        executor, enhance_query_with_personal_context_v2, user_id, query
+    )
+    timings["query_expansion"] = time.time() - expand_start
+    logger.info(f"⏱️ 쿼리 확장: {timings['query_expansion']:.3f}초")
+    logger.info(f"🔍 의미 기반 확장 쿼리 (Top 3): {expanded_queries[:3]}")
+
+    # 2. 질문 의도 파악
+    intent_start = time.time()
+    query_intent = determine_query_intent(query)
+    timings["intent_detection"] = time.time() - intent_start
+    logger.info(f"⏱️ 의도 파악: {timings['intent_detection']:.3f}초")
+
+    # 3. 벡터 검색 (병렬)
+    raw_info_results, raw_photo_results = await _search_vectors(
+        user_id, expanded_queries, top_k_photo, top_k_info, timings
+    )
+
+    # 4. 결과 필터링 (병렬)
+    filter_start = time.time()
+    info_filter_task = loop.run_in_executor(
+        executor,
+        filter_relevant_items_with_context,
+        query,
+        "",
+        raw_info_results,
+        "정보",
+    )
+
+    photo_filter_task = loop.run_in_executor(
+        executor,
+        filter_relevant_items_with_context,
+        query,
+        "",
+        raw_photo_results,
+        "사진",
+    )
+
+    info_results, photo_results = await asyncio.gather(
+        info_filter_task, photo_filter_task
+    )
+    timings["filtering"] = time.time() - filter_start
+    logger.info(f"⏱️ 결과 필터링 (병렬): {timings['filtering']:.3f}초")
+
+    # 5. 답변 생성
+    answer_start = time.time()
+    result = await loop.run_in_executor(
+        executor,
+        generate_answer_by_intent,
+        user_id,
+        query,
+        info_results,
+        photo_results,
+        query_intent,
+    )
+    timings["answer_generation"] = time.time() - answer_start
+    logger.info(f"⏱️ 답변 생성: {timings['answer_generation']:.3f}초")
+    return result
+
+
 @router.post("/search/")
 async def search(
     user_id: str = Form(...),
     query: str = Form(...),
     top_k_photo: Optional[int] = Form(5),
     top_k_info: Optional[int] = Form(5),
+    mode: Optional[str] = Form(None),
 ):
+    """
+    사진/정보 검색 + 답변 생성
+
+    mode: "plan"(구조화 출력 1회 + 로컬 재정렬) 또는 "legacy"(단계별 LLM 호출)
+          지정하지 않으면 RAG_SEARCH_PLAN_MODE 설정을 따름
+    """
     # 전체 시작 시간
     total_start = time.time()
     timestamp = int(time.time())
-    loop = asyncio.get_event_loop()
+    if mode not in SEARCH_MODES:
+        mode = "plan" if RAG_SEARCH_PLAN_MODE else "legacy"
 
     # 각 단계별 시간 기록용 딕셔너리
     timings = {}
@@ -61,94 +232,19 @@ async def search(
         # 1. 사용자 쿼리 저장 (완전 비동기)
         asyncio.create_task(_save_query_async(user_id, "user", query, timestamp))
 
-        # 2. 쿼리 확장
-        expand_start = time.time()
-        expanded_queries = await loop.run_in_executor(
-            executor, enhance_query_with_personal_context_v2, user_id, query
-        )
-        timings["query_expansion"] = time.time() - expand_start
-        logger.info(f"⏱️ 쿼리 확장: {timings['query_expansion']:.3f}초")
-        logger.info(f"🔍 의미 기반 확장 쿼리 (Top 3): {expanded_queries[:3]}")
-
-        # 3. 질문 의도 파악
-        intent_start = time.time()
-        query_intent = determine_query_intent(query)
-        timings["intent_detection"] = time.time() - intent_start
-        logger.info(f"⏱️ 의도 파악: {timings['intent_detection']:.3f}초")
-
-        # 4. 벡터 검색 (병렬)
-        vector_search_start = time.time()
-        info_search_task = loop.run_in_executor(
-            executor,
-            search_similar_items_enhanced_optimized,
-            user_id,
-            expanded_queries,
-            "info",
-            top_k_info,
-        )
-
-        photo_search_task = loop.run_in_executor(
-            executor,
-            search_similar_items_enhanced_optimized,
-            user_id,
-            expanded_queries,
-            "photo",
-            top_k_photo,
-        )
-
-        raw_info_results, raw_photo_results = await asyncio.gather(
-            info_search_task, photo_search_task
-        )
-        timings["vector_search"] = time.time() - vector_search_start
-        logger.info(f"⏱️ 벡터 검색 (병렬): {timings['vector_search']:.3f}초")
-
-        # 5. 결과 필터링 (병렬)
-        filter_start = time.time()
-        info_filter_task = loop.run_in_executor(
-            executor,
-            filter_relevant_items_with_context,
-            query,
-            "",
-            raw_info_results,
-            "정보",
-        )
-
-        photo_filter_task = loop.run_in_executor(
-            executor,
-            filter_relevant_items_with_context,
-            query,
-            "",
-            raw_photo_results,
-            "사진",
-        )
-
-        info_results, photo_results = await asyncio.gather(
-            info_filter_task, photo_filter_task
-        )
-        timings["filtering"] = time.time() - filter_start
-        logger.info(f"⏱️ 결과 필터링 (병렬): {timings['filtering']:.3f}초")
-
-        # 6. 답변 생성
-        answer_start = time.time()
-        result = await loop.run_in_executor(
-            executor,
-            generate_answer_by_intent,
-            user_id,
-            query,
-            info_results,
-            photo_results,
-            query_intent,
-        )
-        timings["answer_generation"] = time.time() - answer_start
-        logger.info(f"⏱️ 답변 생성: {timings['answer_generation']:.3f}초")
+        # 2. 검색 및 답변 생성
+        run_search = _plan_search if mode == "plan" else _legacy_search
+        result = await run_search(user_id, query, top_k_photo, top_k_info, timings)
 
         # 전체 시간 (사용자 응답 시점)
         timings["total"] = time.time() - total_start
+        search_latency.record(mode, timings)
 
         # 결과에 타이밍 정보 포함 (디버깅용)
         result["_timings"] = timings
+        result["_search_mode"] = mode
 
-        # 7. 결과 저장 (응답 후 비동기로 처리)
+        # 3. 결과 저장 (응답 후 비동기로 처리)
         serialized_result = json.dumps(result, ensure_ascii=False)
         asyncio.create_task(
             _save_result_async(
@@ -157,14 +253,15 @@ async def search(
         )
 
         # 요약 로그
+        stage_lines = "\n".join(
+            f"- {label}: {timings[stage]:.3f}초"
+            for stage, label in STAGE_LABELS.items()
+            if stage in timings
+        )
         logger.info(
             f"""
-⏱️ 검색 API 성능 요약:
-- 쿼리 확장: {timings['query_expansion']:.3f}초
-- 의도 파악: {timings['intent_detection']:.3f}초
-- 벡터 검색: {timings['vector_search']:.3f}초
-- 결과 필터링: {timings['filtering']:.3f}초
-- 답변 생성: {timings['answer_generation']:.3f}초
+⏱️ 검색 API 성능 요약 ({mode}):
+{stage_lines}
 - 전체 시간: {timings['total']:.3f}초 (응답 시점)
         """
         )
@@ -193,6 +290,16 @@ async def search(
         pass
 
 
+@router.get("/search/stats")
+async def search_stats():
+    """실행 방식(plan/legacy)별 지연 시간 비교와 LLM 게이트웨이 지표"""
+    return {
+        "default_mode": "plan" if RAG_SEARCH_PLAN_MODE else "legacy",
+        **search_latency.get_stats(),
+        "llm": llm_gateway.get_stats(),
+    }
+
+
 # 애플리케이션 종료 시에만 정리
 @router.on_event("shutdown")
 async def shutdown_event():
@@ -64,7 +64,7 @@ async def upload_image_local(
         logger.info(f"🔍 이미지 분류 점수: {text_score:.3f} (access_id={access_id})")
 
         if text_score <= 0.09:  # photo
-            caption = generate_image_caption(image_bytes)
+            caption = await generate_image_caption(image_bytes)
             ocr_text = extract_text_from_image(image_bytes)
 
             target = "photo"
@@ -110,7 +110,7 @@ async def upload_image_local(
             image_id = image_response.json().get("result", {}).get("imageId")
 
             if target == "info":
-                schedule_result = extract_schedule(content)
+                schedule_result = await extract_schedule(content)
                 if schedule_result.get("is_schedule") and schedule_result.get(
                     "datetime"
                 ):
@@ -7,3 +7,126 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise ValueError("`OPENAI_API_KEY` 환경 변수가 설정되지 않았습니다.")
+
+# DB 연결 설정
+DB_PARAMS = {
+    "host": "3.38.95.110",
+    "port": "5434",
+    "database": os.getenv("POSTGRES_RAG_DB_NAME"),
+    "user": os.getenv("POSTGRES_RAG_USER"),
+    "password": os.getenv("POSTGRES_RAG_PASSWORD"),
+}
+
+# DB 커넥션 풀 설정
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))
+
+# 이미지 수집 파이프라인 단계별 동시 실행 제한
+INGEST_STAGE_LIMITS = {
+    "preprocess": int(os.getenv("INGEST_PREPROCESS_CONCURRENCY", "4")),
+    "ocr": int(os.getenv("INGEST_OCR_CONCURRENCY", "16")),  # Vision 배치 최대 크기와 맞춤
+    "caption": int(os.getenv("INGEST_CAPTION_CONCURRENCY", "4")),
+    "keywords": int(os.getenv("INGEST_KEYWORD_CONCURRENCY", "4")),
+    "embedding": int(os.getenv("INGEST_EMBEDDING_CONCURRENCY", "8")),
+    "pinecone": int(os.getenv("INGEST_PINECONE_CONCURRENCY", "8")),
+    "geocoding": int(os.getenv("INGEST_GEOCODING_CONCURRENCY", "8")),
+    "postgres": int(os.getenv("INGEST_POSTGRES_CONCURRENCY", str(DB_POOL_MAX_SIZE))),
+    "schedule": int(os.getenv("INGEST_SCHEDULE_CONCURRENCY", "4")),
+}
+
+# 배치 업로드에서 동시에 메모리에 올려 처리할 최대 이미지 수
+INGEST_MAX_IN_FLIGHT = int(os.getenv("INGEST_MAX_IN_FLIGHT", "32"))
+
+# 임베딩 배치 설정 (동시 요청을 모아 한 번에 호출)
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+EMBEDDING_BATCH_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_BATCH_MAX_CONCURRENCY", "4"))
+
+# 임베딩 캐시 설정 (EMBEDDING_CACHE_DIR 지정 시 디스크에도 저장)
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "")
+
+# 임베딩 모델 설정 (재임베딩 중에는 EMBEDDING_MIGRATING_FROM에 이전 모델 지정, 쉼표 구분)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_MIGRATING_FROM = os.getenv("EMBEDDING_MIGRATING_FROM", "")
+
+# 벡터 저장소 설정 (pinecone / local / replica)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+LOCAL_VECTOR_DIR = os.getenv("LOCAL_VECTOR_DIR", "./vector_data")
+VECTOR_REPLICA_HYDRATE_AFTER = int(os.getenv("VECTOR_REPLICA_HYDRATE_AFTER", "1"))
+# 복제본을 다시 복사하기까지의 시간 (원본 세대로 감지되지 않는 다른 프로세스의 쓰기 대비, 0이면 만료 없음)
+VECTOR_REPLICA_TTL_SECONDS = float(os.getenv("VECTOR_REPLICA_TTL_SECONDS", "300"))
+
+# 벡터 쿼리 동시 실행 수 (공유 스레드풀)
+VECTOR_QUERY_MAX_CONCURRENCY = int(os.getenv("VECTOR_QUERY_MAX_CONCURRENCY", "16"))
+
+# 검색 서비스 질의 캐시 무효화 (새 사진 저장 시 사용자 세대 증가)
+# - QUERY_CACHE_BACKEND=redis: 검색 서비스와 같은 Redis의 세대 카운터를 직접 증가
+# - 그 외: QUERY_CACHE_INVALIDATE_URL(검색 서비스 /search/cache/invalidate)로 요청
+QUERY_CACHE_BACKEND = os.getenv("QUERY_CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "")
+QUERY_CACHE_INVALIDATE_URL = os.getenv("QUERY_CACHE_INVALIDATE_URL", "")
+
+# 역지오코딩 설정
+# - GEOCODING_PROVIDER: google / stub (테스트용 로컬 응답)
+# - GEOCODE_GEOHASH_PRECISION: 같은 주소로 보는 geohash 자릿수 (7자리 ≈ 150m)
+GEOCODING_PROVIDER = os.getenv("GEOCODING_PROVIDER", "google")
+GEOCODE_GEOHASH_PRECISION = int(os.getenv("GEOCODE_GEOHASH_PRECISION", "7"))
+GEOCODE_CACHE_MAX_ENTRIES = int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "10000"))
+GEOCODE_HTTP_TIMEOUT = float(os.getenv("GEOCODE_HTTP_TIMEOUT", "5"))
+GEOCODE_MAX_CONNECTIONS = int(os.getenv("GEOCODE_MAX_CONNECTIONS", "20"))
+
+# 이미지 전처리 (한 번 디코딩 후 단계별 크기로 변환)
+CAPTION_IMAGE_MAX_SIDE = int(os.getenv("CAPTION_IMAGE_MAX_SIDE", "512"))
+OCR_IMAGE_MAX_SIDE = int(os.getenv("OCR_IMAGE_MAX_SIDE", "2048"))
+
+# 유사 사진 재사용 (pHash 해밍 거리 이하이면 사진의 캡션 재사용, OCR은 항상 새로 실행)
+# - DB 조회는 16비트 4구간 인덱스를 사용하므로 3 이하에서만 누락 없음
+PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "3"))
+FINGERPRINT_RECENT_PER_USER = int(os.getenv("FINGERPRINT_RECENT_PER_USER", "200"))
+
+# Vision OCR 배치 (동시 요청을 모아 batch_annotate_images 한 번으로 처리)
+# - 요청당 최대 16장, 전송 크기는 API 요청 제한 안쪽으로 유지
+VISION_OCR_BATCH_SIZE = int(os.getenv("VISION_OCR_BATCH_SIZE", "16"))
+VISION_OCR_BATCH_MAX_BYTES = int(os.getenv("VISION_OCR_BATCH_MAX_BYTES", str(8 * 1024 * 1024)))
+VISION_OCR_BATCH_WAIT_MS = float(os.getenv("VISION_OCR_BATCH_WAIT_MS", "10"))
+VISION_OCR_MAX_CONCURRENT_BATCHES = int(os.getenv("VISION_OCR_MAX_CONCURRENT_BATCHES", "4"))
+
+# 이미지 업로드 작업 큐 (Postgres upload_jobs 테이블)
+# - UPLOAD_JOB_WORKERS: 프로세스당 동시에 처리하는 작업 수
+# - 실패 시 UPLOAD_JOB_RETRY_BASE_SECONDS * 2^(시도-1) 후 재시도, UPLOAD_JOB_MAX_ATTEMPTS회까지
+# - 처리 중에는 UPLOAD_JOB_LEASE_SECONDS / 3마다 임대를 갱신, 그동안 갱신이 없던 작업은 워커가 죽은 것으로 보고 다시 가져감
+UPLOAD_JOB_WORKERS = int(os.getenv("UPLOAD_JOB_WORKERS", "4"))
+UPLOAD_JOB_MAX_ATTEMPTS = int(os.getenv("UPLOAD_JOB_MAX_ATTEMPTS", "3"))
+UPLOAD_JOB_RETRY_BASE_SECONDS = float(os.getenv("UPLOAD_JOB_RETRY_BASE_SECONDS", "5"))
+UPLOAD_JOB_LEASE_SECONDS = float(os.getenv("UPLOAD_JOB_LEASE_SECONDS", "600"))
+UPLOAD_JOB_POLL_INTERVAL = float(os.getenv("UPLOAD_JOB_POLL_INTERVAL", "2"))
+
+# OpenAI 채팅 호출 게이트웨이 (캡션/키워드/일정 추출 공용 AsyncOpenAI 클라이언트)
+# - 예산은 이 서비스가 쓰는 키(OPENAI_API_KEY) 기준, 같은 키를 쓰는 프로세스 수로 나눠 설정
+# - LLM_MAX_CONCURRENCY: 동시 호출 수
+# - LLM_TOKENS_PER_MINUTE / LLM_REQUESTS_PER_MINUTE: 분당 토큰/요청 한도 (토큰은 추정치로 차감 후 usage로 보정, 0이면 제한 없음)
+# - LLM_BACKGROUND_RESERVE: 이미지 수집 호출이 남겨 두는 예산 비율 (검색 질의 전용)
+# - 429/5xx/타임아웃/연결 오류만 LLM_MAX_RETRIES회 재시도 (min(상한, 기본값 * 2^시도) 안에서 무작위 대기)
+LLM_KEY_NAME = "OPENAI_API_KEY"
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_BACKGROUND_RESERVE = float(os.getenv("LLM_BACKGROUND_RESERVE", "0.25"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "16"))
+
+# /rag/search/ 실행 방식
+# - RAG_SEARCH_PLAN_MODE: true면 확장 질문/맥락 필요 여부/의도를 구조화 출력 요청 1회로 받고 결과 필터링은 로컬 재정렬
+#   (false면 기존 단계별 LLM 호출 경로, 요청마다 mode=plan|legacy로 바꿔 비교 가능)
+# - RAG_SEARCH_PLAN_MODEL: 검색 계획 요청 모델
+# - RAG_RERANK_LEXICAL_WEIGHT: 로컬 재정렬에서 벡터 점수에 더하는 글자 겹침 점수 비중
+RAG_SEARCH_PLAN_MODE = os.getenv("RAG_SEARCH_PLAN_MODE", "true").lower() == "true"
+RAG_SEARCH_PLAN_MODEL = os.getenv("RAG_SEARCH_PLAN_MODEL", "gpt-4o-mini")
+RAG_RERANK_LEXICAL_WEIGHT = float(os.getenv("RAG_RERANK_LEXICAL_WEIGHT", "0.2"))
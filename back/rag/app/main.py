@@ -13,6 +13,11 @@ from app.api.search_image_info import router as search_image_info_router
 from app.api.test_image_upload import router as test_image_upload_router
 from app.api.db_connection_test import router as db_connection_test_router
 from app.api.image_upload_keyword import router as image_upload_keyword_router
+from app.api.image_upload_batch import router as image_upload_batch_router
+from app.utils.db_pool import init_db_pool, close_db_pool
+from app.utils.geocoding import geocoder
+from app.utils.upload_job_queue import upload_worker
+from app.utils.llm_gateway import llm_gateway
 import logging
 
 app = FastAPI()
@@ -39,6 +44,24 @@ app.include_router(search_image_info_router, prefix="/rag")
 app.include_router(test_image_upload_router, prefix="/test")
 app.include_router(db_connection_test_router, prefix="/rag")
 app.include_router(image_upload_keyword_router, prefix="/rag")
+app.include_router(image_upload_batch_router, prefix="/rag")
+
+
+# 애플리케이션 시작 시 DB 커넥션 풀 생성 및 업로드 작업 워커 시작
+@app.on_event("startup")
+async def startup_event():
+    await init_db_pool()
+    upload_worker.start()
+
+
+# 애플리케이션 종료 시 업로드 워커, DB 커넥션 풀 및 공유 HTTP 클라이언트 정리
+@app.on_event("shutdown")
+async def shutdown_event():
+    await upload_worker.stop()
+    await geocoder.close()
+    await llm_gateway.close()
+    await close_db_pool()
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,227 @@
+"""
+기존 Pinecone 벡터에 구조화 메타데이터 백필 (재임베딩 없음)
+
+- "access_id (image_time): 내용" 형식의 text 메타데이터를 파싱해
+  access_id / type / image_time(epoch) / caption / ocr / schema_version 필드를 추가
+- --with-db 사용 시 Postgres images / image_keywords에서 캡션, 시각, 키워드를 보강
+- index.update(set_metadata=...)로 메타데이터만 갱신 (벡터 값과 text는 그대로)
+- 이미 schema_version이 있는 벡터는 건너뛰고, 페이지마다 체크포인트 저장
+
+실행 (back/rag 디렉터리에서):
+    python -m app.utils.backfill_vector_metadata --namespace user1_information --with-db
+    python -m app.utils.backfill_vector_metadata --all
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import Dict, List, Optional, Tuple
+from app.utils.vector_store import index
+from app.utils.vector_metadata import (
+    METADATA_SCHEMA_VERSION,
+    build_image_metadata,
+    parse_legacy_content,
+    parse_legacy_text,
+)
+
+logger = logging.getLogger(__name__)
+
+# 이미지 캡션/시각 및 키워드 조회 (image_keywords.image_id에는 access_id가 저장됨)
+SELECT_IMAGE_FIELDS_QUERY = """
+SELECT i.access_id, i.caption, i.image_time,
+       COALESCE(array_agg(k.keyword) FILTER (WHERE k.keyword IS NOT NULL), '{}') AS keywords
+FROM images i
+LEFT JOIN image_keywords k ON k.user_id = i.user_id AND k.image_id = i.access_id
+WHERE i.user_id = $1 AND i.access_id = ANY($2::text[])
+GROUP BY i.access_id, i.caption, i.image_time;
+"""
+
+
+def _load_checkpoint(path: Optional[str], namespace: str) -> Dict:
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("namespace") == namespace:
+            return checkpoint
+    return {
+        "namespace": namespace,
+        "pagination_token": None,
+        "updated": 0,
+        "skipped": 0,
+        "done": False,
+    }
+
+
+def _save_checkpoint(path: Optional[str], checkpoint: Dict):
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _split_namespace(namespace: str) -> Tuple[str, str]:
+    """'{user_id}_{target}' → (user_id, target)"""
+    user_id, _, target = namespace.rpartition("_")
+    return user_id, target
+
+
+async def _load_db_fields(user_id: str, access_ids: List[str]) -> Dict[str, Dict]:
+    """access_id별 DB 캡션/시각/키워드 조회"""
+    from app.utils.db_pool import acquire_connection
+
+    if not access_ids:
+        return {}
+    async with acquire_connection() as connection:
+        rows = await connection.fetch(SELECT_IMAGE_FIELDS_QUERY, user_id, access_ids)
+    return {
+        row["access_id"]: {
+            "caption": row["caption"] or "",
+            "image_time": row["image_time"],
+            "keywords": list(row["keywords"]),
+        }
+        for row in rows
+    }
+
+
+def _build_metadata(vector, target: str, db_fields: Dict[str, Dict]) -> Dict:
+    text = vector.metadata.get("text", "")
+    access_id, image_time, body = parse_legacy_text(text)
+    caption, ocr = parse_legacy_content(body)
+    # image_upload_keyword 형식은 "OCR 캡션"이 한 줄로 합쳐져 있어 DB 캡션 기준으로 분리
+    db_row = db_fields.get(access_id, {})
+    if db_row.get("caption") and not caption:
+        caption = db_row["caption"]
+        if ocr.endswith(caption):
+            ocr = ocr[: -len(caption)].strip()
+
+    return build_image_metadata(
+        access_id,
+        text,
+        target,
+        image_time=db_row.get("image_time") or image_time,
+        keywords=db_row.get("keywords"),
+        caption=caption,
+        ocr=ocr,
+    )
+
+
+async def backfill_namespace(
+    namespace: str,
+    page_size: int = 100,
+    checkpoint_path: Optional[str] = None,
+    with_db: bool = False,
+    dry_run: bool = False,
+) -> Dict:
+    """네임스페이스의 벡터 메타데이터를 구조화 필드로 갱신"""
+    user_id, target = _split_namespace(namespace)
+    checkpoint = _load_checkpoint(checkpoint_path, namespace)
+    if checkpoint["done"]:
+        logger.info(f"✅ 이미 완료된 네임스페이스: {namespace}")
+        return checkpoint
+
+    pages = 0
+    while True:
+        page_start = time.time()
+        listing = index.list_paginated(
+            namespace=namespace,
+            limit=page_size,
+            pagination_token=checkpoint["pagination_token"],
+        )
+        ids = [vector.id for vector in listing.vectors]
+
+        if ids:
+            fetched = index.fetch(ids=ids, namespace=namespace).vectors
+            targets = [
+                vector
+                for vector in fetched.values()
+                if (vector.metadata or {}).get("schema_version") != METADATA_SCHEMA_VERSION
+                and (vector.metadata or {}).get("text")
+            ]
+            checkpoint["skipped"] += len(ids) - len(targets)
+
+            db_fields = {}
+            if with_db and targets:
+                access_ids = [parse_legacy_text(v.metadata["text"])[0] for v in targets]
+                db_fields = await _load_db_fields(user_id, access_ids)
+
+            for vector in targets:
+                metadata = _build_metadata(vector, target, db_fields)
+                if not dry_run:
+                    index.update(id=vector.id, set_metadata=metadata, namespace=namespace)
+            checkpoint["updated"] += len(targets)
+
+        next_token = listing.pagination.next if listing.pagination else None
+        checkpoint["pagination_token"] = next_token
+        checkpoint["done"] = next_token is None
+        if not dry_run:
+            _save_checkpoint(checkpoint_path, checkpoint)
+
+        pages += 1
+        logger.info(
+            f"🏷️ 메타데이터 백필 ({namespace}): 페이지 {pages}, 누적 {checkpoint['updated']}개 갱신 / "
+            f"{checkpoint['skipped']}개 건너뜀 ({time.time() - page_start:.3f}초)"
+        )
+        if checkpoint["done"]:
+            break
+
+    return checkpoint
+
+
+def list_image_namespaces() -> List[str]:
+    """이미지 벡터 네임스페이스 목록 (대화 기록 네임스페이스 제외)"""
+    namespaces = index.describe_index_stats()["namespaces"]
+    return sorted(
+        name
+        for name in namespaces
+        if _split_namespace(name)[1] in ("photo", "info", "information")
+    )
+
+
+async def run_backfill(args) -> List[Dict]:
+    namespaces = list_image_namespaces() if args.all else [args.namespace]
+    if args.with_db:
+        from app.utils.db_pool import init_db_pool, close_db_pool
+
+        await init_db_pool()
+    try:
+        results = []
+        for namespace in namespaces:
+            checkpoint_path = os.path.join(
+                args.checkpoint_dir, f"backfill_{namespace}.json"
+            )
+            results.append(
+                await backfill_namespace(
+                    namespace, args.page_size, checkpoint_path, args.with_db, args.dry_run
+                )
+            )
+        return results
+    finally:
+        if args.with_db:
+            await close_db_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pinecone 메타데이터 구조화 백필")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--namespace")
+    target.add_argument("--all", action="store_true", help="모든 이미지 네임스페이스")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--checkpoint-dir", default=".", help="체크포인트 JSON 저장 위치")
+    parser.add_argument("--with-db", action="store_true", help="Postgres에서 캡션/시각/키워드 보강")
+    parser.add_argument("--dry-run", action="store_true", help="갱신 없이 대상 수만 확인")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="[%(asctime)s] %(levelname)s - %(message)s"
+    )
+    results = asyncio.run(run_backfill(args))
+    print(json.dumps(results, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
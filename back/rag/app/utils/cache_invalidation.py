@@ -0,0 +1,44 @@
+# app/utils/cache_invalidation.py
+
+import logging
+import httpx
+from app.core.config import QUERY_CACHE_BACKEND, REDIS_URL, QUERY_CACHE_INVALIDATE_URL
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis 공유 캐시를 쓰지 않으면 필요 없음
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+# 검색 서비스 QueryCache와 같은 키 규칙 (qcache:gen:{user_id})
+GENERATION_KEY_PREFIX = "qcache:gen:"
+
+redis_client = (
+    redis_asyncio.from_url(REDIS_URL, decode_responses=True)
+    if QUERY_CACHE_BACKEND == "redis" and REDIS_URL and redis_asyncio is not None
+    else None
+)
+
+
+async def invalidate_user_cache(user_id: str):
+    """
+    새 사진 저장 후 검색 서비스의 사용자 질의 캐시 무효화 (실패해도 업로드는 계속)
+
+    Redis 공유 시 세대 카운터를 직접 올리고, 아니면 검색 서비스 무효화 API 호출
+    """
+    try:
+        if redis_client is not None:
+            generation = await redis_client.incr(f"{GENERATION_KEY_PREFIX}{user_id}")
+        elif QUERY_CACHE_INVALIDATE_URL:
+            async with httpx.AsyncClient(timeout=2.0) as client:
+                response = await client.post(
+                    QUERY_CACHE_INVALIDATE_URL, data={"user_id": user_id}
+                )
+                response.raise_for_status()
+                generation = response.json().get("generation")
+        else:
+            return
+        logger.info(f"🔄 검색 캐시 무효화: {user_id} (세대 {generation})")
+    except Exception as e:
+        logger.warning(f"⚠️ 검색 캐시 무효화 실패 ({user_id}): {str(e)}")
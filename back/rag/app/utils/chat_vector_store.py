@@ -1,5 +1,6 @@
 from uuid import uuid4
-from app.utils.embedding import get_text_embedding
+from app.utils.embedding import get_text_embedding, query_by_text
+from app.utils.embedding_registry import embedding_metadata
 from app.utils.vector_store import index  # 기존 index 객체 재사용
 
 
@@ -26,6 +27,7 @@ def save_chat_vector_to_pinecone(
         "role": role,
         "text": content,
         "timestamp": timestamp,
+        **embedding_metadata(),
     }
 
     index.upsert(
@@ -42,14 +44,7 @@ def save_chat_vector_to_pinecone(
 
 def search_chat_history(user_id: str, query: str, top_k: int = 5) -> list[dict]:
     namespace = f"{user_id}_chat"
-    vector = get_text_embedding(query)
-
-    response = index.query(
-        vector=vector,
-        namespace=namespace,
-        top_k=top_k,
-        include_metadata=True,
-    )
+    matches = query_by_text(index, namespace, query, top_k)
 
     return [
         {
@@ -58,5 +53,5 @@ def search_chat_history(user_id: str, query: str, top_k: int = 5) -> list[dict]:
             "timestamp": match["metadata"].get("timestamp", 0),
             "score": round(match["score"], 3),
         }
-        for match in response["matches"]
+        for match in matches
     ]
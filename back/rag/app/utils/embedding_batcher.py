@@ -0,0 +1,122 @@
+# app/utils/embedding_batcher.py
+
+import time
+import queue
+import logging
+import threading
+from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    동시에 들어온 임베딩 요청을 모아 한 번의 embeddings API 호출로 처리
+
+    - 첫 요청 이후 max_wait_ms 동안, 또는 max_batch_size 개가 모일 때까지 수집
+    - 수집된 텍스트를 input 리스트로 한 번에 요청하고 결과를 각 호출자에게 돌려줌
+    - 동기 호출(스레드풀 안의 기존 코드)과 asyncio 양쪽에서 사용 가능 (Future 기반)
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        dimensions: Optional[int] = None,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        max_concurrent_batches: int = 4,
+    ):
+        self.client = client
+        self.model = model
+        self.dimensions = dimensions
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+        self._dispatcher = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix="embedding-batch"
+        )
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "errors": 0, "api_time": 0.0}
+        self._collector = threading.Thread(
+            target=self._collect_loop, name="embedding-batcher", daemon=True
+        )
+        self._collector.start()
+
+    def submit(self, text: str) -> Future:
+        """임베딩 요청 등록 (결과는 Future로 전달)"""
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> List[float]:
+        """동기 호출용: 배치 처리 결과를 기다려 반환"""
+        return self.submit(text).result()
+
+    def _collect_loop(self):
+        while True:
+            # 첫 요청이 들어올 때까지 대기
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+
+            # 최대 대기 시간 또는 최대 배치 크기까지 수집
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._dispatcher.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[tuple]):
+        # 이미 취소된 요청(asyncio 호출자 취소)은 빼고, 나머지는 실행 중으로 표시해 더는 취소되지 않게 함
+        batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        texts = [text for text, _ in batch]
+        start = time.perf_counter()
+        try:
+            params = {"dimensions": self.dimensions} if self.dimensions else {}
+            response = self.client.embeddings.create(
+                model=self.model, input=texts, **params
+            )
+            # 응답 순서가 보장되지 않을 수 있으므로 index 기준으로 매핑
+            embeddings = {item.index: item.embedding for item in response.data}
+            results = [embeddings[i] for i in range(len(batch))]
+        except Exception as e:
+            logger.error(f"❌ 임베딩 배치 요청 실패 ({len(batch)}개): {str(e)}")
+            with self._lock:
+                self._stats["errors"] += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            with self._lock:
+                self._stats["requests"] += len(batch)
+                self._stats["batches"] += 1
+                self._stats["api_time"] += time.perf_counter() - start
+
+        for (_, future), embedding in zip(batch, results):
+            future.set_result(embedding)
+
+    def get_stats(self) -> Dict:
+        """요청/배치 수 및 평균 배치 크기 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+        batches = stats["batches"]
+        return {
+            "model": self.model,
+            "requests": stats["requests"],
+            "batches": batches,
+            "errors": stats["errors"],
+            "avg_batch_size": round(stats["requests"] / batches, 2) if batches else 0.0,
+            "avg_api_ms": round(stats["api_time"] / batches * 1000, 1) if batches else 0.0,
+            "pending": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
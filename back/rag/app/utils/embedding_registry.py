@@ -0,0 +1,73 @@
+# app/utils/embedding_registry.py
+
+from typing import Dict, List, Optional
+from app.core.config import EMBEDDING_MODEL, EMBEDDING_MIGRATING_FROM
+
+# 사용 가능한 임베딩 모델 (Pinecone 인덱스 차원 1536과 맞아야 함)
+# request_dimensions: API 호출 시 dimensions 파라미터로 줄일 차원 (None이면 모델 기본값)
+EMBEDDING_MODELS: Dict[str, Dict] = {
+    "text-embedding-3-small": {"version": "1", "dimensions": 1536, "request_dimensions": None},
+    "text-embedding-3-large": {"version": "1", "dimensions": 1536, "request_dimensions": 1536},
+    "text-embedding-ada-002": {"version": "2", "dimensions": 1536, "request_dimensions": None},
+}
+
+# 메타데이터에 모델 정보가 없는 기존 벡터의 모델 (저장 경로는 항상 3-small이었음)
+LEGACY_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def get_model_info(model: str) -> Dict:
+    """등록된 임베딩 모델 정보 반환"""
+    if model not in EMBEDDING_MODELS:
+        raise ValueError(f"등록되지 않은 임베딩 모델입니다: {model}")
+    return EMBEDDING_MODELS[model]
+
+
+# 새로 저장하는 벡터에 사용할 모델
+ACTIVE_EMBEDDING_MODEL = EMBEDDING_MODEL
+get_model_info(ACTIVE_EMBEDDING_MODEL)
+
+# 검색 시 사용할 모델 (재임베딩 중에는 이전 모델 벡터도 함께 검색)
+QUERY_EMBEDDING_MODELS: List[str] = [ACTIVE_EMBEDDING_MODEL] + [
+    model.strip()
+    for model in EMBEDDING_MIGRATING_FROM.split(",")
+    if model.strip() and model.strip() != ACTIVE_EMBEDDING_MODEL
+]
+for _model in QUERY_EMBEDDING_MODELS:
+    get_model_info(_model)
+
+
+def embedding_metadata(model: str = ACTIVE_EMBEDDING_MODEL) -> Dict:
+    """Pinecone 메타데이터에 찍을 모델/버전 정보"""
+    return {
+        "embedding_model": model,
+        "embedding_version": get_model_info(model)["version"],
+    }
+
+
+def get_stamped_model(metadata: Optional[Dict]) -> str:
+    """벡터 메타데이터에서 임베딩 모델 확인 (없으면 기존 모델)"""
+    return (metadata or {}).get("embedding_model", LEGACY_EMBEDDING_MODEL)
+
+
+def model_filter(model: str, base_filter: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    검색 모델과 같은 모델로 저장된 벡터만 조회하는 Pinecone 필터
+
+    검색 모델이 하나뿐이면 (마이그레이션 중이 아니면) 필터를 추가하지 않음
+    """
+    if len(QUERY_EMBEDDING_MODELS) == 1:
+        return base_filter
+
+    if model == LEGACY_EMBEDDING_MODEL:
+        condition = {
+            "$or": [
+                {"embedding_model": {"$eq": model}},
+                {"embedding_model": {"$exists": False}},
+            ]
+        }
+    else:
+        condition = {"embedding_model": {"$eq": model}}
+
+    if base_filter:
+        return {"$and": [base_filter, condition]}
+    return condition
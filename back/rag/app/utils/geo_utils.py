@@ -0,0 +1,47 @@
+# app/utils/geo_utils.py
+
+from typing import Optional, Tuple, Union
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# images.geohash 저장 정밀도 (9자리 ≈ 4.8m x 4.8m)
+GEOHASH_PRECISION = 9
+
+Coordinate = Union[str, float, int, None]
+
+
+def parse_coordinates(
+    latitude: Coordinate, longitude: Coordinate
+) -> Tuple[Optional[float], Optional[float]]:
+    """폼으로 받은 위도/경도 문자열을 숫자로 변환 (없거나 범위를 벗어나면 (None, None))"""
+    try:
+        lat, lon = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None, None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None, None
+    # 위치 정보가 없는 사진은 단말에서 0, 0으로 보내는 경우가 있음
+    if lat == 0 and lon == 0:
+        return None, None
+    return lat, lon
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """위도/경도 → geohash (접두사가 같으면 가까운 위치, B-tree 범위 검색에 사용)"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (target[0] + target[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            target[0] = mid
+        else:
+            target[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
@@ -0,0 +1,197 @@
+# app/utils/geocoding.py
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Protocol, Tuple
+from app.core.config import (
+    GEOCODING_PROVIDER,
+    GEOCODE_GEOHASH_PRECISION,
+    GEOCODE_CACHE_MAX_ENTRIES,
+)
+from app.utils.db_pool import acquire_connection
+from app.utils.geo_utils import encode_geohash, parse_coordinates
+from app.utils.google_geocoding import (
+    GeocodingError,
+    GoogleGeocodingProvider,
+    StubGeocodingProvider,
+)
+
+logger = logging.getLogger(__name__)
+
+# 주소를 얻지 못했을 때 키워드 파싱에 넘기는 값 (기존 반환값 유지)
+NO_ADDRESS = "주소 정보 없음"
+
+SELECT_GEOCODE_QUERY = """
+SELECT address FROM geocode_cache WHERE provider = $1 AND geohash = $2;
+"""
+
+INSERT_GEOCODE_QUERY = """
+INSERT INTO geocode_cache (provider, geohash, address)
+VALUES ($1, $2, $3)
+ON CONFLICT (provider, geohash) DO NOTHING;
+"""
+
+
+class GeocodingProvider(Protocol):
+    """역지오코딩 제공자 (주소가 없으면 None, 호출 실패는 GeocodingError)"""
+
+    name: str
+
+    async def reverse(self, lat: float, lon: float) -> Optional[str]: ...
+
+    async def close(self): ...
+
+
+PROVIDERS = {
+    "google": GoogleGeocodingProvider,
+    "stub": StubGeocodingProvider,
+}
+
+
+class ReverseGeocoder:
+    """
+    geohash 버킷 단위 역지오코딩 캐시
+
+    - 같은 장소(기본 7자리 ≈ 150m)에서 찍은 사진은 한 번만 조회
+    - 메모리 LRU → Postgres geocode_cache 테이블 → 제공자 순으로 조회
+    - 일괄 업로드 중 같은 버킷의 동시 요청은 진행 중인 조회 하나를 함께 기다림
+    """
+
+    def __init__(self, provider: GeocodingProvider, precision: int, max_entries: int):
+        self.provider = provider
+        self.precision = precision
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "lookups": 0,
+            "memory_hits": 0,
+            "db_hits": 0,
+            "coalesced": 0,
+            "provider_calls": 0,
+            "errors": 0,
+            "invalid": 0,
+        }
+
+    def _count(self, field: str):
+        with self._lock:
+            self._stats[field] += 1
+
+    def _memory_get(self, bucket: str) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            if bucket not in self._memory:
+                return False, None
+            self._memory.move_to_end(bucket)
+            return True, self._memory[bucket]
+
+    def _remember(self, bucket: str, address: Optional[str]):
+        with self._lock:
+            self._memory[bucket] = address
+            self._memory.move_to_end(bucket)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    async def _db_get(self, bucket: str) -> Tuple[bool, Optional[str]]:
+        try:
+            async with acquire_connection() as connection:
+                row = await connection.fetchrow(SELECT_GEOCODE_QUERY, self.provider.name, bucket)
+        except Exception as e:
+            logger.warning(f"⚠️ 주소 캐시 조회 실패: {str(e)}")
+            return False, None
+        return (True, row["address"]) if row is not None else (False, None)
+
+    async def _db_put(self, bucket: str, address: Optional[str]):
+        try:
+            async with acquire_connection() as connection:
+                await connection.execute(INSERT_GEOCODE_QUERY, self.provider.name, bucket, address)
+        except Exception as e:
+            logger.warning(f"⚠️ 주소 캐시 저장 실패: {str(e)}")
+
+    async def _resolve(self, bucket: str, lat: float, lon: float) -> Optional[str]:
+        found, address = await self._db_get(bucket)
+        if found:
+            self._count("db_hits")
+        else:
+            self._count("provider_calls")
+            address = await self.provider.reverse(lat, lon)
+            await self._db_put(bucket, address)
+        self._remember(bucket, address)
+        return address
+
+    async def reverse(self, lat, lon) -> str:
+        """위도, 경도를 주소로 변환 (좌표가 없거나 조회 실패 시 NO_ADDRESS)"""
+        lat, lon = parse_coordinates(lat, lon)
+        if lat is None:
+            self._count("invalid")
+            return NO_ADDRESS
+
+        self._count("lookups")
+        bucket = encode_geohash(lat, lon, self.precision)
+        found, address = self._memory_get(bucket)
+        if found:
+            self._count("memory_hits")
+            return address or NO_ADDRESS
+
+        future = self._inflight.get(bucket)
+        if future is not None:
+            self._count("coalesced")
+            try:
+                address = await asyncio.shield(future)
+            except GeocodingError:
+                return NO_ADDRESS
+            return address or NO_ADDRESS
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[bucket] = future
+        try:
+            address = await self._resolve(bucket, lat, lon)
+            future.set_result(address)
+        except GeocodingError as e:
+            self._count("errors")
+            logger.warning(f"⚠️ 역지오코딩 실패 ({bucket}): {str(e)}")
+            future.set_exception(e)
+            # 기다리는 요청이 없으면 예외 미회수 경고가 나지 않도록 회수
+            future.exception()
+            return NO_ADDRESS
+        except BaseException as e:
+            future.set_exception(GeocodingError(str(e) or type(e).__name__))
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(bucket, None)
+        return address or NO_ADDRESS
+
+    def get_stats(self) -> Dict:
+        """버킷 캐시 히트율 (메모리/DB/동시 요청 합류 포함)"""
+        with self._lock:
+            stats = dict(self._stats)
+            entries = len(self._memory)
+        lookups = stats["lookups"]
+        served = stats["memory_hits"] + stats["db_hits"] + stats["coalesced"]
+        return {
+            **stats,
+            "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+            "provider": self.provider.name,
+            "precision": self.precision,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+    async def close(self):
+        await self.provider.close()
+
+
+# 프로세스 전역 역지오코더
+geocoder = ReverseGeocoder(
+    PROVIDERS.get(GEOCODING_PROVIDER, GoogleGeocodingProvider)(),
+    GEOCODE_GEOHASH_PRECISION,
+    GEOCODE_CACHE_MAX_ENTRIES,
+)
+
+
+async def reverse_geocode(lat, lon) -> str:
+    """위도, 경도를 주소로 변환 (캐시 경유)"""
+    return await geocoder.reverse(lat, lon)
@@ -1,18 +1,69 @@
 import httpx
 import os
+from typing import Optional
+from app.core.config import GEOCODE_HTTP_TIMEOUT, GEOCODE_MAX_CONNECTIONS
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
 
-async def reverse_geocode(lat: str, lon: str) -> str:
-    """위도, 경도를 주소로 변환 (Google Geocoding API)"""
-    url = (
-        f"https://maps.googleapis.com/maps/api/geocode/json?"
-        f"latlng={lat},{lon}&key={GOOGLE_API_KEY}&language=ko"
-    )
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        data = response.json()
-        if data["status"] == "OK" and data["results"]:
+# 결과가 없는 위치(바다 등)는 캐시하고, 그 외 오류 상태는 다시 시도하도록 예외로 전달
+NO_RESULT_STATUSES = {"ZERO_RESULTS"}
+
+
+class GeocodingError(Exception):
+    """제공자 호출 실패 (캐시하지 않음)"""
+
+
+class GoogleGeocodingProvider:
+    """Google Geocoding API (프로세스 전역 커넥션 풀 공유)"""
+
+    name = "google"
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=GEOCODE_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=GEOCODE_MAX_CONNECTIONS,
+                    max_keepalive_connections=GEOCODE_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def reverse(self, lat: float, lon: float) -> Optional[str]:
+        """위도, 경도를 주소로 변환 (결과 없음은 None)"""
+        try:
+            response = await self._get_client().get(
+                GEOCODE_URL,
+                params={"latlng": f"{lat},{lon}", "key": GOOGLE_API_KEY, "language": "ko"},
+            )
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise GeocodingError(str(e)) from e
+
+        if data.get("status") == "OK" and data.get("results"):
             return data["results"][0]["formatted_address"]
-        return "주소 정보 없음"
+        if data.get("status") in NO_RESULT_STATUSES:
+            return None
+        raise GeocodingError(f"Google Geocoding 상태: {data.get('status')}")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class StubGeocodingProvider:
+    """테스트/로컬 개발용 (외부 호출 없이 좌표로 고정 주소 생성)"""
+
+    name = "stub"
+
+    async def reverse(self, lat: float, lon: float) -> Optional[str]:
+        return f"테스트시 테스트구 위도{lat:.3f} 경도{lon:.3f}"
+
+    async def close(self):
+        return None
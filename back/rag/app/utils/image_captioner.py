@@ -1,14 +1,9 @@
 # app/utils/image_captioner.py
 
 import base64
-import os
 import io
 from PIL import Image
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from app.utils.llm_gateway import Priority, llm_gateway
 
 
 def resize_image(image_bytes: bytes, max_size=(512, 512)) -> bytes:
@@ -28,15 +23,19 @@ def resize_image(image_bytes: bytes, max_size=(512, 512)) -> bytes:
     return output.getvalue()
 
 
-def generate_image_caption(image_bytes: bytes) -> str:
+async def generate_image_caption(image_bytes: bytes) -> str:
     # 비용 절감을 위해 해상도 축소
-    resized_bytes = resize_image(image_bytes)
+    return await generate_caption_from_jpeg(resize_image(image_bytes))
+
 
+async def generate_caption_from_jpeg(resized_bytes: bytes) -> str:
+    """이미 축소된 JPEG로 캡션 생성 (image_preprocess.prepare_image의 caption_bytes)"""
     # base64 인코딩
     encoded_image = base64.b64encode(resized_bytes).decode("utf-8")
 
-    response = client.chat.completions.create(
+    caption = await llm_gateway.chat(
         model="gpt-4o-mini",
+        priority=Priority.INGEST,
         messages=[
             {
                 "role": "user",
@@ -63,4 +62,4 @@ def generate_image_caption(image_bytes: bytes) -> str:
         ],
     )
 
-    return response.choices[0].message.content.strip()
+    return caption.strip()
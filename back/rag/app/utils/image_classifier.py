@@ -1,8 +1,8 @@
 # app/utils/image_classifier.py
 
-from google.cloud import vision
 from dotenv import load_dotenv
 import os
+from app.utils.vision_ocr import analyze_image, text_score
 
 # .env 파일에서 GOOGLE_APPLICATION_CREDENTIALS 변수 로드
 load_dotenv()
@@ -20,21 +20,10 @@ os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = (
 
 
 def classify_image_from_bytes(image_bytes: bytes) -> float:
-    client = vision.ImageAnnotatorClient()
+    """텍스트 점수만 필요한 경우 (텍스트도 필요하면 analyze_image 결과를 그대로 사용)"""
+    return analyze_image(image_bytes).text_score
 
-    image = vision.Image(content=image_bytes)
-    response = client.text_detection(image=image)
 
-    if response.error.message:
-        raise Exception(f"Google Vision API Error: {response.error.message}")
-
-    annotations = response.text_annotations
-    if not annotations:
-        return 0.0  # 텍스트 없음
-
-    full_text = annotations[0].description
-    text_length = len(full_text.strip())
-
-    # 텍스트 길이에 따라 0~1 점수 계산
-    score = min(1.0, text_length / 1000.0)
-    return round(score, 3)
+def text_score_from_text(full_text: str) -> float:
+    """OCR 결과로 바로 점수 계산 (OCR을 이미 했다면 Vision을 다시 호출하지 않음)"""
+    return text_score(full_text)
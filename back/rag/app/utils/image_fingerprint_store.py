@@ -0,0 +1,202 @@
+# app/utils/image_fingerprint_store.py
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from app.core.config import PHASH_MAX_DISTANCE, FINGERPRINT_RECENT_PER_USER
+from app.utils.db_pool import acquire_connection
+from app.utils.image_preprocess import hamming_distance, phash_bands, to_signed64
+
+logger = logging.getLogger(__name__)
+
+# 4구간 중 하나라도 같은 후보만 인덱스로 가져온 뒤 해밍 거리 계산
+SELECT_CANDIDATES_QUERY = """
+SELECT access_id, phash, caption, ocr_text
+FROM image_fingerprints
+WHERE user_id = $1
+AND (band0 = $2 OR band1 = $3 OR band2 = $4 OR band3 = $5);
+"""
+
+INSERT_FINGERPRINT_QUERY = """
+INSERT INTO image_fingerprints
+    (user_id, access_id, phash, band0, band1, band2, band3, caption, ocr_text)
+VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+ON CONFLICT (user_id, access_id) DO NOTHING;
+"""
+
+
+class NearDuplicate(BaseModel):
+    """
+    유사 사진의 처리 결과 (vector는 최근 처리분에만 있음)
+
+    캡션은 새 사진이 사진(photo)일 때만, 벡터는 OCR 텍스트까지 같을 때만 재사용
+    """
+
+    access_id: str
+    phash: int
+    caption: str
+    ocr_text: str
+    vector: Optional[List[float]] = None
+
+
+class FingerprintReservation:
+    """처리 중인 사진 (같은 버스트의 다른 사진은 이 결과를 기다림)"""
+
+    def __init__(self, user_id: str, phash: int):
+        self.user_id = user_id
+        self.phash = phash
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class FingerprintStore:
+    """
+    pHash 기반 유사 사진 조회
+
+    - 메모리: 사용자별 최근 처리 결과 (임베딩 포함)
+    - 처리 중: 동시에 올라온 버스트 사진은 먼저 시작한 사진의 결과를 기다림
+    - Postgres image_fingerprints: 재시작 후에도 캡션 재사용
+    """
+
+    def __init__(self, max_distance: int, recent_per_user: int):
+        self.max_distance = max_distance
+        self.recent_per_user = recent_per_user
+        self._recent: Dict[str, Deque[NearDuplicate]] = {}
+        self._pending: Dict[str, List[FingerprintReservation]] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "lookups": 0,
+            "memory_hits": 0,
+            "pending_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+        }
+
+    def _count(self, field: str):
+        with self._lock:
+            self._stats[field] += 1
+
+    def _closest(self, entries, phash: int):
+        best, best_distance = None, self.max_distance + 1
+        for entry in entries:
+            distance = hamming_distance(entry.phash, phash)
+            if distance < best_distance:
+                best, best_distance = entry, distance
+        return best
+
+    async def _db_find(self, user_id: str, phash: int) -> Optional[NearDuplicate]:
+        try:
+            async with acquire_connection() as connection:
+                rows = await connection.fetch(
+                    SELECT_CANDIDATES_QUERY, user_id, *phash_bands(phash)
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ 유사 사진 조회 실패: {str(e)}")
+            return None
+        candidates = [
+            NearDuplicate(
+                access_id=row["access_id"],
+                phash=row["phash"] & 0xFFFFFFFFFFFFFFFF,
+                caption=row["caption"] or "",
+                ocr_text=row["ocr_text"] or "",
+            )
+            for row in rows
+        ]
+        return self._closest(candidates, phash)
+
+    async def lookup(
+        self, user_id: str, phash: int
+    ) -> Tuple[Optional[NearDuplicate], Optional[FingerprintReservation]]:
+        """
+        유사 사진 조회 → (재사용할 결과, 예약)
+
+        결과가 없으면 예약을 반환하며, 호출한 쪽은 처리 후 complete()를 반드시 호출
+        """
+        self._count("lookups")
+        while True:
+            with self._lock:
+                recent = self._closest(self._recent.get(user_id, ()), phash)
+                pending = reservation = None
+                if recent is None:
+                    pending = self._closest(self._pending.get(user_id, ()), phash)
+                    if pending is None:
+                        reservation = FingerprintReservation(user_id, phash)
+                        self._pending.setdefault(user_id, []).append(reservation)
+
+            if recent is not None:
+                self._count("memory_hits")
+                return recent, None
+            if pending is None:
+                break
+
+            duplicate = await asyncio.shield(pending.future)
+            if duplicate is not None:
+                self._count("pending_hits")
+                return duplicate, None
+            # 먼저 시작한 사진이 실패하면 다시 조회 후 직접 처리
+
+        duplicate = await self._db_find(user_id, phash)
+        if duplicate is not None:
+            self._count("db_hits")
+            self.complete(reservation, duplicate)
+            return duplicate, None
+
+        self._count("misses")
+        return None, reservation
+
+    def complete(
+        self, reservation: Optional[FingerprintReservation], result: Optional[NearDuplicate]
+    ):
+        """예약 해제 (result=None이면 처리 실패, 기다리던 사진은 직접 처리)"""
+        if reservation is None:
+            return
+        with self._lock:
+            pending = self._pending.get(reservation.user_id, [])
+            if reservation in pending:
+                pending.remove(reservation)
+            if not pending:
+                self._pending.pop(reservation.user_id, None)
+            if result is not None:
+                recent = self._recent.setdefault(
+                    reservation.user_id, deque(maxlen=self.recent_per_user)
+                )
+                recent.append(result)
+        if not reservation.future.done():
+            reservation.future.set_result(result)
+
+    async def save(self, user_id: str, entry: NearDuplicate):
+        """DB에 지문 저장 (실패해도 업로드는 계속)"""
+        try:
+            async with acquire_connection() as connection:
+                await connection.execute(
+                    INSERT_FINGERPRINT_QUERY,
+                    user_id,
+                    entry.access_id,
+                    to_signed64(entry.phash),
+                    *phash_bands(entry.phash),
+                    entry.caption,
+                    entry.ocr_text,
+                )
+        except Exception as e:
+            logger.warning(f"⚠️ 이미지 지문 저장 실패: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            recent = sum(len(entries) for entries in self._recent.values())
+            pending = sum(len(entries) for entries in self._pending.values())
+        lookups = stats["lookups"]
+        reused = stats["memory_hits"] + stats["pending_hits"] + stats["db_hits"]
+        return {
+            **stats,
+            "reuse_rate": round(reused / lookups, 4) if lookups else 0.0,
+            "max_distance": self.max_distance,
+            "recent_entries": recent,
+            "pending": pending,
+        }
+
+
+# 프로세스 전역 지문 저장소
+fingerprint_store = FingerprintStore(PHASH_MAX_DISTANCE, FINGERPRINT_RECENT_PER_USER)
@@ -0,0 +1,110 @@
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.utils.db_pool import acquire_connection
+from app.utils.geo_utils import encode_geohash
+
+logger = logging.getLogger(__name__)
+
+# 이미지 정보 INSERT (image_time은 EXIF 촬영 시각, 위치는 위도/경도/geohash 컬럼)
+INSERT_IMAGE_QUERY = """
+INSERT INTO images (user_id, access_id, caption, image_time, latitude, longitude, geohash)
+VALUES ($1, $2, $3, $4, $5, $6, $7)
+ON CONFLICT (user_id, access_id) DO UPDATE SET caption = EXCLUDED.caption
+RETURNING id;
+"""
+
+# 클립보드 일괄 INSERT (배열 unnest로 한 번의 왕복)
+INSERT_CLIPBOARD_ITEMS_QUERY = """
+INSERT INTO clipboard_items (user_id, image_id, type, value, created_at)
+SELECT $1, $2, item.type, item.value, $5
+FROM unnest($3::text[], $4::text[]) AS item(type, value);
+"""
+
+# 키워드 일괄 INSERT (배열 unnest로 한 번의 왕복)
+INSERT_IMAGE_KEYWORDS_QUERY = """
+INSERT INTO image_keywords (user_id, image_id, keyword, created_at)
+SELECT $1, $2, keyword, $4
+FROM unnest($3::text[]) AS keyword;
+"""
+
+
+async def image_exists(user_id: str, access_id: str) -> bool:
+    """이미 등록된 이미지인지 확인"""
+    check_query = "SELECT id FROM images WHERE user_id = $1 AND access_id = $2;"
+    async with acquire_connection() as connection:
+        existing = await connection.fetchval(check_query, user_id, access_id)
+    return existing is not None
+
+
+async def save_image_keywords(
+    user_id: str,
+    access_id: str,
+    caption: str,
+    image_time: Optional[datetime],
+    keywords: List[str],
+    clipboard_items: List[Dict],
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+) -> Dict[str, float]:
+    """이미지, 클립보드, 키워드를 한 트랜잭션에서 일괄 저장하고 단계별 소요 시간(초) 반환"""
+    db_timings = {}
+    created_at = datetime.utcnow()
+    geohash = (
+        encode_geohash(latitude, longitude)
+        if latitude is not None and longitude is not None
+        else None
+    )
+
+    acquire_start = time.perf_counter()
+    async with acquire_connection() as connection:
+        db_timings["acquire"] = time.perf_counter() - acquire_start
+
+        transaction_start = time.perf_counter()
+        async with connection.transaction():
+            phase_start = time.perf_counter()
+            await connection.execute(
+                INSERT_IMAGE_QUERY,
+                user_id,
+                access_id,
+                caption,
+                image_time,
+                latitude,
+                longitude,
+                geohash,
+            )
+            db_timings["image_insert"] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            if clipboard_items:
+                await connection.execute(
+                    INSERT_CLIPBOARD_ITEMS_QUERY,
+                    user_id,
+                    access_id,
+                    [item["type"] for item in clipboard_items],
+                    [item["value"] for item in clipboard_items],
+                    created_at,
+                )
+            db_timings["clipboard_insert"] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            if keywords:
+                await connection.execute(
+                    INSERT_IMAGE_KEYWORDS_QUERY,
+                    user_id,
+                    access_id,
+                    keywords,
+                    created_at,
+                )
+            db_timings["keyword_insert"] = time.perf_counter() - phase_start
+
+            commit_start = time.perf_counter()
+        db_timings["commit"] = time.perf_counter() - commit_start
+        db_timings["transaction"] = time.perf_counter() - transaction_start
+
+    logger.info(
+        f"💾 DB 일괄 저장 - 키워드 {len(keywords)}개, 클립보드 {len(clipboard_items)}개 "
+        f"(트랜잭션 {db_timings['transaction']:.3f}초)"
+    )
+    return db_timings
@@ -0,0 +1,98 @@
+# app/utils/image_preprocess.py
+
+import io
+import logging
+from typing import Tuple
+import numpy as np
+from PIL import Image, ImageOps
+from pydantic import BaseModel
+from app.core.config import CAPTION_IMAGE_MAX_SIDE, OCR_IMAGE_MAX_SIDE
+
+logger = logging.getLogger(__name__)
+
+# Vision API에 원본 그대로 보내도 되는 형식 (재인코딩 없이 전송)
+PASSTHROUGH_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+# pHash 계산용 DCT 행렬 (32x32 → 좌상단 8x8 저주파 성분 사용)
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+_n = np.arange(_DCT_SIZE)
+_DCT_MATRIX = np.cos(np.pi * (2 * _n[None, :] + 1) * _n[:, None] / (2 * _DCT_SIZE))
+
+
+class PreparedImage(BaseModel):
+    """한 번 디코딩한 이미지에서 만든 단계별 입력"""
+
+    caption_bytes: bytes  # 캡션(GPT)용 JPEG, 긴 변 CAPTION_IMAGE_MAX_SIDE
+    ocr_bytes: bytes  # OCR(Vision)용, 긴 변 OCR_IMAGE_MAX_SIDE 이하면 원본 그대로
+    phash: int  # 64비트 perceptual hash (유사 사진 판별)
+    width: int
+    height: int
+
+
+def _encode_jpeg(image: Image.Image, max_side: int, quality: int) -> bytes:
+    resized = image.copy()
+    resized.thumbnail((max_side, max_side))
+    output = io.BytesIO()
+    resized.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+
+def phash_from_pixels(pixels: np.ndarray) -> int:
+    """32x32 흑백 픽셀 → 64비트 pHash (DCT 저주파 8x8의 중앙값 기준 비트)"""
+    dct = _DCT_MATRIX @ pixels.astype(np.float64) @ _DCT_MATRIX.T
+    low = dct[:_HASH_SIZE, :_HASH_SIZE].flatten()
+    # 직류 성분(평균 밝기)은 제외하고 중앙값 계산
+    median = np.median(low[1:])
+    value = 0
+    for bit in low > median:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def compute_phash(image: Image.Image) -> int:
+    gray = image.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS)
+    return phash_from_pixels(np.asarray(gray))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def to_signed64(value: int) -> int:
+    """Postgres BIGINT 저장용 (부호 있는 64비트)"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def phash_bands(value: int) -> Tuple[int, int, int, int]:
+    """16비트 4구간 (거리 3 이하인 해시는 최소 한 구간이 같음 → 인덱스 조회용)"""
+    return tuple((value >> shift) & 0xFFFF for shift in (48, 32, 16, 0))
+
+
+def prepare_image(image_bytes: bytes) -> PreparedImage:
+    """
+    이미지를 한 번만 디코딩해 캡션/OCR 입력과 pHash를 함께 생성
+
+    - EXIF 회전 정보 반영
+    - OCR 입력은 작은 글자를 위해 큰 해상도 유지 (이미 충분히 작으면 원본 바이트 사용)
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    source_format = image.format
+    image = ImageOps.exif_transpose(image)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    width, height = image.size
+
+    caption_bytes = _encode_jpeg(image, CAPTION_IMAGE_MAX_SIDE, quality=85)
+    if max(width, height) <= OCR_IMAGE_MAX_SIDE and source_format in PASSTHROUGH_FORMATS:
+        ocr_bytes = image_bytes
+    else:
+        ocr_bytes = _encode_jpeg(image, OCR_IMAGE_MAX_SIDE, quality=90)
+
+    return PreparedImage(
+        caption_bytes=caption_bytes,
+        ocr_bytes=ocr_bytes,
+        phash=compute_phash(image),
+        width=width,
+        height=height,
+    )
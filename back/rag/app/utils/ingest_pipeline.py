@@ -0,0 +1,254 @@
+import asyncio
+import time
+import logging
+from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import INGEST_STAGE_LIMITS
+from app.utils.image_captioner import generate_caption_from_jpeg
+from app.utils.vision_ocr import analyze_image_async
+from app.utils.embedding import get_text_embedding_async
+from app.utils.image_preprocess import prepare_image
+from app.utils.image_fingerprint_store import NearDuplicate, fingerprint_store
+from app.utils.vector_store import upsert_text_vector
+from app.utils.vector_metadata import build_image_metadata, parse_image_time
+from app.utils.geo_utils import parse_coordinates
+from app.utils.cache_invalidation import invalidate_user_cache
+from app.utils.keyword_extractor import extract_keywords
+from app.utils.geocoding import reverse_geocode
+from app.utils.context_keywords import parse_time_keywords, parse_address_keywords
+from app.utils.clipboard_info_extractor import extract_clipboard_items
+from app.utils.image_keyword_store import image_exists, save_image_keywords
+
+logger = logging.getLogger(__name__)
+
+# 블로킹 단계(전처리, Pinecone)를 모두 동시에 돌릴 수 있는 크기
+# (OCR은 vision_ocr 배치 스레드, 캡션/키워드/일정 추출은 llm_gateway 비동기 호출로 처리)
+BLOCKING_STAGES = ["preprocess", "pinecone"]
+executor = ThreadPoolExecutor(
+    max_workers=sum(INGEST_STAGE_LIMITS[stage] for stage in BLOCKING_STAGES)
+)
+
+# 단계별 동시 실행 제한 (요청 간에 공유)
+stage_semaphores = {
+    stage: asyncio.Semaphore(limit) for stage, limit in INGEST_STAGE_LIMITS.items()
+}
+
+# 단계별 처리 지표
+stage_metrics = {
+    stage: {"active": 0, "waiting": 0, "completed": 0, "errors": 0, "busy_time": 0.0, "wait_time": 0.0}
+    for stage in INGEST_STAGE_LIMITS
+}
+
+
+async def run_stage(stage: str, func, *args):
+    """단계별 세마포어 안에서 함수 실행 (동기 함수는 전용 스레드풀에서 실행)"""
+    metrics = stage_metrics[stage]
+    wait_start = time.perf_counter()
+    metrics["waiting"] += 1
+    try:
+        await stage_semaphores[stage].acquire()
+    finally:
+        metrics["waiting"] -= 1
+    metrics["wait_time"] += time.perf_counter() - wait_start
+
+    metrics["active"] += 1
+    busy_start = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor, func, *args)
+    except Exception:
+        metrics["errors"] += 1
+        raise
+    finally:
+        metrics["active"] -= 1
+        metrics["completed"] += 1
+        metrics["busy_time"] += time.perf_counter() - busy_start
+        stage_semaphores[stage].release()
+
+
+def get_stage_stats() -> Dict:
+    """단계별 제한 및 처리 지표 반환"""
+    stats = {}
+    for stage, metrics in stage_metrics.items():
+        completed = metrics["completed"]
+        stats[stage] = {
+            "limit": INGEST_STAGE_LIMITS[stage],
+            "active": metrics["active"],
+            "waiting": metrics["waiting"],
+            "completed": completed,
+            "errors": metrics["errors"],
+            "avg_busy_ms": round(metrics["busy_time"] / completed * 1000, 1) if completed else 0.0,
+            "avg_wait_ms": round(metrics["wait_time"] / completed * 1000, 1) if completed else 0.0,
+        }
+    return stats
+
+
+async def ingest_image_keyword(
+    user_id: str,
+    access_id: str,
+    image_time: str,
+    latitude: str,
+    longitude: str,
+    image_bytes: bytes,
+) -> Dict:
+    """이미지 한 장에 대한 캡션/OCR/임베딩/키워드/주소/DB 저장 파이프라인"""
+    total_start_time = time.time()
+    timings = {}
+
+    # access_id 중복 체크
+    phase_start = time.time()
+    existing = await run_stage("postgres", image_exists, user_id, access_id)
+    timings["duplicate_check"] = time.time() - phase_start
+    logger.info(f"✅ 중복 체크 완료: {timings['duplicate_check']:.3f}초")
+
+    if existing:
+        logger.info(f"⚠️ 이미 존재하는 이미지 - access_id: {access_id}")
+        return {
+            "user_id": user_id,
+            "access_id": access_id,
+            "status": "skipped",
+            "message": "이미 등록된 이미지입니다.",
+        }
+
+    # 한 번 디코딩해 캡션/OCR 입력과 pHash 생성
+    phase_start = time.time()
+    prepared = await run_stage("preprocess", prepare_image, image_bytes)
+    timings["preprocess"] = time.time() - phase_start
+
+    # 유사 사진(연속 촬영)이면 캡션 재사용
+    # pHash는 화면 배치에 좌우되어 다른 내용의 스크린샷도 가깝게 나오므로 OCR은 항상 새로 실행
+    duplicate, reservation = await fingerprint_store.lookup(user_id, prepared.phash)
+    try:
+        phase_start = time.time()
+        if duplicate is not None:
+            analysis = await run_stage("ocr", analyze_image_async, prepared.ocr_bytes)
+            ocr_text = analysis.text
+            if analysis.is_photo and duplicate.caption:
+                caption = duplicate.caption
+                logger.info(f"♻️ 유사 사진 캡션 재사용: {duplicate.access_id} → {access_id}")
+            else:
+                caption = await run_stage(
+                    "caption", generate_caption_from_jpeg, prepared.caption_bytes
+                )
+        else:
+            # 캡션 생성과 OCR을 동시에 처리
+            # (일괄 업로드 중 동시에 들어온 OCR 요청은 batch_annotate_images로 묶여 처리됨)
+            caption, analysis = await asyncio.gather(
+                run_stage("caption", generate_caption_from_jpeg, prepared.caption_bytes),
+                run_stage("ocr", analyze_image_async, prepared.ocr_bytes),
+            )
+            ocr_text = analysis.text
+        timings["caption_ocr"] = time.time() - phase_start
+        logger.info(f"✅ 캡션 생성 및 OCR 동시 처리 완료: {timings['caption_ocr']:.3f}초")
+
+        # 임베딩, 키워드 추출, 주소 변환을 동시에 처리
+        phase_start = time.time()
+        combined_text = f"{access_id}: {ocr_text} {caption}".strip()
+
+        async def embed() -> list:
+            # 캡션과 OCR이 모두 같으면 접두사(access_id)만 다른 텍스트이므로 유사 사진의 벡터를 그대로 사용
+            if (
+                duplicate is not None
+                and duplicate.vector is not None
+                and (caption, ocr_text) == (duplicate.caption, duplicate.ocr_text)
+            ):
+                return duplicate.vector
+            return await run_stage("embedding", get_text_embedding_async, combined_text)
+
+        vector, keywords, address = await asyncio.gather(
+            embed(),
+            run_stage("keywords", extract_keywords, caption),
+            run_stage("geocoding", reverse_geocode, latitude, longitude),
+        )
+    except BaseException:
+        fingerprint_store.complete(reservation, None)
+        raise
+
+    fingerprint = NearDuplicate(
+        access_id=access_id,
+        phash=prepared.phash,
+        caption=caption,
+        ocr_text=ocr_text,
+        vector=vector,
+    )
+    fingerprint_store.complete(reservation, fingerprint)
+    timings["embedding_keyword_geocode"] = time.time() - phase_start
+    logger.info(
+        f"✅ 임베딩 / 키워드 추출 / 주소 변환 완료: {timings['embedding_keyword_geocode']:.3f}초"
+    )
+    logger.info(f"🗺️ 주소 추출 결과: {address}")
+
+    # 주소 및 시각 키워드 파싱 후 최종 키워드 병합 (중복 제거)
+    time_keywords = parse_time_keywords(image_time)
+    logger.info(f"⏰ 시간 키워드: {time_keywords}")
+    address_keywords = parse_address_keywords(address)
+    full_keywords = list(set(keywords + time_keywords + address_keywords))
+
+    # 구조화 메타데이터와 함께 벡터 저장
+    phase_start = time.time()
+    metadata = build_image_metadata(
+        access_id,
+        combined_text,
+        "information",
+        image_time=image_time,
+        keywords=full_keywords,
+        caption=caption,
+        ocr=ocr_text,
+    )
+    await run_stage(
+        "pinecone", upsert_text_vector, user_id, combined_text, vector, "information", metadata
+    )
+    timings["vector_upsert"] = time.time() - phase_start
+
+    # 클립보드 정보 추출
+    clipboard_items = extract_clipboard_items(ocr_text)
+    logger.info(f"📋 클립보드 항목 수: {len(clipboard_items)}")
+
+    # 이미지 / 클립보드 / 키워드 일괄 INSERT (단일 트랜잭션)
+    # 촬영 시각과 위치는 시간/반경 검색용 컬럼으로 저장 (EXIF 시각이 없으면 NULL)
+    phase_start = time.time()
+    lat, lon = parse_coordinates(latitude, longitude)
+    db_timings = await run_stage(
+        "postgres",
+        save_image_keywords,
+        user_id,
+        access_id,
+        caption,
+        parse_image_time(image_time),
+        full_keywords,
+        clipboard_items,
+        lat,
+        lon,
+    )
+    db_timings["duplicate_check"] = timings["duplicate_check"]
+    timings["db_save"] = time.time() - phase_start
+
+    # 유사 사진 재사용을 위한 지문 저장 (새로 처리한 사진만)
+    if reservation is not None:
+        await run_stage("postgres", fingerprint_store.save, user_id, fingerprint)
+
+    # 새 사진이 반영되도록 검색 서비스의 사용자 질의 캐시 무효화
+    await invalidate_user_cache(user_id)
+
+    total_time = time.time() - total_start_time
+    logger.info(f"🎉 전체 프로세스 완료 (access_id={access_id}): {total_time:.3f}초")
+    logger.info("📊 성능 요약:")
+    for phase, elapsed in timings.items():
+        logger.info(f"  - {phase}: {elapsed:.3f}초")
+    for phase, elapsed in db_timings.items():
+        logger.info(f"    · {phase}: {elapsed:.4f}초")
+
+    return {
+        "user_id": user_id,
+        "access_id": access_id,
+        "caption": caption,
+        "keywords": keywords,
+        "reused_from": duplicate.access_id if duplicate is not None else None,
+        "status": "success",
+        "processing_time": f"{total_time:.3f}초",
+        "db_timings": {
+            phase: round(elapsed, 4) for phase, elapsed in db_timings.items()
+        },
+    }
@@ -0,0 +1,42 @@
+# app/utils/keyword_extractor.py
+
+import json
+from app.utils.llm_gateway import Priority, llm_gateway
+
+
+async def extract_keywords(caption: str) -> list[str]:
+    """사진 설명(캡션)에서 검색용 키워드 추출"""
+    prompt = (
+        f"다음 사진 설명을 보고 사람들이 검색할 수 있는 키워드를 가능한 많이 추출해줘. "
+        f"각 키워드는 한 단어로 된 명사 위주로 해줘. 중복 없이 출력하고, 결과는 JSON 배열로 줘. "
+        f'예시: ["노트북", "회의", "커피"]\n\n'
+        f"설명: {caption}"
+    )
+
+    keywords_raw = await llm_gateway.chat(
+        model="gpt-4o-mini",
+        priority=Priority.INGEST,
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 키워드 추출 전문가야. 출력은 JSON 배열로만 해. 마크다운 코드블록 쓰지 마.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+    )
+
+    # 코드블록 제거
+    if keywords_raw.startswith("```"):
+        keywords_raw = keywords_raw.strip("`").strip()
+        if keywords_raw.lower().startswith("json"):
+            keywords_raw = keywords_raw[4:].strip()
+
+    try:
+        return json.loads(keywords_raw)
+    except json.JSONDecodeError:
+        return [
+            kw.strip().strip('"')
+            for kw in keywords_raw.strip("[]").split(",")
+            if kw.strip()
+        ]
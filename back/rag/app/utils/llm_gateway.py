@@ -0,0 +1,535 @@
+# app/utils/llm_gateway.py
+
+import time
+import heapq
+import random
+import asyncio
+import logging
+import threading
+from enum import IntEnum
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+import httpx
+import openai
+from openai import AsyncOpenAI
+from app.core.config import (
+    OPENAI_API_KEY,
+    LLM_KEY_NAME,
+    LLM_MAX_CONCURRENCY,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_BACKGROUND_RESERVE,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS,
+    LLM_TIMEOUT_SECONDS,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 오류 (429, 5xx, 타임아웃, 연결 실패) - 그 외 4xx는 바로 실패
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,  # APITimeoutError 포함
+    openai.InternalServerError,
+)
+
+# max_tokens가 없는 요청의 출력 토큰 추정치
+DEFAULT_COMPLETION_TOKENS = 500
+
+
+class Priority(IntEnum):
+    """호출 우선순위 (값이 작을수록 먼저 실행)"""
+
+    INTERACTIVE = 0  # 키보드 검색 질의 (사용자가 응답을 기다림)
+    CHAT_SAVE = 1  # 대화 기록 임베딩 저장
+    INGEST = 2  # 이미지 수집 (캡션, 키워드, 일정 추출)
+
+
+def estimate_text_tokens(text: str) -> int:
+    """한글 1자 ≈ 1토큰, 영문 3~4자 ≈ 1토큰이므로 UTF-8 바이트 수 / 3으로 근사"""
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: Optional[int] = None) -> int:
+    """
+    요청 토큰 수 추정 (입력 + 출력)
+
+    이미지 입력 등 문자열이 아닌 content는 텍스트 부분만 셈 (응답 usage로 보정)
+    """
+    size = 0
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        size += estimate_text_tokens(str(content)) + 3
+    return size + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+def _retry_after(error: Exception) -> float:
+    """응답의 Retry-After 헤더 (초), 없으면 0"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return 0.0
+    try:
+        return float(response.headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TokenBucket:
+    """
+    분당 한도 (용량 = 분당 한도, 초당 한도/60씩 다시 채워짐)
+
+    분당 한도가 0 이하이면 제한 없음
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        """
+        amount를 꺼낸 뒤에도 용량의 reserve 비율만큼 남으려면 기다려야 할 시간(초)
+
+        한도보다 큰 요청도 지나갈 수 있도록 필요한 잔량은 용량까지만 요구
+        """
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            self._refill()
+            needed = min(self.capacity, min(amount, self.capacity) + self.capacity * reserve)
+            return max(0.0, (needed - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float):
+        """차감량 보정 (양수면 추가 차감, 음수면 반환)"""
+        if not self.enabled or not delta:
+            return
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+    def available(self) -> float:
+        if not self.enabled:
+            return 0.0
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "future", "enqueued_at")
+
+    def __init__(self, priority: Priority, seq: int, tokens: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class LLMScheduler:
+    """
+    API 키 하나의 호출 예산을 우선순위 순서로 나눠 주는 스케줄러
+
+    - 동시 호출 수, 분당 토큰, 분당 요청 수 안에서 대기 중인 호출을 우선순위 순(같으면 도착 순)으로 실행
+    - INTERACTIVE보다 낮은 우선순위는 각 예산의 background_reserve 비율을 남겨 두고 사용
+      → 수집/저장이 몰려도 검색 질의는 기다리지 않고 실행
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        tokens_per_minute: int,
+        requests_per_minute: int,
+        background_reserve: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.background_reserve = background_reserve
+        # 낮은 우선순위가 쓰지 못하는 동시 실행 슬롯 (최소 1개는 사용 가능)
+        self.reserved_slots = min(max_concurrency - 1, round(max_concurrency * background_reserve))
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.requests = TokenBucket(requests_per_minute)
+        self.active = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {
+            priority: {"granted": 0, "cancelled": 0, "wait_time": 0.0, "max_wait": 0.0}
+            for priority in Priority
+        }
+
+    def _wait_time(self, waiter: _Waiter) -> Optional[float]:
+        """실행까지 기다릴 시간 (동시 실행 한도에 막혔으면 None → 다른 호출이 끝날 때 다시 확인)"""
+        background = waiter.priority > Priority.INTERACTIVE
+        slots = self.max_concurrency - (self.reserved_slots if background else 0)
+        if self.active >= slots:
+            return None
+        reserve = self.background_reserve if background else 0.0
+        return max(
+            self.tokens.wait_time(waiter.tokens, reserve),
+            self.requests.wait_time(1, reserve),
+        )
+
+    def _grant(self, waiter: _Waiter):
+        self.tokens.take(waiter.tokens)
+        self.requests.take(1)
+        self.active += 1
+        waited = time.perf_counter() - waiter.enqueued_at
+        stats = self._stats[waiter.priority]
+        stats["granted"] += 1
+        stats["wait_time"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+        waiter.future.set_result(None)
+
+    def _dispatch(self):
+        """대기열 맨 앞(가장 높은 우선순위)부터 예산이 허락하는 만큼 실행"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            waiter = self._waiters[0]
+            if waiter.future.done():  # 대기 중 취소됨
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._wait_time(waiter)
+            if wait is None:
+                return
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._grant(waiter)
+
+    async def acquire(self, priority: Priority, tokens: int):
+        """예산이 생길 때까지 대기 후 실행 권한 획득 (끝나면 반드시 release 호출)"""
+        self._seq += 1
+        waiter = _Waiter(priority, self._seq, tokens, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 실행 권한을 받은 직후 취소 → 권한과 토큰 반납
+                self.release(refund=tokens)
+            else:
+                self._stats[priority]["cancelled"] += 1
+                self._dispatch()
+            raise
+
+    def release(self, refund: float = 0):
+        """호출 종료 (refund: 쓰지 않은 토큰 반환, 음수면 추가 차감)"""
+        self.active -= 1
+        self.tokens.adjust(-refund)
+        self._dispatch()
+
+    def get_stats(self) -> Dict:
+        waiting = {priority: 0 for priority in Priority}
+        for waiter in self._waiters:
+            if not waiter.future.done():
+                waiting[waiter.priority] += 1
+        queues = {}
+        for priority, stats in self._stats.items():
+            granted = stats["granted"]
+            queues[priority.name.lower()] = {
+                "waiting": waiting[priority],
+                "granted": granted,
+                "cancelled": stats["cancelled"],
+                "avg_wait_ms": round(stats["wait_time"] / granted * 1000, 1) if granted else 0.0,
+                "max_wait_ms": round(stats["max_wait"] * 1000, 1),
+            }
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "reserved_slots": self.reserved_slots,
+            "tokens_per_minute": int(self.tokens.capacity),
+            "tokens_available": int(self.tokens.available()),
+            "requests_per_minute": int(self.requests.capacity),
+            "requests_available": int(self.requests.available()),
+            "background_reserve": self.background_reserve,
+            "queues": queues,
+        }
+
+
+class LLMGateway:
+    """
+    OpenAI 호출 공용 게이트웨이 (API 키 하나당 하나)
+
+    - AsyncOpenAI 클라이언트 하나를 프로세스 전체에서 공유 (httpx 커넥션 풀, keep-alive)
+    - 모든 호출은 LLMScheduler를 거쳐 우선순위 순으로 키의 동시 호출/분당 토큰/분당 요청 예산 안에서 실행
+    - 재시도 가능한 오류는 지수 증가 상한 안에서 무작위 대기 후 재시도 (full jitter, Retry-After 우선)
+    - SDK 자체 재시도는 끄고 여기서만 재시도
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        key_name: str,
+        scheduler: LLMScheduler,
+        max_retries: int,
+        retry_base: float,
+        retry_max: float,
+        timeout: float,
+        connect_timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+    ):
+        self.api_key = api_key
+        self.key_name = key_name
+        self.scheduler = scheduler
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self._client: Optional[AsyncOpenAI] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "errors": 0,
+            "estimated_tokens": 0,
+            "used_tokens": 0,
+            "total_time": 0.0,
+        }
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key, http_client=self._http_client, max_retries=0
+            )
+        return self._client
+
+    async def close(self):
+        """애플리케이션 종료 시 커넥션 풀 정리"""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+
+    def _count(self, field: str, value=1):
+        with self._lock:
+            self._stats[field] += value
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, tokens: int):
+        """
+        같은 키 예산 안에서 실행할 호출 구간 (대화 기록 임베딩 저장 등 채팅 완성 외 호출용)
+
+        tokens는 추정치로 차감하고 보정하지 않음
+        """
+        await self.scheduler.acquire(priority, tokens)
+        self._count("estimated_tokens", tokens)
+        try:
+            yield
+        finally:
+            self.scheduler.release()
+
+    def _used_tokens(self, usage) -> Optional[int]:
+        if usage is None:
+            return None
+        self._count("used_tokens", usage.total_tokens)
+        return usage.total_tokens
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        backoff = random.uniform(0, min(self.retry_max, self.retry_base * 2**attempt))
+        return max(backoff, min(self.retry_max, _retry_after(error)))
+
+    def _handle_error(self, attempt: int, error: BaseException) -> Optional[float]:
+        """실패한 시도 기록 → 재시도 전 대기 시간 반환 (재시도하지 않으면 None)"""
+        if isinstance(error, openai.RateLimitError):
+            self._count("rate_limited")
+        if not isinstance(error, RETRYABLE_ERRORS) or attempt >= self.max_retries:
+            if not isinstance(error, asyncio.CancelledError):
+                self._count("errors")
+            return None
+        delay = self._retry_delay(attempt, error)
+        self._count("retries")
+        logger.warning(
+            f"⚠️ LLM 호출 재시도 {attempt + 1}/{self.max_retries} ({delay:.2f}초 후): {type(error).__name__}"
+        )
+        return delay
+
+    @staticmethod
+    def _params(messages, model, temperature, max_tokens, extra) -> Dict:
+        params = {"model": model, "messages": messages, **extra}
+        if temperature is not None:
+            params["temperature"] = temperature
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        return params
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs,
+    ):
+        """채팅 완성 호출 (ChatCompletion 응답 반환)"""
+        params = self._params(messages, model, temperature, max_tokens, kwargs)
+        estimate = estimate_tokens(messages, max_tokens)
+
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(priority, estimate)
+            self._count("estimated_tokens", estimate)
+            start = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(**params)
+            except BaseException as e:
+                # 처리되지 않은 요청이므로 차감한 토큰 반환
+                self.scheduler.release(refund=estimate)
+                delay = self._handle_error(attempt, e)
+                if delay is None:
+                    raise
+            else:
+                used = self._used_tokens(response.usage)
+                self.scheduler.release(refund=estimate - used if used is not None else 0)
+                return response
+            finally:
+                self._count("requests")
+                self._count("total_time", time.perf_counter() - start)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def chat(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs,
+    ) -> str:
+        """채팅 완성 호출 → 응답 텍스트"""
+        response = await self.complete(messages, model, temperature, max_tokens, priority, **kwargs)
+        return response.choices[0].message.content or ""
+
+    async def stream_chat(
+        self,
+        messages: List[Dict],
+        model: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs,
+    ) -> AsyncIterator[str]:
+        """
+        채팅 응답을 생성되는 대로 조각(str) 단위로 반환
+
+        첫 조각을 받기 전 실패만 재시도 (이미 전달한 조각은 되돌릴 수 없음)
+        """
+        params = self._params(messages, model, temperature, max_tokens, kwargs)
+        params.update(stream=True, stream_options={"include_usage": True})
+        estimate = estimate_tokens(messages, max_tokens)
+
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(priority, estimate)
+            self._count("estimated_tokens", estimate)
+            start = time.perf_counter()
+            started = False
+            used = None
+            try:
+                stream = await self.client.chat.completions.create(**params)
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        used = self._used_tokens(chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        started = True
+                        yield chunk.choices[0].delta.content
+            except BaseException as e:
+                if started:
+                    # 일부 전달된 응답은 재시도하지 않음 (토큰은 쓴 것으로 봄)
+                    self.scheduler.release()
+                    if not isinstance(e, (GeneratorExit, asyncio.CancelledError)):
+                        self._count("errors")
+                    raise
+                self.scheduler.release(refund=estimate)
+                delay = self._handle_error(attempt, e)
+                if delay is None:
+                    raise
+            else:
+                self.scheduler.release(refund=estimate - used if used is not None else 0)
+                return
+            finally:
+                self._count("requests")
+                self._count("total_time", time.perf_counter() - start)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def get_stats(self) -> Dict:
+        """호출 수, 재시도, 토큰 사용량, 우선순위별 대기열 지표 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+        requests = stats["requests"]
+        return {
+            "key": self.key_name,
+            "requests": requests,
+            "retries": stats["retries"],
+            "rate_limited": stats["rate_limited"],
+            "errors": stats["errors"],
+            "estimated_tokens": stats["estimated_tokens"],
+            "used_tokens": stats["used_tokens"],
+            "avg_request_ms": round(stats["total_time"] / requests * 1000, 1) if requests else 0.0,
+            "scheduler": self.scheduler.get_stats(),
+        }
+
+
+# 프로세스 전역 LLM 게이트웨이 (이 서비스가 쓰는 API 키의 예산)
+llm_gateway = LLMGateway(
+    api_key=OPENAI_API_KEY,
+    key_name=LLM_KEY_NAME,
+    scheduler=LLMScheduler(
+        max_concurrency=LLM_MAX_CONCURRENCY,
+        tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+        requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+        background_reserve=LLM_BACKGROUND_RESERVE,
+    ),
+    max_retries=LLM_MAX_RETRIES,
+    retry_base=LLM_RETRY_BASE_SECONDS,
+    retry_max=LLM_RETRY_MAX_SECONDS,
+    timeout=LLM_TIMEOUT_SECONDS,
+    connect_timeout=LLM_CONNECT_TIMEOUT_SECONDS,
+    max_connections=LLM_MAX_CONNECTIONS,
+    max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+)
@@ -0,0 +1,170 @@
+"""
+Pinecone 네임스페이스 재임베딩 작업 (무중단 모델 교체용)
+
+절차:
+1) EMBEDDING_MODEL=<새 모델>, EMBEDDING_MIGRATING_FROM=<이전 모델> 로 배포
+   → 새 벡터는 새 모델로 저장되고, 검색은 두 모델 벡터를 각각의 모델로 조회
+2) 네임스페이스별로 이 작업 실행 (페이지 단위 진행, 체크포인트로 재시작 가능)
+3) 모든 네임스페이스 완료 후 EMBEDDING_MIGRATING_FROM 제거
+
+실행 (back/rag 디렉터리에서):
+    python -m app.utils.reembed_namespace --namespace user1_information \
+        --target-model text-embedding-3-small
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from typing import Dict, Optional
+from app.utils.vector_store import index
+from app.utils.embedding import get_text_embeddings
+from app.utils.embedding_registry import (
+    ACTIVE_EMBEDDING_MODEL,
+    embedding_metadata,
+    get_model_info,
+    get_stamped_model,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _load_checkpoint(path: Optional[str], namespace: str, target_model: str) -> Dict:
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if (
+            checkpoint.get("namespace") == namespace
+            and checkpoint.get("target_model") == target_model
+        ):
+            return checkpoint
+    return {
+        "namespace": namespace,
+        "target_model": target_model,
+        "pagination_token": None,
+        "migrated": 0,
+        "skipped": 0,
+        "done": False,
+    }
+
+
+def _save_checkpoint(path: Optional[str], checkpoint: Dict):
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def reembed_namespace(
+    namespace: str,
+    target_model: str = ACTIVE_EMBEDDING_MODEL,
+    page_size: int = 100,
+    checkpoint_path: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    pause_seconds: float = 0.0,
+) -> Dict:
+    """
+    네임스페이스의 벡터를 target_model로 다시 임베딩 (id 유지, 메타데이터 모델 정보 갱신)
+
+    이미 target_model로 저장된 벡터는 건너뛰고, 페이지마다 체크포인트를 저장
+    """
+    model_info = get_model_info(target_model)
+    index_dimension = index.describe_index_stats()["dimension"]
+    if model_info["dimensions"] != index_dimension:
+        raise ValueError(
+            f"모델 차원({model_info['dimensions']})이 인덱스 차원({index_dimension})과 다릅니다."
+        )
+
+    checkpoint = _load_checkpoint(checkpoint_path, namespace, target_model)
+    if checkpoint["done"]:
+        logger.info(f"✅ 이미 완료된 네임스페이스: {namespace}")
+        return checkpoint
+
+    pages = 0
+    while True:
+        page_start = time.time()
+        listing = index.list_paginated(
+            namespace=namespace,
+            limit=page_size,
+            pagination_token=checkpoint["pagination_token"],
+        )
+        ids = [vector.id for vector in listing.vectors]
+
+        if ids:
+            fetched = index.fetch(ids=ids, namespace=namespace).vectors
+            targets = [
+                vector
+                for vector in fetched.values()
+                if get_stamped_model(vector.metadata) != target_model
+                and (vector.metadata or {}).get("text", "").strip()
+            ]
+            checkpoint["skipped"] += len(ids) - len(targets)
+
+            if targets:
+                embeddings = get_text_embeddings(
+                    [vector.metadata["text"] for vector in targets], target_model
+                )
+                index.upsert(
+                    vectors=[
+                        {
+                            "id": vector.id,
+                            "values": embedding,
+                            "metadata": {
+                                **vector.metadata,
+                                **embedding_metadata(target_model),
+                            },
+                        }
+                        for vector, embedding in zip(targets, embeddings)
+                    ],
+                    namespace=namespace,
+                )
+                checkpoint["migrated"] += len(targets)
+
+        next_token = listing.pagination.next if listing.pagination else None
+        checkpoint["pagination_token"] = next_token
+        checkpoint["done"] = next_token is None
+        _save_checkpoint(checkpoint_path, checkpoint)
+
+        pages += 1
+        logger.info(
+            f"🔁 재임베딩 진행 ({namespace}): 페이지 {pages}, 누적 {checkpoint['migrated']}개 변환 / "
+            f"{checkpoint['skipped']}개 건너뜀 ({time.time() - page_start:.3f}초)"
+        )
+
+        if checkpoint["done"] or (max_pages and pages >= max_pages):
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+    return checkpoint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pinecone 네임스페이스 재임베딩")
+    parser.add_argument("--namespace", required=True)
+    parser.add_argument("--target-model", default=ACTIVE_EMBEDDING_MODEL)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--checkpoint", default=None, help="체크포인트 JSON 경로")
+    parser.add_argument("--max-pages", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=0.0, help="페이지 사이 대기(초)")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="[%(asctime)s] %(levelname)s - %(message)s"
+    )
+    result = reembed_namespace(
+        args.namespace,
+        args.target_model,
+        args.page_size,
+        args.checkpoint or f"reembed_{args.namespace}.json",
+        args.max_pages,
+        args.pause,
+    )
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
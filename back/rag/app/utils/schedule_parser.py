@@ -1,16 +1,11 @@
 from pydantic import BaseModel, Field
-from langchain_openai import ChatOpenAI
 from langchain.output_parsers import PydanticOutputParser
-from langchain.prompts import ChatPromptTemplate
-from app.core.config import OPENAI_API_KEY
+from app.utils.llm_gateway import Priority, llm_gateway
 from typing import Optional
 
 # LLM 설정
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    temperature=0.2,
-    openai_api_key=OPENAI_API_KEY,
-)
+SCHEDULE_MODEL = "gpt-4o-mini"
+SCHEDULE_TEMPERATURE = 0.2
 
 
 # 응답 스키마 정의
@@ -44,19 +39,21 @@ template = """
 분석할 문장: {text}
 """
 
-prompt = ChatPromptTemplate.from_template(template)
-
-# LangChain 체인 구성
-chain = prompt | llm | parser
-
 
 # 최종 유틸 함수
-def extract_schedule(text: str) -> dict:
+async def extract_schedule(text: str) -> dict:
     try:
-        # LangChain 체인을 통한 처리
-        result = chain.invoke(
-            {"text": text, "format_instructions": parser.get_format_instructions()}
+        # 프롬프트 구성 → 공용 LLM 게이트웨이 호출 → 스키마로 파싱
+        prompt = template.format(
+            text=text, format_instructions=parser.get_format_instructions()
+        )
+        content = await llm_gateway.chat(
+            model=SCHEDULE_MODEL,
+            priority=Priority.INGEST,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=SCHEDULE_TEMPERATURE,
         )
+        result = parser.parse(content)
 
         # 결과를 딕셔너리로 변환
         return result.model_dump()
@@ -0,0 +1,224 @@
+# app/utils/search_plan.py
+
+import re
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Literal
+from pydantic import BaseModel, ValidationError
+from app.core.config import RAG_SEARCH_PLAN_MODEL, RAG_RERANK_LEXICAL_WEIGHT
+from app.utils.llm_gateway import llm_gateway
+from app.utils.semantic_search import (
+    build_answer_prompt,
+    determine_query_intent,
+    format_expansion_context,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODES = ("plan", "legacy")
+
+# 재정렬 후 남기는 최대 결과 수 (기존 LLM 필터링과 동일)
+RERANK_MAX_ITEMS = 7
+
+# 재정렬 대상 상위 결과 수 (기존 LLM 필터링에 넘기던 개수)
+RERANK_CANDIDATES = 10
+
+# 최고 점수 대비 남길 비율 (사진 찾기는 관대하게, 정보 요청은 엄격하게)
+RERANK_THRESHOLD = {"photo_search": 0.6, "info_request": 0.8}
+
+# 글자 겹침 계산에서 뺄 요청 표현 (결과 내용과 무관)
+REQUEST_WORDS = ["찾아줘", "찾아", "보여줘", "보여", "알려줘", "알려", "사진", "이미지", "있어", "있나"]
+
+PLAN_SYSTEM_PROMPT = """
+너는 사용자의 사진/정보 검색 질문을 분석해 검색 계획을 만드는 도우미야.
+- expanded_queries: 질문과 유사한 의미를 가진 질문 3~5개. 정보 검색에 유용하도록 명확하고 직관적으로, 실제 사용자가 검색할 법한 자연스러운 문장으로 만들어줘.
+- needs_context: 과거 대화 내용이 없으면 이해하기 어려운 질문이면 true, 아니면 false
+- intent: 사진을 찾거나 보여 달라는 질문이면 "photo_search", 정보를 묻는 질문이면 "info_request"
+""".strip()
+
+# 구조화 출력 스키마 (모든 필드 필수, 추가 필드 없음)
+PLAN_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "search_plan",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "expanded_queries": {"type": "array", "items": {"type": "string"}},
+                "needs_context": {"type": "boolean"},
+                "intent": {"type": "string", "enum": ["photo_search", "info_request"]},
+            },
+            "required": ["expanded_queries", "needs_context", "intent"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+class SearchPlan(BaseModel):
+    """검색 계획 (쿼리 확장 / 맥락 필요 여부 / 질문 의도를 한 번에)"""
+
+    expanded_queries: List[str]
+    needs_context: bool
+    intent: Literal["photo_search", "info_request"]
+
+
+async def plan_search(query: str, history: List[Dict]) -> SearchPlan:
+    """
+    구조화 출력 요청 1회로 검색 계획 생성
+
+    기존 경로의 쿼리 확장 / needs_context / 의도 파악을 대신함
+    응답이 스키마와 맞지 않으면 원본 질문과 키워드 기반 의도로 대체
+    """
+    content = await llm_gateway.chat(
+        messages=[
+            {"role": "system", "content": PLAN_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f'사용자 질문: "{query}"{format_expansion_context(history)}',
+            },
+        ],
+        model=RAG_SEARCH_PLAN_MODEL,
+        temperature=0.5,
+        max_tokens=400,
+        response_format=PLAN_RESPONSE_FORMAT,
+    )
+    try:
+        plan = SearchPlan.model_validate_json(content)
+    except ValidationError as e:
+        logger.warning(f"⚠️ 검색 계획 파싱 실패, 원본 질문으로 검색: {str(e)}")
+        return SearchPlan(
+            expanded_queries=[query],
+            needs_context=bool(history),
+            intent=determine_query_intent(query),
+        )
+
+    if not plan.expanded_queries:
+        plan.expanded_queries = [query]
+    return plan
+
+
+async def generate_answer_from_plan(
+    query: str,
+    info_results: List[Dict],
+    photo_results: List[Dict],
+    history: List[Dict],
+) -> str:
+    """재정렬된 결과로 답변 생성 (기존 경로와 같은 프롬프트, 공용 LLM 게이트웨이 사용)"""
+    prompt = build_answer_prompt(query, info_results, photo_results, history)
+    if prompt is None:
+        return f"'{query}'에 대한 관련 정보를 찾을 수 없었습니다."
+
+    answer = await llm_gateway.chat(
+        messages=[{"role": "user", "content": prompt}],
+        model="gpt-4o-mini",
+        temperature=0.5,
+        max_tokens=300,
+    )
+    return answer.strip()
+
+
+def _bigrams(text: str) -> set:
+    """공백/기호를 뺀 글자 2-gram (한국어 조사/어미 변화에 덜 민감)"""
+    compact = re.sub(r"[\W_]+", "", text.lower())
+    if len(compact) < 2:
+        return {compact} if compact else set()
+    return {compact[i : i + 2] for i in range(len(compact) - 1)}
+
+
+def _coverage(query_grams: set, text_grams: set) -> float:
+    if not query_grams:
+        return 0.0
+    return len(query_grams & text_grams) / len(query_grams)
+
+
+def _strip_request_words(query: str) -> str:
+    for word in REQUEST_WORDS:
+        query = query.replace(word, " ")
+    return query
+
+
+def rerank_items(
+    query: str, expanded_queries: List[str], items: List[Dict], intent: str
+) -> List[Dict]:
+    """
+    LLM 필터링을 대신하는 로컬 재정렬
+
+    - 점수 = 벡터 유사도 + RAG_RERANK_LEXICAL_WEIGHT * 질문/확장 질문과의 글자 겹침 비율
+    - 최고 점수 대비 의도별 비율(RERANK_THRESHOLD) 이상인 결과만 최대 RERANK_MAX_ITEMS개 반환
+    """
+    if len(items) <= 3:
+        return items
+
+    query_grams = _bigrams(_strip_request_words(query))
+    expanded_grams = set()
+    for expanded in expanded_queries:
+        expanded_grams |= _bigrams(_strip_request_words(expanded))
+
+    scored = []
+    for item in items[:RERANK_CANDIDATES]:
+        text_grams = _bigrams(item.get("text", ""))
+        lexical = 0.7 * _coverage(query_grams, text_grams) + 0.3 * _coverage(
+            expanded_grams, text_grams
+        )
+        scored.append((item.get("score", 0.0) + RAG_RERANK_LEXICAL_WEIGHT * lexical, item))
+    scored.sort(key=lambda entry: entry[0], reverse=True)
+
+    threshold = scored[0][0] * RERANK_THRESHOLD.get(intent, 0.8)
+    return [item for score, item in scored if score >= threshold][:RERANK_MAX_ITEMS]
+
+
+class SearchLatencyStats:
+    """
+    실행 방식(plan/legacy)별 /rag/search/ 지연 시간
+
+    최근 window개 요청의 전체 시간 분포와 단계별 평균을 함께 기록해 두 경로를 비교
+    """
+
+    def __init__(self, window: int = 500):
+        self._lock = threading.Lock()
+        self._totals = {mode: deque(maxlen=window) for mode in SEARCH_MODES}
+        self._requests = {mode: 0 for mode in SEARCH_MODES}
+        self._stages: Dict[str, Dict[str, List[float]]] = {mode: {} for mode in SEARCH_MODES}
+
+    def record(self, mode: str, timings: Dict[str, float]):
+        with self._lock:
+            self._requests[mode] += 1
+            self._totals[mode].append(timings["total"])
+            for stage, seconds in timings.items():
+                if stage == "total":
+                    continue
+                entry = self._stages[mode].setdefault(stage, [0.0, 0])
+                entry[0] += seconds
+                entry[1] += 1
+
+    def get_stats(self) -> Dict:
+        """방식별 요청 수, 전체 시간 평균/p50/p95, 단계별 평균과 두 방식의 평균 차이 (ms)"""
+        modes = {}
+        with self._lock:
+            for mode in SEARCH_MODES:
+                totals = sorted(self._totals[mode])
+                count = len(totals)
+                modes[mode] = {
+                    "requests": self._requests[mode],
+                    "avg_total_ms": round(sum(totals) / count * 1000, 1) if count else 0.0,
+                    "p50_total_ms": round(totals[count // 2] * 1000, 1) if count else 0.0,
+                    "p95_total_ms": round(totals[min(count - 1, int(count * 0.95))] * 1000, 1)
+                    if count
+                    else 0.0,
+                    "avg_stage_ms": {
+                        stage: round(total / calls * 1000, 1)
+                        for stage, (total, calls) in self._stages[mode].items()
+                    },
+                }
+
+        saving = None
+        if modes["plan"]["requests"] and modes["legacy"]["requests"]:
+            saving = round(modes["legacy"]["avg_total_ms"] - modes["plan"]["avg_total_ms"], 1)
+        return {"modes": modes, "plan_saving_ms": saving}
+
+
+# 프로세스 전역 검색 지연 시간 지표
+search_latency = SearchLatencyStats()
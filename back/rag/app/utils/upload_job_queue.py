@@ -0,0 +1,368 @@
+# app/utils/upload_job_queue.py
+
+import json
+import time
+import asyncio
+import logging
+from uuid import uuid4
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from app.core.config import (
+    UPLOAD_JOB_WORKERS,
+    UPLOAD_JOB_MAX_ATTEMPTS,
+    UPLOAD_JOB_RETRY_BASE_SECONDS,
+    UPLOAD_JOB_LEASE_SECONDS,
+    UPLOAD_JOB_POLL_INTERVAL,
+)
+from app.utils.db_pool import acquire_connection
+from app.utils.upload_pipeline import process_image_upload
+
+logger = logging.getLogger(__name__)
+
+JOB_COLUMNS = """
+job_id, user_id, access_id, image_time, status, attempts, max_attempts,
+next_run_at, result, error, created_at, updated_at
+"""
+
+# 같은 (user_id, access_id)는 작업 하나만 유지
+# - 진행 중/완료된 작업이 있으면 그대로 반환 (멱등)
+# - 최종 실패한 작업만 새 이미지로 다시 대기열에 올림
+ENQUEUE_JOB_QUERY = f"""
+INSERT INTO upload_jobs (job_id, user_id, access_id, image_time, image, max_attempts)
+VALUES ($1, $2, $3, $4, $5, $6)
+ON CONFLICT (user_id, access_id) DO UPDATE
+SET image_time = EXCLUDED.image_time,
+    image = EXCLUDED.image,
+    max_attempts = EXCLUDED.max_attempts,
+    status = 'queued',
+    attempts = 0,
+    next_run_at = CURRENT_TIMESTAMP,
+    locked_at = NULL,
+    result = NULL,
+    error = NULL,
+    updated_at = CURRENT_TIMESTAMP
+WHERE upload_jobs.status = 'failed'
+RETURNING {JOB_COLUMNS};
+"""
+
+SELECT_JOB_BY_ACCESS_QUERY = f"""
+SELECT {JOB_COLUMNS} FROM upload_jobs WHERE user_id = $1 AND access_id = $2;
+"""
+
+SELECT_JOB_QUERY = f"""
+SELECT {JOB_COLUMNS} FROM upload_jobs WHERE job_id = $1;
+"""
+
+# 실행할 작업 하나를 잠금 후 가져옴 (여러 워커/프로세스가 같은 작업을 집지 않도록 SKIP LOCKED)
+# 임대 시간 동안 갱신되지 않은 running 작업은 워커가 죽은 것으로 보고 다시 가져감
+# 반환한 locked_at이 임대 토큰 (갱신/완료/재시도/실패 기록은 토큰이 같을 때만 적용)
+CLAIM_JOB_QUERY = f"""
+UPDATE upload_jobs
+SET status = 'running',
+    attempts = attempts + 1,
+    locked_at = CURRENT_TIMESTAMP,
+    updated_at = CURRENT_TIMESTAMP
+WHERE job_id = (
+    SELECT job_id FROM upload_jobs
+    WHERE (status = 'queued' AND next_run_at <= CURRENT_TIMESTAMP)
+       OR (status = 'running' AND locked_at < CURRENT_TIMESTAMP - make_interval(secs => $1))
+    ORDER BY next_run_at
+    FOR UPDATE SKIP LOCKED
+    LIMIT 1
+)
+RETURNING {JOB_COLUMNS}, image, locked_at;
+"""
+
+# 처리 중 임대 갱신 → 새 임대 토큰 (다른 워커가 가져갔으면 NULL)
+HEARTBEAT_JOB_QUERY = """
+UPDATE upload_jobs
+SET locked_at = CURRENT_TIMESTAMP
+WHERE job_id = $1 AND status = 'running' AND locked_at = $2
+RETURNING locked_at;
+"""
+
+COMPLETE_JOB_QUERY = """
+UPDATE upload_jobs
+SET status = 'succeeded', result = $3::jsonb, error = NULL, image = NULL,
+    locked_at = NULL, updated_at = CURRENT_TIMESTAMP
+WHERE job_id = $1 AND status = 'running' AND locked_at = $2;
+"""
+
+RETRY_JOB_QUERY = """
+UPDATE upload_jobs
+SET status = 'queued', error = $3, locked_at = NULL,
+    next_run_at = CURRENT_TIMESTAMP + make_interval(secs => $4),
+    updated_at = CURRENT_TIMESTAMP
+WHERE job_id = $1 AND status = 'running' AND locked_at = $2;
+"""
+
+FAIL_JOB_QUERY = """
+UPDATE upload_jobs
+SET status = 'failed', error = $3, image = NULL, locked_at = NULL,
+    updated_at = CURRENT_TIMESTAMP
+WHERE job_id = $1 AND status = 'running' AND locked_at = $2;
+"""
+
+COUNT_JOBS_QUERY = "SELECT status, count(*) AS count FROM upload_jobs GROUP BY status;"
+
+# 재시도 대기 시간 상한 (초)
+MAX_RETRY_DELAY = 300.0
+
+
+class UploadJob(BaseModel):
+    """업로드 작업 상태 (이미지 바이트 제외)"""
+
+    job_id: str
+    user_id: str
+    access_id: str
+    image_time: str
+    status: str
+    attempts: int
+    max_attempts: int
+    next_run_at: Optional[datetime] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+def _to_job(row) -> UploadJob:
+    values = {key: row[key] for key in UploadJob.model_fields}
+    # asyncpg는 jsonb를 문자열로 돌려줌
+    if isinstance(values["result"], str):
+        values["result"] = json.loads(values["result"])
+    return UploadJob(**values)
+
+
+def _applied(status: str) -> bool:
+    """asyncpg execute 결과("UPDATE n")로 반영 여부 판단"""
+    return not status.endswith(" 0")
+
+
+def retry_delay(attempts: int) -> float:
+    """시도 횟수별 재시도 대기 시간 (지수 증가, 상한 MAX_RETRY_DELAY)"""
+    return min(MAX_RETRY_DELAY, UPLOAD_JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+
+
+async def enqueue_upload_job(
+    user_id: str, access_id: str, image_time: str, image_bytes: bytes
+) -> Tuple[UploadJob, bool]:
+    """
+    업로드 작업 등록 → (작업, 새로 등록 여부)
+
+    같은 이미지의 작업이 이미 있으면 새로 만들지 않고 기존 작업을 반환
+    """
+    async with acquire_connection() as connection:
+        row = await connection.fetchrow(
+            ENQUEUE_JOB_QUERY,
+            str(uuid4()),
+            user_id,
+            access_id,
+            image_time,
+            image_bytes,
+            UPLOAD_JOB_MAX_ATTEMPTS,
+        )
+        if row is not None:
+            upload_worker.notify()
+            return _to_job(row), True
+        row = await connection.fetchrow(SELECT_JOB_BY_ACCESS_QUERY, user_id, access_id)
+    return _to_job(row), False
+
+
+async def get_upload_job(job_id: str) -> Optional[UploadJob]:
+    async with acquire_connection() as connection:
+        row = await connection.fetchrow(SELECT_JOB_QUERY, job_id)
+    return _to_job(row) if row is not None else None
+
+
+class UploadJobWorker:
+    """
+    upload_jobs 테이블을 대기열로 쓰는 워커 풀
+
+    - 같은 프로세스에서 등록된 작업은 바로 깨워 처리, 다른 프로세스 작업은 poll_interval마다 확인
+    - 실패하면 지수 대기 후 재시도, max_attempts를 넘으면 failed로 종료
+    - 처리 중에는 lease_seconds / 3마다 임대를 갱신하고, 임대를 잃은 작업의 결과는 기록하지 않음
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float, lease_seconds: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stats = {
+            "claimed": 0,
+            "succeeded": 0,
+            "retried": 0,
+            "failed": 0,
+            "lease_lost": 0,
+            "busy": 0,
+            "run_time": 0.0,
+        }
+
+    def start(self):
+        """애플리케이션 시작 시 워커 태스크 생성"""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"upload-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"✅ 업로드 작업 워커 시작 ({self.concurrency}개)")
+
+    async def stop(self):
+        """진행 중인 작업은 취소 (임대 시간이 지나면 다른 워커가 다시 처리)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("🗑️ 업로드 작업 워커 종료")
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _claim(self):
+        async with acquire_connection() as connection:
+            return await connection.fetchrow(CLAIM_JOB_QUERY, self.lease_seconds)
+
+    async def _run(self):
+        while True:
+            try:
+                row = await self._claim()
+            except Exception as e:
+                logger.warning(f"⚠️ 업로드 작업 조회 실패: {str(e)}")
+                row = None
+
+            if row is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._process(_to_job(row), bytes(row["image"] or b""), row["locked_at"])
+            except Exception as e:
+                # 상태 기록 실패 → 임대 시간이 지나면 다시 처리됨
+                logger.error(f"❌ 업로드 작업 상태 저장 실패 - job_id={row['job_id']}: {str(e)}")
+
+    async def _heartbeat(self, job: UploadJob, lease: Dict, stop: asyncio.Event):
+        """
+        처리가 끝날 때까지 임대 갱신 (lease["locked_at"]을 새 토큰으로 교체)
+
+        stop이 설정되면 진행 중인 갱신을 마친 뒤 종료하므로, 종료 후의 토큰으로 결과를 기록할 수 있음
+        """
+        interval = max(self.lease_seconds / 3, 1.0)
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                async with acquire_connection() as connection:
+                    locked_at = await connection.fetchval(
+                        HEARTBEAT_JOB_QUERY, job.job_id, lease["locked_at"]
+                    )
+            except Exception as e:
+                logger.warning(f"⚠️ 업로드 작업 임대 갱신 실패 - job_id={job.job_id}: {str(e)}")
+                continue
+            if locked_at is None:
+                logger.warning(f"⚠️ 업로드 작업 임대 상실 - job_id={job.job_id}")
+                return
+            lease["locked_at"] = locked_at
+
+    async def _process(self, job: UploadJob, image_bytes: bytes, locked_at: datetime):
+        self._stats["claimed"] += 1
+        self._stats["busy"] += 1
+        start = time.perf_counter()
+        lease = {"locked_at": locked_at}
+        stop = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(job, lease, stop))
+        error = None
+        try:
+            result = await process_image_upload(
+                job.user_id, job.access_id, job.image_time, image_bytes
+            )
+        except Exception as e:
+            error = str(e) or repr(e)
+        finally:
+            # 워커 종료(취소) 시에도 갱신 태스크가 스스로 끝나도록 설정
+            stop.set()
+            self._stats["busy"] -= 1
+            self._stats["run_time"] += time.perf_counter() - start
+
+        await heartbeat
+        if error is not None:
+            await self._fail(job, lease["locked_at"], error)
+            return
+
+        async with acquire_connection() as connection:
+            status = await connection.execute(
+                COMPLETE_JOB_QUERY,
+                job.job_id,
+                lease["locked_at"],
+                json.dumps(result, ensure_ascii=False),
+            )
+        if not _applied(status):
+            self._lease_lost(job)
+            return
+        self._stats["succeeded"] += 1
+        logger.info(f"✅ 업로드 작업 완료 - job_id={job.job_id}, access_id={job.access_id}")
+
+    async def _fail(self, job: UploadJob, locked_at: datetime, error: str):
+        async with acquire_connection() as connection:
+            if job.attempts < job.max_attempts:
+                delay = retry_delay(job.attempts)
+                status = await connection.execute(
+                    RETRY_JOB_QUERY, job.job_id, locked_at, error, delay
+                )
+                if not _applied(status):
+                    self._lease_lost(job)
+                    return
+                self._stats["retried"] += 1
+                logger.warning(
+                    f"⚠️ 업로드 작업 실패, {delay:.0f}초 후 재시도 ({job.attempts}/{job.max_attempts}) - access_id={job.access_id}: {error}"
+                )
+            else:
+                status = await connection.execute(FAIL_JOB_QUERY, job.job_id, locked_at, error)
+                if not _applied(status):
+                    self._lease_lost(job)
+                    return
+                self._stats["failed"] += 1
+                logger.error(f"❌ 업로드 작업 최종 실패 - access_id={job.access_id}: {error}")
+
+    def _lease_lost(self, job: UploadJob):
+        """다른 워커가 이미 가져간 작업 → 상태를 덮어쓰지 않음"""
+        self._stats["lease_lost"] += 1
+        logger.warning(
+            f"⚠️ 임대를 잃은 업로드 작업의 결과는 기록하지 않음 - job_id={job.job_id}, access_id={job.access_id}"
+        )
+
+    async def get_stats(self) -> Dict:
+        """워커 처리 지표와 상태별 작업 수"""
+        stats = dict(self._stats)
+        finished = stats["succeeded"] + stats["retried"] + stats["failed"] + stats["lease_lost"]
+        try:
+            async with acquire_connection() as connection:
+                rows = await connection.fetch(COUNT_JOBS_QUERY)
+            jobs = {row["status"]: row["count"] for row in rows}
+        except Exception as e:
+            logger.warning(f"⚠️ 업로드 작업 수 조회 실패: {str(e)}")
+            jobs = {}
+        return {
+            **{key: value for key, value in stats.items() if key != "run_time"},
+            "avg_run_ms": round(stats["run_time"] / finished * 1000, 1) if finished else 0.0,
+            "workers": len(self._tasks),
+            "jobs": jobs,
+        }
+
+
+# 프로세스 전역 업로드 워커 (startup 이벤트에서 시작)
+upload_worker = UploadJobWorker(
+    UPLOAD_JOB_WORKERS, UPLOAD_JOB_POLL_INTERVAL, UPLOAD_JOB_LEASE_SECONDS
+)
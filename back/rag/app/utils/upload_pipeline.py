@@ -0,0 +1,160 @@
+# app/utils/upload_pipeline.py
+
+import logging
+import httpx
+from datetime import datetime
+from typing import Dict
+from app.utils.image_captioner import generate_caption_from_jpeg
+from app.utils.image_preprocess import prepare_image
+from app.utils.image_fingerprint_store import NearDuplicate, fingerprint_store
+from app.utils.vision_ocr import analyze_image_async
+from app.utils.embedding import get_text_embedding_async
+from app.utils.vector_store import upsert_text_vector
+from app.utils.vector_metadata import build_image_metadata
+from app.utils.ingest_pipeline import run_stage
+from app.utils.cache_invalidation import invalidate_user_cache
+from app.utils.schedule_parser import extract_schedule
+
+logger = logging.getLogger(__name__)
+
+BACKEND_IMAGES_URL = "http://backend-service:8083/api/v1/images"
+BACKEND_PLANS_URL = "http://backend-service:8083/api/v1/plans"
+
+IMAGE_TIME_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+
+async def process_image_upload(
+    user_id: str, access_id: str, image_time: str, image_bytes: bytes
+) -> Dict:
+    """
+    이미지 한 장 분류/캡션/OCR → 벡터 저장 → 백엔드 이미지/일정 등록
+
+    - 블로킹 단계는 수집 파이프라인의 단계별 스레드풀/동시 실행 제한을 함께 사용
+    - 재시도해도 안전하도록 벡터 id는 access_id로 고정하고, 백엔드 등록을 마지막 확정 지점으로 둠
+    - 실패는 예외로 올려 작업 큐가 재시도하도록 함
+    """
+    image_time_obj = datetime.strptime(image_time, IMAGE_TIME_FORMAT)
+
+    async with httpx.AsyncClient() as client:
+        # 중복 체크 요청 (이전 시도에서 등록까지 끝났다면 여기서 종료)
+        check_response = await client.get(
+            f"{BACKEND_IMAGES_URL}/check",
+            params={"userId": user_id, "accessId": access_id},
+        )
+        if check_response.status_code != 200:
+            raise RuntimeError(f"중복 확인 실패 (status={check_response.status_code})")
+
+        check_result = check_response.json().get("result", {})
+        if check_result.get("exist", False):
+            logger.warning(f"⚠️ 이미 존재하는 이미지입니다. 업로드 중단 - access_id={access_id}")
+            return {
+                "access_id": access_id,
+                "image_time": image_time,
+                "status": "skipped",
+                "message": "이미 등록된 이미지입니다.",
+            }
+
+    # 한 번 디코딩해 캡션/OCR 입력과 pHash 생성, 유사 사진이면 캡션만 재사용
+    # (pHash는 화면 배치에 좌우되어 다른 내용의 스크린샷도 가깝게 나오므로 OCR은 항상 새로 실행)
+    prepared = await run_stage("preprocess", prepare_image, image_bytes)
+    duplicate, reservation = await fingerprint_store.lookup(user_id, prepared.phash)
+    try:
+        # 텍스트와 분류 점수를 Vision 요청 1회로 함께 얻음
+        analysis = await run_stage("ocr", analyze_image_async, prepared.ocr_bytes)
+        ocr_text = analysis.text
+
+        caption = ""
+        if analysis.is_photo:
+            if duplicate is not None and duplicate.caption:
+                logger.info(f"♻️ 유사 사진 캡션 재사용: {duplicate.access_id} → {access_id}")
+                caption = duplicate.caption
+            else:
+                caption = await run_stage(
+                    "caption", generate_caption_from_jpeg, prepared.caption_bytes
+                )
+    except BaseException:
+        fingerprint_store.complete(reservation, None)
+        raise
+
+    fingerprint = NearDuplicate(
+        access_id=access_id, phash=prepared.phash, caption=caption, ocr_text=ocr_text
+    )
+    fingerprint_store.complete(reservation, fingerprint)
+    if reservation is not None:
+        await run_stage("postgres", fingerprint_store.save, user_id, fingerprint)
+
+    if analysis.is_photo:
+        target = "photo"
+        # 두 개의 텍스트를 하나로 결합 (개행으로 구분)
+        content = f"[Caption]\n{caption}\n\n[OCR]\n{ocr_text}".strip()
+    else:
+        target = "info"
+        content = ocr_text
+
+    text_for_embedding = f"{access_id} ({image_time}): {content}"
+    metadata = build_image_metadata(
+        access_id,
+        text_for_embedding,
+        target,
+        image_time=image_time_obj,
+        caption=caption,
+        ocr=ocr_text,
+    )
+    vector = await run_stage("embedding", get_text_embedding_async, text_for_embedding)
+    namespace = await run_stage(
+        "pinecone",
+        upsert_text_vector,
+        user_id,
+        text_for_embedding,
+        vector,
+        target,
+        metadata,
+        access_id,
+    )
+
+    image_payload = {
+        "userId": user_id,
+        "accessId": access_id,
+        "imageTime": image_time,
+        "type": target,
+        "content": content,
+    }
+
+    async with httpx.AsyncClient() as client:
+        image_response = await client.post(BACKEND_IMAGES_URL, json=image_payload)
+        if image_response.status_code != 200:
+            raise RuntimeError(f"이미지 정보 저장 실패 (status={image_response.status_code})")
+
+        image_id = image_response.json().get("result", {}).get("imageId")
+
+        # 이미지 등록 이후 단계는 실패해도 재시도하지 않음 (중복 등록 방지)
+        if target == "info":
+            schedule_result = await run_stage("schedule", extract_schedule, content)
+            if schedule_result.get("is_schedule") and schedule_result.get("datetime"):
+                plan_payload = {
+                    "userId": user_id,
+                    "planTime": image_time,
+                    "planContent": schedule_result.get("event", content),
+                    "imageId": image_id,
+                }
+                try:
+                    plan_response = await client.post(BACKEND_PLANS_URL, json=plan_payload)
+                    if plan_response.status_code != 200:
+                        logger.warning(f"⚠️ 일정 등록 실패: {plan_response.text}")
+                    else:
+                        logger.info(f"📅 일정 등록 완료: {plan_payload}")
+                except httpx.HTTPError as e:
+                    logger.warning(f"⚠️ 일정 등록 실패: {str(e)}")
+
+    # 새 사진이 반영되도록 검색 서비스의 사용자 질의 캐시 무효화
+    await invalidate_user_cache(user_id)
+
+    return {
+        "access_id": access_id,
+        "image_time": image_time,
+        "type": target,
+        "namespace": namespace,
+        "content": text_for_embedding,
+        "image_id": image_id,
+        "status": "success",
+    }
@@ -0,0 +1,547 @@
+# app/utils/vector_backend.py
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorBackend:
+    """
+    벡터 저장소 인터페이스 (Pinecone Index와 같은 호출 형태)
+
+    - upsert(vectors=[{"id", "values", "metadata"}], namespace=...)
+    - query(vector=..., namespace=..., top_k=..., filter=..., include_metadata=...)
+      → {"matches": [{"id", "score", "metadata"}], "namespace": ...}
+    - update(id=..., set_metadata=..., namespace=...) : 벡터 값은 두고 메타데이터만 병합
+    """
+
+    def upsert(self, vectors: List[Dict], namespace: str = ""):
+        raise NotImplementedError
+
+    def query(
+        self,
+        vector: List[float],
+        namespace: str = "",
+        top_k: int = 10,
+        filter: Optional[Dict] = None,
+        include_metadata: bool = False,
+        **kwargs,
+    ) -> Dict:
+        raise NotImplementedError
+
+    def delete(self, ids: List[str], namespace: str = ""):
+        raise NotImplementedError
+
+    def update(self, id: str, set_metadata: Dict, namespace: str = ""):
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict:
+        return {"backend": type(self).__name__}
+
+
+class PineconeBackend(VectorBackend):
+    """Pinecone Index 위임 (list/fetch 등 나머지 API도 그대로 사용 가능)"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def upsert(self, vectors: List[Dict], namespace: str = ""):
+        return self.index.upsert(vectors=vectors, namespace=namespace)
+
+    def query(self, vector, namespace="", top_k=10, filter=None, include_metadata=False, **kwargs):
+        return self.index.query(
+            vector=vector,
+            namespace=namespace,
+            top_k=top_k,
+            filter=filter,
+            include_metadata=include_metadata,
+            **kwargs,
+        )
+
+    def delete(self, ids: List[str], namespace: str = ""):
+        return self.index.delete(ids=ids, namespace=namespace)
+
+    def update(self, id: str, set_metadata: Dict, namespace: str = ""):
+        return self.index.update(id=id, set_metadata=set_metadata, namespace=namespace)
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+
+def match_filter(metadata: Dict, filter: Optional[Dict]) -> bool:
+    """Pinecone 메타데이터 필터 문법 평가 ($eq, $ne, $in, $nin, $gt(e), $lt(e), $exists, $and, $or)"""
+    if not filter:
+        return True
+
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(match_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(match_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        exists = key in metadata
+        value = metadata.get(key)
+        for op, expected in condition.items():
+            if op == "$exists":
+                ok = exists == expected
+            elif not exists:
+                ok = op in ("$ne", "$nin")
+            elif op == "$eq":
+                ok = value == expected or (isinstance(value, list) and expected in value)
+            elif op == "$ne":
+                ok = value != expected
+            elif op == "$in":
+                ok = (
+                    any(v in expected for v in value)
+                    if isinstance(value, list)
+                    else value in expected
+                )
+            elif op == "$nin":
+                ok = (
+                    not any(v in expected for v in value)
+                    if isinstance(value, list)
+                    else value not in expected
+                )
+            elif op == "$gt":
+                ok = value > expected
+            elif op == "$gte":
+                ok = value >= expected
+            elif op == "$lt":
+                ok = value < expected
+            elif op == "$lte":
+                ok = value <= expected
+            else:
+                raise ValueError(f"지원하지 않는 필터 연산자입니다: {op}")
+            if not ok:
+                return False
+    return True
+
+
+class _LocalNamespace:
+    """
+    네임스페이스 하나의 로컬 벡터 (정규화된 float32 행렬, 코사인 = 내적)
+
+    - {ns}.f32   : 벡터 행 (mmap으로 읽음, 같은 id 재저장 시 같은 행 덮어쓰기)
+    - {ns}.jsonl : id/행/메타데이터 변경 로그 (뒤에 나온 기록이 우선)
+    """
+
+    def __init__(self, directory: str, namespace: str):
+        safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", namespace)
+        self.vector_path = os.path.join(directory, f"{safe_name}.f32")
+        self.log_path = os.path.join(directory, f"{safe_name}.jsonl")
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self.metadata: List[Optional[Dict]] = []
+        self.synced = False
+        self.synced_at = 0.0
+        # 동기화 시점의 원본 쓰기 세대 (알 수 없으면 None)
+        self.source_generation: Optional[int] = None
+        self.lock = threading.RLock()
+        self._matrix: Optional[np.memmap] = None
+        self._masks: Dict[str, np.ndarray] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "dim" in record:
+                    self.dim = record["dim"]
+                if "synced" in record:
+                    self.synced = record["synced"]
+                    self.synced_at = record.get("synced_at", 0.0)
+                    self.source_generation = record.get("generation")
+                if "id" in record:
+                    self._apply(record)
+
+        # 벡터 파일에 다 써지지 않은 행은 제외
+        if self.dim and os.path.exists(self.vector_path):
+            complete_rows = os.path.getsize(self.vector_path) // (self.dim * 4)
+            for row in range(complete_rows, len(self.ids)):
+                if self.ids[row] is not None:
+                    self.rows.pop(self.ids[row], None)
+                    self.ids[row] = None
+
+    def _apply(self, record: Dict):
+        vector_id = record["id"]
+        if record.get("deleted"):
+            row = self.rows.pop(vector_id, None)
+            if row is not None:
+                self.ids[row] = None
+                self.metadata[row] = None
+            return
+        row = record["row"]
+        while len(self.ids) <= row:
+            self.ids.append(None)
+            self.metadata.append(None)
+        self.ids[row] = vector_id
+        self.metadata[row] = record.get("metadata") or {}
+        self.rows[vector_id] = row
+
+    def _append_log(self, records: List[Dict]):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def upsert(self, vectors: List[Dict]):
+        with self.lock:
+            if not vectors:
+                return
+            if self.dim is None:
+                self.dim = len(vectors[0]["values"])
+                self._append_log([{"dim": self.dim}])
+
+            records = []
+            new_rows: Dict[str, int] = {}
+            # 파일이 없으면 생성 후 행 위치에 직접 쓰기
+            open(self.vector_path, "ab").close()
+            with open(self.vector_path, "r+b") as f:
+                for item in vectors:
+                    values = np.asarray(item["values"], dtype=np.float32)
+                    norm = np.linalg.norm(values)
+                    if norm > 0:
+                        values = values / norm
+                    row = self.rows.get(item["id"], new_rows.get(item["id"]))
+                    if row is None:
+                        new_rows[item["id"]] = len(self.ids)
+                        row = len(self.ids)
+                        self.ids.append(None)
+                        self.metadata.append(None)
+                    f.seek(row * self.dim * 4)
+                    f.write(values.tobytes())
+                    records.append(
+                        {"id": item["id"], "row": row, "metadata": item.get("metadata") or {}}
+                    )
+
+            # 벡터를 먼저 쓰고 로그를 기록 (중간 종료 시 로그 없는 행은 무시됨)
+            self._append_log(records)
+            for record in records:
+                self._apply(record)
+            self._matrix = None
+            self._masks.clear()
+
+    def delete(self, ids: List[str]):
+        with self.lock:
+            records = [{"id": vector_id, "deleted": True} for vector_id in ids if vector_id in self.rows]
+            self._append_log(records)
+            for record in records:
+                self._apply(record)
+            self._masks.clear()
+
+    def update(self, vector_id: str, set_metadata: Dict):
+        with self.lock:
+            row = self.rows.get(vector_id)
+            if row is None:
+                return
+            record = {
+                "id": vector_id,
+                "row": row,
+                "metadata": {**(self.metadata[row] or {}), **set_metadata},
+            }
+            self._append_log([record])
+            self._apply(record)
+            self._masks.clear()
+
+    def mark_synced(self, source_generation: Optional[int] = None):
+        with self.lock:
+            self.synced = True
+            self.synced_at = time.time()
+            self.source_generation = source_generation
+            self._append_log(
+                [{"synced": True, "synced_at": self.synced_at, "generation": source_generation}]
+            )
+
+    def invalidate(self):
+        """원본에 반영되지 않은 쓰기가 있음 → 다시 복사할 때까지 원본에서 조회"""
+        with self.lock:
+            if self.synced:
+                self.synced = False
+                self._append_log([{"synced": False}])
+
+    def is_fresh(self, ttl_seconds: float, source_generation: Optional[int]) -> bool:
+        """
+        로컬에서 조회해도 되는지
+
+        - 원본 쓰기 세대를 알면 동기화 시점의 세대와 같아야 함
+        - ttl_seconds가 지나면 다른 프로세스의 쓰기를 놓쳤을 수 있으므로 다시 복사
+        """
+        with self.lock:
+            if not self.synced:
+                return False
+            if source_generation is not None and source_generation != self.source_generation:
+                return False
+            return ttl_seconds <= 0 or time.time() - self.synced_at < ttl_seconds
+
+    def retain(self, ids: set):
+        """ids에 없는 벡터 삭제 (다시 복사할 때 원본에서 지워진 벡터 정리)"""
+        with self.lock:
+            removed = [vector_id for vector_id in self.rows if vector_id not in ids]
+        if removed:
+            self.delete(removed)
+
+    def _get_matrix(self) -> Optional[np.ndarray]:
+        if self._matrix is None or self._matrix.shape[0] < len(self.ids):
+            if not self.dim or not os.path.exists(self.vector_path):
+                return None
+            rows = os.path.getsize(self.vector_path) // (self.dim * 4)
+            if rows == 0:
+                return None
+            self._matrix = np.memmap(
+                self.vector_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+            )
+        return self._matrix
+
+    def _get_mask(self, filter: Optional[Dict]) -> np.ndarray:
+        """유효 행(+필터 조건) 마스크, 쓰기 전까지 필터별로 재사용"""
+        key = json.dumps(filter, sort_keys=True, ensure_ascii=False) if filter else ""
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.fromiter(
+                (
+                    metadata is not None and match_filter(metadata, filter)
+                    for metadata in self.metadata
+                ),
+                dtype=bool,
+                count=len(self.metadata),
+            )
+            if len(self._masks) >= 32:
+                self._masks.clear()
+            self._masks[key] = mask
+        return mask
+
+    def query(self, vector: List[float], top_k: int, filter: Optional[Dict], include_metadata: bool) -> List[Dict]:
+        with self.lock:
+            matrix = self._get_matrix()
+            if matrix is None or not self.rows:
+                return []
+
+            mask = self._get_mask(filter)
+            rows = min(matrix.shape[0], mask.shape[0])
+            if not mask[:rows].any():
+                return []
+
+            query_vector = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query_vector)
+            if norm > 0:
+                query_vector = query_vector / norm
+
+            # 전체 행렬 곱 한 번 후 유효하지 않은 행 제외
+            scores = np.asarray(matrix[:rows] @ query_vector)
+            scores[~mask[:rows]] = -np.inf
+            k = min(top_k, int(mask[:rows].sum()))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                {
+                    "id": self.ids[row],
+                    "score": float(scores[row]),
+                    "metadata": self.metadata[row] if include_metadata else None,
+                }
+                for row in top
+            ]
+
+
+class LocalVectorBackend(VectorBackend):
+    """
+    프로세스 내 NumPy 전수 검색 벡터 저장소 (mmap 파일로 영속화)
+
+    사용자별 네임스페이스가 수천 개 수준이라 전수 검색(행렬 곱 한 번)으로 충분
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._namespaces: Dict[str, _LocalNamespace] = {}
+        self._lock = threading.Lock()
+
+    def get_namespace(self, namespace: str) -> _LocalNamespace:
+        with self._lock:
+            if namespace not in self._namespaces:
+                self._namespaces[namespace] = _LocalNamespace(self.directory, namespace)
+            return self._namespaces[namespace]
+
+    def upsert(self, vectors: List[Dict], namespace: str = ""):
+        self.get_namespace(namespace).upsert(vectors)
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector, namespace="", top_k=10, filter=None, include_metadata=False, **kwargs):
+        matches = self.get_namespace(namespace).query(vector, top_k, filter, include_metadata)
+        return {"matches": matches, "namespace": namespace}
+
+    def delete(self, ids: List[str], namespace: str = ""):
+        self.get_namespace(namespace).delete(ids)
+
+    def update(self, id: str, set_metadata: Dict, namespace: str = ""):
+        self.get_namespace(namespace).update(id, set_metadata)
+        return {}
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            namespaces = dict(self._namespaces)
+        return {
+            "backend": "local",
+            "directory": self.directory,
+            "namespaces": {
+                name: {
+                    "vectors": len(ns.rows),
+                    "synced": ns.synced,
+                    "synced_at": ns.synced_at,
+                    "generation": ns.source_generation,
+                }
+                for name, ns in namespaces.items()
+            },
+        }
+
+
+class ReplicaVectorBackend(VectorBackend):
+    """
+    Pinecone(원본) + 로컬 읽기 복제본
+
+    - 쓰기: Pinecone에 저장 후 로컬에도 반영 (같은 프로세스의 쓰기만 바로 반영됨)
+    - 읽기: 로컬 복제본이 최신인 네임스페이스는 로컬에서, 아니면 Pinecone에서 조회
+      · 다른 서비스(rag 수집 경로)의 쓰기는 set_source_generation으로 받은 원본 세대가 바뀌면 감지
+      · 세대를 모르는 쓰기에 대비해 ttl_seconds가 지나면 다시 복사
+    - 조회가 hydrate_after 회 이상인 네임스페이스는 백그라운드에서 Pinecone 전체를 복사
+    """
+
+    def __init__(
+        self, index, local: LocalVectorBackend, hydrate_after: int = 1, ttl_seconds: float = 0
+    ):
+        self.primary = PineconeBackend(index)
+        self.local = local
+        self.hydrate_after = hydrate_after
+        self.ttl_seconds = ttl_seconds
+        self._query_counts: Dict[str, int] = {}
+        self._source_generations: Dict[str, int] = {}
+        self._hydrating: set = set()
+        self._lock = threading.Lock()
+        self._hydrator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vector-hydrate")
+        self._stats = {"local_queries": 0, "remote_queries": 0, "hydrated": 0}
+
+    def upsert(self, vectors: List[Dict], namespace: str = ""):
+        response = self.primary.upsert(vectors=vectors, namespace=namespace)
+        try:
+            self.local.upsert(vectors=vectors, namespace=namespace)
+        except Exception as e:
+            logger.warning(f"⚠️ 로컬 벡터 복제본 저장 실패 ({namespace}): {str(e)}")
+            self.local.get_namespace(namespace).invalidate()
+        return response
+
+    def delete(self, ids: List[str], namespace: str = ""):
+        response = self.primary.delete(ids=ids, namespace=namespace)
+        self.local.delete(ids=ids, namespace=namespace)
+        return response
+
+    def update(self, id: str, set_metadata: Dict, namespace: str = ""):
+        response = self.primary.update(id=id, set_metadata=set_metadata, namespace=namespace)
+        self.local.update(id=id, set_metadata=set_metadata, namespace=namespace)
+        return response
+
+    def set_source_generation(self, namespace: str, generation: int):
+        """원본 쓰기 세대 기록 (복제본을 만든 뒤 세대가 바뀌었으면 원본에서 조회 후 다시 복사)"""
+        with self._lock:
+            self._source_generations[namespace] = generation
+
+    def query(self, vector, namespace="", top_k=10, filter=None, include_metadata=False, **kwargs):
+        local_namespace = self.local.get_namespace(namespace)
+        with self._lock:
+            source_generation = self._source_generations.get(namespace)
+        if local_namespace.is_fresh(self.ttl_seconds, source_generation):
+            with self._lock:
+                self._stats["local_queries"] += 1
+            return self.local.query(vector, namespace, top_k, filter, include_metadata)
+
+        with self._lock:
+            self._stats["remote_queries"] += 1
+            count = self._query_counts.get(namespace, 0) + 1
+            self._query_counts[namespace] = count
+            should_hydrate = count >= self.hydrate_after and namespace not in self._hydrating
+            if should_hydrate:
+                self._hydrating.add(namespace)
+        if should_hydrate:
+            self._hydrator.submit(self._hydrate, namespace, source_generation)
+
+        return self.primary.query(vector, namespace, top_k, filter, include_metadata, **kwargs)
+
+    def _hydrate(self, namespace: str, source_generation: Optional[int], page_size: int = 100):
+        """
+        Pinecone 네임스페이스 전체를 로컬로 복사하고 동기화 완료 표시
+
+        복사 전에 읽은 원본 세대를 기록하므로, 복사 중 들어온 쓰기는 다음 조회에서 다시 감지됨
+        """
+        try:
+            local_namespace = self.local.get_namespace(namespace)
+            pagination_token = None
+            copied = 0
+            seen: set = set()
+            while True:
+                listing = self.primary.index.list_paginated(
+                    namespace=namespace, limit=page_size, pagination_token=pagination_token
+                )
+                ids = [vector.id for vector in listing.vectors]
+                seen.update(ids)
+                if ids:
+                    fetched = self.primary.index.fetch(ids=ids, namespace=namespace).vectors
+                    local_namespace.upsert(
+                        [
+                            {"id": v.id, "values": list(v.values), "metadata": dict(v.metadata or {})}
+                            for v in fetched.values()
+                        ]
+                    )
+                    copied += len(fetched)
+                pagination_token = listing.pagination.next if listing.pagination else None
+                if not pagination_token:
+                    break
+            local_namespace.retain(seen)
+            local_namespace.mark_synced(source_generation)
+            with self._lock:
+                self._stats["hydrated"] += 1
+            logger.info(f"💽 로컬 벡터 복제본 동기화 완료: {namespace} ({copied}개)")
+        except Exception as e:
+            logger.warning(f"⚠️ 로컬 벡터 복제본 동기화 실패 ({namespace}): {str(e)}")
+        finally:
+            with self._lock:
+                self._hydrating.discard(namespace)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            hydrating = sorted(self._hydrating)
+        return {**stats, "backend": "replica", "hydrating": hydrating, "local": self.local.get_stats()}
+
+    def __getattr__(self, name):
+        return getattr(self.primary.index, name)
+
+
+def create_vector_backend(
+    index, backend: str, local_dir: str, hydrate_after: int = 1, replica_ttl_seconds: float = 0
+) -> VectorBackend:
+    """설정값(pinecone/local/replica)에 따라 벡터 저장소 생성"""
+    if backend == "local":
+        return LocalVectorBackend(local_dir)
+    if backend == "replica":
+        return ReplicaVectorBackend(
+            index, LocalVectorBackend(local_dir), hydrate_after, replica_ttl_seconds
+        )
+    return PineconeBackend(index)
@@ -0,0 +1,117 @@
+# app/utils/vector_metadata.py
+
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+# 구조화 메타데이터 스키마 버전 (백필 여부 판별용)
+METADATA_SCHEMA_VERSION = 1
+
+IMAGE_TIME_FORMATS = ["%Y:%m:%d %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"]
+
+# EXIF 시각은 시간대 정보가 없는 한국 시각 (서버 시간대와 무관하게 KST로 해석)
+KST = ZoneInfo("Asia/Seoul")
+
+
+def parse_image_time(image_time: Union[str, datetime, None]) -> Optional[datetime]:
+    """사진 시각(EXIF 문자열/datetime)을 datetime으로 변환 (실패 시 None)"""
+    if image_time is None or image_time == "":
+        return None
+    if isinstance(image_time, datetime):
+        return image_time
+
+    for fmt in IMAGE_TIME_FORMATS:
+        try:
+            return datetime.strptime(image_time.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def to_epoch(image_time: Union[str, datetime, int, float, None]) -> Optional[int]:
+    """사진 시각(EXIF 문자열/datetime/epoch)을 epoch 초로 변환 (실패 시 None)"""
+    if isinstance(image_time, (int, float)):
+        return int(image_time)
+    parsed = parse_image_time(image_time)
+    if parsed is None:
+        return None
+    # 시간대 없는 시각은 KST로 간주
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=KST)
+    return int(parsed.timestamp())
+
+
+def build_image_metadata(
+    access_id: str,
+    text: str,
+    item_type: str,
+    image_time: Union[str, datetime, int, None] = None,
+    keywords: Optional[List[str]] = None,
+    caption: str = "",
+    ocr: str = "",
+) -> Dict:
+    """
+    이미지 벡터용 구조화 메타데이터
+
+    text는 임베딩에 사용한 원문 그대로 유지 (재임베딩/기존 코드 호환)
+    """
+    metadata = {
+        "text": text,
+        "access_id": str(access_id),
+        "type": item_type,
+        "keywords": sorted({kw for kw in (keywords or []) if kw}),
+        "caption": caption or "",
+        "ocr": ocr or "",
+        "schema_version": METADATA_SCHEMA_VERSION,
+    }
+    # Pinecone 메타데이터는 null을 허용하지 않으므로 시각이 있을 때만 저장
+    epoch = to_epoch(image_time)
+    if epoch is not None:
+        metadata["image_time"] = epoch
+    return metadata
+
+
+def parse_legacy_text(full_text: str) -> Tuple[str, Optional[str], str]:
+    """
+    기존 text 메타데이터 파싱
+    - "access_id: 내용" (image_upload_keyword)
+    - "access_id (image_time): 내용" (image_upload)
+    → (access_id, image_time 문자열 또는 None, 내용)
+    """
+    if ": " not in full_text:
+        return "unknown", None, full_text
+
+    head, body = full_text.split(": ", 1)
+    time_match = re.search(r"\(([^)]*)\)", head)
+    access_id = re.sub(r"\s*\([^)]*\)", "", head).strip()
+    return access_id, time_match.group(1) if time_match else None, body
+
+
+def parse_legacy_content(body: str) -> Tuple[str, str]:
+    """image_upload 형식("[Caption]\\n...\\n\\n[OCR]\\n...")에서 캡션/OCR 분리"""
+    match = re.match(r"\[Caption\]\n(.*?)\n\n\[OCR\]\n?(.*)", body, re.S)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return "", body
+
+
+def get_match_fields(metadata: Optional[Dict]) -> Tuple[str, str]:
+    """검색 결과 메타데이터에서 (access_id, 표시용 본문) 추출 (구조화 우선, 기존 형식 호환)"""
+    metadata = metadata or {}
+    access_id, _, body = parse_legacy_text(metadata.get("text", ""))
+    if metadata.get("access_id"):
+        access_id = metadata["access_id"]
+    return access_id, body
+
+
+def time_range_filter(
+    start_time: Optional[int] = None, end_time: Optional[int] = None
+) -> Optional[Dict]:
+    """image_time(epoch) 범위 필터"""
+    condition = {}
+    if start_time is not None:
+        condition["$gte"] = int(start_time)
+    if end_time is not None:
+        condition["$lte"] = int(end_time)
+    return {"image_time": condition} if condition else None
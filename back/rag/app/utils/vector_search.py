@@ -0,0 +1,180 @@
+# app/utils/vector_search.py
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Literal, Optional, Tuple
+from pydantic import BaseModel, Field
+from app.core.config import VECTOR_QUERY_MAX_CONCURRENCY
+from app.utils.vector_store import index
+from app.utils.embedding import get_text_embedding_async, get_text_embeddings
+from app.utils.embedding_registry import QUERY_EMBEDDING_MODELS, model_filter
+from app.utils.vector_metadata import get_match_fields
+
+logger = logging.getLogger(__name__)
+
+# 벡터 쿼리 전용 공유 스레드풀 (호출마다 새 풀을 만들지 않음)
+query_executor = ThreadPoolExecutor(
+    max_workers=VECTOR_QUERY_MAX_CONCURRENCY, thread_name_prefix="vector-query"
+)
+
+# RRF 상수 (일반적으로 60 사용)
+RRF_K = 60
+
+FusionMethod = Literal["max", "rrf"]
+
+
+class VectorMatch(BaseModel):
+    """벡터 검색 결과 한 건"""
+
+    vector_id: str
+    access_id: str
+    text: str
+    score: float = Field(..., description="쿼리 중 가장 높은 코사인 유사도")
+    fused_score: float = Field(..., description="병합 기준 점수 (max: score, rrf: RRF 점수)")
+    matched_queries: int = 1
+    metadata: Dict = Field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        """기존 결과 형식 ({"score", "id", "text"})으로 변환"""
+        return {"score": round(self.score, 3), "id": self.access_id, "text": self.text}
+
+
+class VectorSearchResult(BaseModel):
+    """여러 쿼리 벡터 검색 결과 (병합 후)"""
+
+    namespace: str
+    fusion: str
+    query_count: int
+    matches: List[VectorMatch]
+
+    def to_dicts(self) -> List[Dict]:
+        return [match.to_dict() for match in self.matches]
+
+
+def _fuse(responses: List[List], top_k: int, fusion: FusionMethod) -> List[VectorMatch]:
+    """쿼리별 결과를 id 기준으로 병합 (max-score 또는 reciprocal rank fusion)"""
+    merged: Dict[str, Dict] = {}
+    for matches in responses:
+        for rank, match in enumerate(matches):
+            entry = merged.setdefault(
+                match["id"], {"match": match, "score": match["score"], "rrf": 0.0, "count": 0}
+            )
+            if match["score"] > entry["score"]:
+                entry["match"] = match
+                entry["score"] = match["score"]
+            entry["rrf"] += 1.0 / (RRF_K + rank + 1)
+            entry["count"] += 1
+
+    results = []
+    for vector_id, entry in merged.items():
+        metadata = dict(entry["match"].get("metadata") or {})
+        access_id, text = get_match_fields(metadata)
+        results.append(
+            VectorMatch(
+                vector_id=vector_id,
+                access_id=access_id,
+                text=text,
+                score=entry["score"],
+                fused_score=entry["rrf"] if fusion == "rrf" else entry["score"],
+                matched_queries=entry["count"],
+                metadata=metadata,
+            )
+        )
+
+    results.sort(key=lambda m: m.fused_score, reverse=True)
+    return results[:top_k]
+
+
+def _query_one(namespace: str, vector: List[float], top_k: int, vector_filter: Optional[Dict]) -> List:
+    response = index.query(
+        vector=vector,
+        namespace=namespace,
+        top_k=top_k,
+        filter=vector_filter,
+        include_metadata=True,
+    )
+    return response["matches"]
+
+
+async def search_vectors(
+    namespace: str,
+    vectors: List[Tuple[List[float], Optional[Dict]]],
+    top_k: int = 5,
+    fusion: FusionMethod = "max",
+) -> VectorSearchResult:
+    """(벡터, 필터) 목록을 공유 풀에서 동시에 조회하고 병합"""
+    loop = asyncio.get_event_loop()
+    responses = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                query_executor, _query_one, namespace, vector, top_k, vector_filter
+            )
+            for vector, vector_filter in vectors
+        ]
+    )
+    return VectorSearchResult(
+        namespace=namespace,
+        fusion=fusion,
+        query_count=len(vectors),
+        matches=_fuse(responses, top_k, fusion),
+    )
+
+
+async def search_similar_items_async(
+    user_id: str,
+    queries: List[str],
+    target: str,
+    top_k: int = 5,
+    fusion: FusionMethod = "max",
+    max_queries: int = 5,
+    base_filter: Optional[Dict] = None,
+) -> VectorSearchResult:
+    """여러 쿼리 문장을 임베딩(배치/캐시) 후 한 번에 검색"""
+    namespace = f"{user_id}_{target}"
+    texts = [query for query in queries[:max_queries] if query.strip()]
+
+    vectors = []
+    for model in QUERY_EMBEDDING_MODELS:
+        embeddings = await asyncio.gather(
+            *[get_text_embedding_async(text, model) for text in texts]
+        )
+        vectors.extend(
+            (embedding, model_filter(model, base_filter)) for embedding in embeddings
+        )
+
+    result = await search_vectors(namespace, vectors, top_k, fusion)
+    logger.info(
+        f"🔍 벡터 검색: namespace={namespace}, 쿼리 {len(texts)}개 × 모델 {len(QUERY_EMBEDDING_MODELS)}개 → {len(result.matches)}개 ({fusion})"
+    )
+    return result
+
+
+def search_similar_items_sync(
+    user_id: str,
+    queries: List[str],
+    target: str,
+    top_k: int = 5,
+    fusion: FusionMethod = "max",
+    max_queries: int = 5,
+    base_filter: Optional[Dict] = None,
+) -> VectorSearchResult:
+    """동기 호출용 (스레드풀 안의 기존 코드): 공유 풀에서 쿼리 실행"""
+    namespace = f"{user_id}_{target}"
+    texts = [query for query in queries[:max_queries] if query.strip()]
+
+    vectors = [
+        (embedding, model_filter(model, base_filter))
+        for model in QUERY_EMBEDDING_MODELS
+        for embedding in get_text_embeddings(texts, model)
+    ]
+    futures = [
+        query_executor.submit(_query_one, namespace, vector, top_k, vector_filter)
+        for vector, vector_filter in vectors
+    ]
+    return VectorSearchResult(
+        namespace=namespace,
+        fusion=fusion,
+        query_count=len(vectors),
+        matches=_fuse([future.result() for future in futures], top_k, fusion),
+    )
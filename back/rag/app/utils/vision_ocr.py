@@ -0,0 +1,273 @@
+# app/utils/vision_ocr.py
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from dotenv import load_dotenv
+from google.cloud import vision
+from pydantic import BaseModel
+from app.core.config import (
+    VISION_OCR_BATCH_SIZE,
+    VISION_OCR_BATCH_MAX_BYTES,
+    VISION_OCR_BATCH_WAIT_MS,
+    VISION_OCR_MAX_CONCURRENT_BATCHES,
+)
+
+logger = logging.getLogger(__name__)
+
+# .env의 GOOGLE_APPLICATION_CREDENTIALS 경로 읽기
+load_dotenv()
+if os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+
+# 텍스트 점수가 이 값 이하이면 사진(photo), 초과하면 정보성 이미지(info)
+PHOTO_TEXT_SCORE_MAX = 0.09
+
+# batch_annotate_images 요청당 최대 이미지 수 (Vision API 제한)
+VISION_MAX_IMAGES_PER_REQUEST = 16
+
+
+def text_score(full_text: str) -> float:
+    """텍스트 길이에 따라 0~1 점수 계산 (1000자 이상이면 1.0)"""
+    score = min(1.0, len(full_text.strip()) / 1000.0)
+    return round(score, 3)
+
+
+class TextBox(BaseModel):
+    """OCR 단어 하나와 위치 (꼭짓점 좌표, 픽셀)"""
+
+    text: str
+    vertices: List[Tuple[int, int]]
+
+
+class OcrAnalysis(BaseModel):
+    """Vision text_detection 1회 결과 (텍스트 / 위치 / 사진·정보 분류 점수)"""
+
+    text: str = ""
+    boxes: List[TextBox] = []
+    text_score: float = 0.0
+
+    @property
+    def is_photo(self) -> bool:
+        return self.text_score <= PHOTO_TEXT_SCORE_MAX
+
+
+class VisionOcrError(Exception):
+    """Vision API가 이미지 단위로 돌려준 오류"""
+
+
+def _to_analysis(response) -> OcrAnalysis:
+    if response.error.message:
+        raise VisionOcrError(f"Vision API 오류: {response.error.message}")
+
+    annotations = response.text_annotations
+    if not annotations:
+        return OcrAnalysis()  # 텍스트 없음
+
+    # 첫 항목은 전체 텍스트, 이후 항목은 단어별 결과
+    text = annotations[0].description.strip()
+    boxes = [
+        TextBox(
+            text=annotation.description,
+            vertices=[(v.x, v.y) for v in annotation.bounding_poly.vertices],
+        )
+        for annotation in annotations[1:]
+    ]
+    return OcrAnalysis(text=text, boxes=boxes, text_score=text_score(text))
+
+
+class VisionOcr:
+    """
+    Vision OCR 공용 분석기
+
+    - ImageAnnotatorClient 하나를 프로세스 전체에서 공유 (첫 호출 시 생성)
+    - 동시에 들어온 요청은 max_wait_ms 동안 모아 batch_annotate_images 한 번으로 처리
+    - 요청당 이미지 수(16개)와 전송 크기(max_batch_bytes)를 넘지 않도록 나눔
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = VISION_MAX_IMAGES_PER_REQUEST,
+        max_batch_bytes: int = 8 * 1024 * 1024,
+        max_wait_ms: float = 10.0,
+        max_concurrent_batches: int = 4,
+    ):
+        self.max_batch_size = min(max_batch_size, VISION_MAX_IMAGES_PER_REQUEST)
+        self.max_batch_bytes = max_batch_bytes
+        self.max_wait = max_wait_ms / 1000
+        self._client: Optional[vision.ImageAnnotatorClient] = None
+        self._client_lock = threading.Lock()
+        self._queue: "queue.Queue[tuple[bytes, Future]]" = queue.Queue()
+        self._dispatcher = ThreadPoolExecutor(
+            max_workers=max_concurrent_batches, thread_name_prefix="vision-ocr"
+        )
+        self._lock = threading.Lock()
+        self._stats = {"images": 0, "api_calls": 0, "errors": 0, "api_time": 0.0}
+        self._collector: Optional[threading.Thread] = None
+
+    @property
+    def client(self) -> vision.ImageAnnotatorClient:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = vision.ImageAnnotatorClient()
+        return self._client
+
+    def _ensure_collector(self):
+        if self._collector is None:
+            with self._client_lock:
+                if self._collector is None:
+                    self._collector = threading.Thread(
+                        target=self._collect_loop, name="vision-ocr-batcher", daemon=True
+                    )
+                    self._collector.start()
+
+    def submit(self, image_bytes: bytes) -> Future:
+        """OCR 요청 등록 (동시 요청과 묶어 처리, 결과는 Future로 전달)"""
+        self._ensure_collector()
+        future: Future = Future()
+        self._queue.put((image_bytes, future))
+        return future
+
+    def analyze(self, image_bytes: bytes) -> OcrAnalysis:
+        """동기 호출용: 배치 처리 결과를 기다려 반환"""
+        return self.submit(image_bytes).result()
+
+    def analyze_batch(self, images: List[bytes]) -> List[OcrAnalysis]:
+        """
+        여러 이미지를 batch_annotate_images로 직접 처리 (요청 제한에 맞춰 나눔)
+
+        하나라도 실패하면 VisionOcrError (이미지별 실패 처리가 필요하면 submit 사용)
+        """
+        futures = [Future() for _ in images]
+        for chunk in self._chunks(list(zip(images, futures))):
+            self._run_batch(chunk)
+        return [future.result() for future in futures]
+
+    def _chunks(self, items: List[tuple]):
+        chunk, size = [], 0
+        for item in items:
+            if chunk and (
+                len(chunk) >= self.max_batch_size
+                or size + len(item[0]) > self.max_batch_bytes
+            ):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(item)
+            size += len(item[0])
+        if chunk:
+            yield chunk
+
+    def _collect_loop(self):
+        pending = None
+        while True:
+            # 첫 요청이 들어올 때까지 대기 (크기 초과로 넘어온 요청이 있으면 그것부터)
+            batch = [pending or self._queue.get()]
+            size = len(batch[0][0])
+            pending = None
+            deadline = time.monotonic() + self.max_wait
+
+            # 최대 대기 시간, 이미지 수, 전송 크기 중 먼저 닿는 곳까지 수집
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if size + len(item[0]) > self.max_batch_bytes:
+                    pending = item
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self._dispatcher.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[tuple]):
+        # 이미 취소된 요청은 빼고, 나머지는 실행 중으로 표시해 더는 취소되지 않게 함
+        batch = [
+            (image_bytes, future)
+            for image_bytes, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            if len(batch) == 1:
+                image_bytes, _ = batch[0]
+                responses = [
+                    self.client.text_detection(image=vision.Image(content=image_bytes))
+                ]
+            else:
+                requests = [
+                    vision.AnnotateImageRequest(
+                        image=vision.Image(content=image_bytes),
+                        features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)],
+                    )
+                    for image_bytes, _ in batch
+                ]
+                responses = self.client.batch_annotate_images(requests=requests).responses
+        except Exception as e:
+            logger.error(f"❌ Vision OCR 요청 실패 ({len(batch)}개): {str(e)}")
+            with self._lock:
+                self._stats["errors"] += 1
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            with self._lock:
+                self._stats["images"] += len(batch)
+                self._stats["api_calls"] += 1
+                self._stats["api_time"] += time.perf_counter() - start
+
+        # 이미지별 오류는 해당 요청에만 전달
+        for (_, future), response in zip(batch, responses):
+            try:
+                future.set_result(_to_analysis(response))
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                future.set_exception(e)
+
+    def get_stats(self) -> Dict:
+        """이미지/요청 수 및 평균 배치 크기 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+        calls = stats["api_calls"]
+        return {
+            "images": stats["images"],
+            "api_calls": calls,
+            "errors": stats["errors"],
+            "avg_batch_size": round(stats["images"] / calls, 2) if calls else 0.0,
+            "avg_api_ms": round(stats["api_time"] / calls * 1000, 1) if calls else 0.0,
+            "pending": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+
+# 프로세스 전역 OCR 분석기
+vision_ocr = VisionOcr(
+    max_batch_size=VISION_OCR_BATCH_SIZE,
+    max_batch_bytes=VISION_OCR_BATCH_MAX_BYTES,
+    max_wait_ms=VISION_OCR_BATCH_WAIT_MS,
+    max_concurrent_batches=VISION_OCR_MAX_CONCURRENT_BATCHES,
+)
+
+
+def analyze_image(image_bytes: bytes) -> OcrAnalysis:
+    """이미지 1장 OCR 분석 (텍스트, 위치, 분류 점수를 한 번의 요청으로)"""
+    return vision_ocr.analyze(image_bytes)
+
+
+async def analyze_image_async(image_bytes: bytes) -> OcrAnalysis:
+    """asyncio용: 이벤트 루프를 막지 않고 배치 처리 결과를 기다림"""
+    return await asyncio.wrap_future(vision_ocr.submit(image_bytes))
@@ -3,6 +3,9 @@
 DROP TABLE IF EXISTS image_keywords;
 DROP TABLE IF EXISTS clipboard_items;
 DROP TABLE IF EXISTS images;
+DROP TABLE IF EXISTS geocode_cache;
+DROP TABLE IF EXISTS image_fingerprints;
+DROP TABLE IF EXISTS upload_jobs;
 
 -- 테이블 재생성
 CREATE TABLE images (
@@ -10,7 +13,10 @@ CREATE TABLE images (
     user_id TEXT NOT NULL,
     access_id TEXT NOT NULL,
     caption TEXT,
-    image_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    image_time TIMESTAMP,  -- EXIF 촬영 시각 (없으면 NULL)
+    latitude DOUBLE PRECISION,
+    longitude DOUBLE PRECISION,
+    geohash TEXT COLLATE "C",  -- 반경 검색용 (접두사 범위 비교)
     UNIQUE(user_id, access_id)  -- ✅ 복합 유니크 제약
 );
 
@@ -33,6 +39,57 @@ CREATE TABLE clipboard_items (
     FOREIGN KEY (user_id, image_id) REFERENCES images(user_id, access_id) ON DELETE CASCADE
 );
 
+-- 역지오코딩 캐시 (geohash 버킷별 주소, 주소가 없는 위치는 NULL)
+CREATE TABLE geocode_cache (
+    provider TEXT NOT NULL,
+    geohash TEXT NOT NULL,
+    address TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (provider, geohash)
+);
+
+-- 유사 사진 재사용용 지문 (64비트 pHash + 16비트 4구간)
+CREATE TABLE image_fingerprints (
+    user_id TEXT NOT NULL,
+    access_id TEXT NOT NULL,
+    phash BIGINT NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    caption TEXT,
+    ocr_text TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, access_id)
+);
+
+-- 이미지 업로드 작업 큐 ((user_id, access_id)당 작업 하나, 처리 후 image는 NULL)
+CREATE TABLE upload_jobs (
+    job_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    access_id TEXT NOT NULL,
+    image_time TEXT NOT NULL,
+    image BYTEA,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMP,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, access_id)
+);
 
 -- 인덱스 생성 (검색 최적화용)
-CREATE INDEX idx_keyword ON image_keywords(keyword);
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_image_keywords_user_keyword ON image_keywords(user_id, keyword);
+CREATE INDEX idx_image_keywords_keyword_trgm ON image_keywords USING gin (keyword gin_trgm_ops);
+CREATE INDEX idx_images_user_time ON images(user_id, image_time);
+CREATE INDEX idx_images_user_geohash ON images(user_id, geohash) WHERE geohash IS NOT NULL;
+CREATE INDEX idx_image_fingerprints_band0 ON image_fingerprints(user_id, band0);
+CREATE INDEX idx_image_fingerprints_band1 ON image_fingerprints(user_id, band1);
+CREATE INDEX idx_image_fingerprints_band2 ON image_fingerprints(user_id, band2);
+CREATE INDEX idx_image_fingerprints_band3 ON image_fingerprints(user_id, band3);
+CREATE INDEX idx_upload_jobs_runnable ON upload_jobs(next_run_at) WHERE status IN ('queued', 'running');
@@ -0,0 +1,19 @@
+-- 키워드 검색 인덱스 마이그레이션
+-- CONCURRENTLY 인덱스 생성은 트랜잭션 밖에서 실행해야 합니다.
+--   psql -h <host> -p 5434 -U <user> -d <db> -f 001_keyword_search_indexes.sql
+
+-- 부분 문자열(ILIKE '%키워드%') 검색용 trigram 확장
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 사용자별 정확 일치 / 정렬 조회용 복합 인덱스
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_image_keywords_user_keyword
+    ON image_keywords (user_id, keyword);
+
+-- 부분 문자열 검색용 trigram GIN 인덱스
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_image_keywords_keyword_trgm
+    ON image_keywords USING gin (keyword gin_trgm_ops);
+
+-- (user_id, keyword) 복합 인덱스가 기존 단일 컬럼 인덱스를 대체
+DROP INDEX CONCURRENTLY IF EXISTS idx_keyword;
+
+ANALYZE image_keywords;
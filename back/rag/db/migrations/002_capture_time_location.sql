@@ -0,0 +1,44 @@
+-- 촬영 시각 / 위치 컬럼 마이그레이션
+-- CONCURRENTLY 인덱스 생성은 트랜잭션 밖에서 실행해야 합니다.
+--   psql -h <host> -p 5434 -U <user> -d <db> -f 002_capture_time_location.sql
+
+-- 위도/경도 및 geohash (접두사 범위 검색용, 바이트 순서 비교를 위해 "C" collation)
+ALTER TABLE images ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE images ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+ALTER TABLE images ADD COLUMN IF NOT EXISTS geohash TEXT COLLATE "C";
+
+-- 촬영 시각을 모르는 사진은 업로드 시각 대신 NULL (새 행과 기존 행 모두)
+ALTER TABLE images ALTER COLUMN image_time DROP DEFAULT;
+
+-- 기존 행의 image_time은 업로드 시각(UTC)이므로 시간 키워드("2025년 05월 15일")에서 촬영 날짜 복원
+-- 시간 키워드는 EXIF 촬영 시각이 있을 때만 만들어졌으므로, 키워드가 없는 행은 아래에서 NULL로 비움
+UPDATE images i
+SET image_time = to_timestamp(k.keyword, 'YYYY"년" MM"월" DD"일"')::timestamp
+FROM (
+    SELECT DISTINCT ON (user_id, image_id) user_id, image_id, keyword
+    FROM image_keywords
+    WHERE keyword ~ '^[0-9]{4}년 [0-9]{2}월 [0-9]{2}일$'
+    ORDER BY user_id, image_id, id
+) k
+WHERE i.user_id = k.user_id AND i.access_id = k.image_id;
+
+UPDATE images i
+SET image_time = NULL
+WHERE i.image_time IS NOT NULL
+  AND NOT EXISTS (
+    SELECT 1 FROM image_keywords k
+    WHERE k.user_id = i.user_id
+      AND k.image_id = i.access_id
+      AND k.keyword ~ '^[0-9]{4}년 [0-9]{2}월 [0-9]{2}일$'
+  );
+
+-- 사용자별 촬영 시각 범위 검색
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_images_user_time
+    ON images (user_id, image_time);
+
+-- 사용자별 geohash 접두사(반경 검색 후보) 검색
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_images_user_geohash
+    ON images (user_id, geohash)
+    WHERE geohash IS NOT NULL;
+
+ANALYZE images;
@@ -0,0 +1,11 @@
+-- 역지오코딩 캐시 테이블 마이그레이션
+--   psql -h <host> -p 5434 -U <user> -d <db> -f 003_geocode_cache.sql
+
+-- geohash 버킷(GEOCODE_GEOHASH_PRECISION 자리)별 주소, 주소가 없는 위치(바다 등)는 NULL
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    provider TEXT NOT NULL,
+    geohash TEXT NOT NULL,
+    address TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (provider, geohash)
+);
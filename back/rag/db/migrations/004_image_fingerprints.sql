@@ -0,0 +1,22 @@
+-- 유사 사진 지문 테이블 마이그레이션
+--   psql -h <host> -p 5434 -U <user> -d <db> -f 004_image_fingerprints.sql
+
+-- 64비트 pHash와 16비트 4구간 (해밍 거리 3 이하인 사진은 최소 한 구간이 같음)
+CREATE TABLE IF NOT EXISTS image_fingerprints (
+    user_id TEXT NOT NULL,
+    access_id TEXT NOT NULL,
+    phash BIGINT NOT NULL,
+    band0 INTEGER NOT NULL,
+    band1 INTEGER NOT NULL,
+    band2 INTEGER NOT NULL,
+    band3 INTEGER NOT NULL,
+    caption TEXT,
+    ocr_text TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, access_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_image_fingerprints_band0 ON image_fingerprints (user_id, band0);
+CREATE INDEX IF NOT EXISTS idx_image_fingerprints_band1 ON image_fingerprints (user_id, band1);
+CREATE INDEX IF NOT EXISTS idx_image_fingerprints_band2 ON image_fingerprints (user_id, band2);
+CREATE INDEX IF NOT EXISTS idx_image_fingerprints_band3 ON image_fingerprints (user_id, band3);
@@ -0,0 +1,28 @@
+-- 이미지 업로드 작업 큐 테이블 마이그레이션
+--   psql -h <host> -p 5434 -U <user> -d <db> -f 005_upload_jobs.sql
+
+-- (user_id, access_id)당 작업 하나 (같은 이미지를 다시 올리면 기존 작업 반환)
+-- status: queued → running → succeeded / failed (재시도 가능한 실패는 queued로 복귀)
+-- image는 처리가 끝나면 NULL로 비움
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    job_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    access_id TEXT NOT NULL,
+    image_time TEXT NOT NULL,
+    image BYTEA,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMP,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, access_id)
+);
+
+-- 워커가 대기/만료 작업을 가져갈 때 사용 (완료된 작업은 인덱스에서 제외)
+CREATE INDEX IF NOT EXISTS idx_upload_jobs_runnable
+    ON upload_jobs (next_run_at)
+    WHERE status IN ('queued', 'running');
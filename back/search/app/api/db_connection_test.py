@@ -4,6 +4,7 @@ import psycopg2
 from psycopg2 import OperationalError
 import os
 from dotenv import load_dotenv
+from app.utils.db_pool import get_pool_stats
 
 load_dotenv()  # .env 파일 로드
 
@@ -66,3 +67,9 @@ def test_db_connection():
         return JSONResponse(
             status_code=500, content={"status": "error", "message": str(e)}
         )
+
+
+@router.get("/db-pool-stats")
+def db_pool_stats():
+    """DB 커넥션 풀 크기, 대기 시간, 체크아웃 지표 조회"""
+    return get_pool_stats()
@@ -1,45 +1,115 @@
 from fastapi import APIRouter, Form
-from typing import Optional, Dict
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Tuple
 import logging
 import time
 import json
 import asyncio
 import traceback
 from datetime import datetime
-from app.utils.ai_utils import determine_image_query_intent
+from app.utils.intent_classifier import intent_classifier
+from app.services.speculative_service import dispatch_query, speculation_stats
 from app.utils.async_utils import save_query_async, save_result_async
-from app.utils.cache_utils import (
-    get_cache_key,
-    get_from_cache,
-    set_cache,
-    get_cache_status,
-    clear_cache,
-)
+from app.utils.cache_utils import query_cache
+from app.utils.geo_utils import GeoFilter
+from app.utils.sse import sse_event
+from app.utils.mcp_client import mcp_client
 from app.services.image_service import process_photo_search
-from app.services.info_service import process_info_search
-from app.services.conversation_service import process_conversation
-from app.config.settings import CACHE_TTL_SECONDS, MAX_CACHE_SIZE
+from app.services.info_service import stream_info_search
+from app.services.conversation_service import stream_conversation
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# 답변을 조각 단위로 생성하는 분기 (사진 검색은 photo_ids만 있으므로 제외)
+STREAM_BRANCHES = {
+    "get_info": stream_info_search,
+    "conversation": stream_conversation,
+}
+
+# 캐시된 결과의 type → 의도
+RESULT_TYPE_INTENTS = {
+    "photo_search": "find_photo",
+    "info_search": "get_info",
+    "conversation": "conversation",
+}
+
+
+def _geo_scope(
+    latitude: Optional[float], longitude: Optional[float], radius_m: Optional[float]
+) -> Tuple[Optional[GeoFilter], str]:
+    """위치 반경 필터와 캐시 범위 (반경 검색 결과는 위치별로 따로 캐시)"""
+    if latitude is not None and longitude is not None and radius_m:
+        geo_filter = GeoFilter(latitude=latitude, longitude=longitude, radius_m=radius_m)
+        return geo_filter, f"image:geo:{latitude:.5f},{longitude:.5f},{radius_m:.0f}"
+    return None, "image"
+
+
+def _finish_result(
+    user_id: str,
+    query: str,
+    intent: str,
+    result: Dict,
+    timings: Dict,
+    total_start: float,
+    cache_scope: str,
+    generation: int,
+):
+    """처리 시간 기록, 결과 캐시/대화 기록 저장 및 성능 로그 (일반/스트리밍 공용)"""
+    timings["total"] = time.time() - total_start
+    result["_timings"] = timings
+    result["_from_cache"] = False
+
+    # 결과 캐시 저장 (대화 응답은 이전 대화 맥락에 따라 달라지므로 제외)
+    if intent != "conversation":
+        asyncio.create_task(
+            query_cache.set(
+                user_id, query, result, scope=cache_scope, generation=generation
+            )
+        )
+
+    # 비동기 결과 저장
+    asyncio.create_task(
+        save_result_async(
+            user_id,
+            "assistant",
+            json.dumps(result, ensure_ascii=False),
+            int(time.time()),
+        )
+    )
+
+    # 성능 로그 출력
+    log_performance_summary(intent, timings)
+
 
 @router.post("/image/")
-async def process_image_query(user_id: str = Form(...), query: str = Form(...)):
+async def process_image_query(
+    user_id: str = Form(...),
+    query: str = Form(...),
+    latitude: Optional[float] = Form(None),
+    longitude: Optional[float] = Form(None),
+    radius_m: Optional[float] = Form(None),
+):
     """
     사용자의 자연어 질의에 따라 이미지를 검색하거나,
     벡터 정보 검색 또는 일반 대화를 처리하는 메인 API 엔드포인트
+
+    - latitude / longitude / radius_m: 사진 검색 시 촬영 위치 반경 필터 (선택)
     """
     total_start = time.time()
     logger.info(f"🔍 쿼리 시작 - user: {user_id}, query: {query}")
 
-    # 캐시 키는 생성하지만 실제 캐싱은 비활성화
-    cache_key = get_cache_key(user_id, query)
-    # cached_result = get_from_cache(cache_key, CACHE_TTL_SECONDS)
-    # if cached_result:
-    #     cached_result["_timings"]["total"] = time.time() - total_start
-    #     cached_result["_from_cache"] = True
-    #     return cached_result
+    geo_filter, cache_scope = _geo_scope(latitude, longitude, radius_m)
+
+    # 캐시 확인 (새 사진 업로드 시 rag에서 사용자 세대를 올려 이전 결과는 무효화됨)
+    generation = await query_cache.current_generation(user_id)
+    cached_result = await query_cache.get(
+        user_id, query, scope=cache_scope, generation=generation
+    )
+    if cached_result:
+        cached_result.setdefault("_timings", {})["total"] = time.time() - total_start
+        cached_result["_from_cache"] = True
+        return cached_result
 
     timestamp = int(time.time())
     timings = {}
@@ -48,43 +118,22 @@ async def process_image_query(user_id: str = Form(...), query: str = Form(...)):
         # 1. 사용자 쿼리 비동기 저장
         asyncio.create_task(save_query_async(user_id, "user", query, timestamp))
 
-        # 2. 쿼리 의도 파악: 사진 검색, 정보 요청, 일반 대화 중 하나
-        intent_start = time.time()
-        intent = await determine_image_query_intent(query)
-        timings["intent_detection"] = time.time() - intent_start
-        logger.info(f"🎯 의도 파악: {intent} ({timings['intent_detection']:.3f}초)")
-
-        # 3. 의도별 처리 분기
-        if intent == "find_photo":
-            # 📸 사용자 질문이 이미지 관련일 경우 → 이미지 검색
-            result = await process_photo_search(user_id, query, timings)
-        elif intent == "conversation":
-            # 💬 일반 대화일 경우 → LLM 기반 응답 생성
-            result = await process_conversation(user_id, query, timings)
-        else:
-            # 📚 정보 검색일 경우 → 쿼리 확장 + 벡터 검색 + 답변 생성
-            result = await process_info_search(user_id, query, timings)
-
-        # 4. 전체 처리 시간 저장
-        timings["total"] = time.time() - total_start
-        result["_timings"] = timings
-        result["_from_cache"] = False  # 캐싱 비활성화됨 - 항상 false
-
-        # 5. 결과 캐시 저장 비활성화
-        # set_cache(cache_key, result, CACHE_TTL_SECONDS, MAX_CACHE_SIZE)
-
-        # 6. 비동기 결과 저장
-        asyncio.create_task(
-            save_result_async(
-                user_id,
-                "assistant",
-                json.dumps(result, ensure_ascii=False),
-                int(time.time()),
-            )
+        # 2. 쿼리 의도 파악 후 의도별 처리 분기
+        #    - 사진 검색 → 키워드 추출 + DB 검색
+        #    - 일반 대화 → LLM 기반 응답 생성
+        #    - 정보 검색 → 쿼리 확장 + 벡터 검색 + 답변 생성
+        #    (로컬 분류 신뢰도가 낮을 때만 LLM 호출, 그동안 후보 분기를 추측 실행)
+        decision, result = await dispatch_query(user_id, query, timings, geo_filter)
+        intent = decision.intent
+        logger.info(
+            f"🎯 의도 파악: {intent} [{decision.source}, 신뢰도 {decision.confidence:.2f}] "
+            f"({timings['intent_detection']:.3f}초)"
         )
 
-        # 7. 성능 로그 출력
-        log_performance_summary(intent, timings)
+        # 4. 처리 시간 기록, 결과 캐시 및 대화 기록 저장
+        _finish_result(
+            user_id, query, intent, result, timings, total_start, cache_scope, generation
+        )
 
         return result
 
@@ -102,6 +151,127 @@ async def process_image_query(user_id: str = Form(...), query: str = Form(...)):
         }
 
 
+@router.post("/image/stream")
+async def stream_image_query(
+    user_id: str = Form(...),
+    query: str = Form(...),
+    latitude: Optional[float] = Form(None),
+    longitude: Optional[float] = Form(None),
+    radius_m: Optional[float] = Form(None),
+):
+    """
+    /image/ 의 스트리밍(SSE) 버전 - 준비되는 대로 이벤트 전송
+
+    - intent: 의도 파악 결과
+    - photo_ids: 사진 검색 결과 (다른 의도는 빈 배열을 바로 전송)
+    - token: 정보 검색/대화 답변 조각 ({"text": ...})
+    - done: /image/ 와 같은 형식의 최종 결과
+    - error: 처리 중 오류
+    """
+    total_start = time.time()
+    logger.info(f"🔍 스트리밍 쿼리 시작 - user: {user_id}, query: {query}")
+    geo_filter, cache_scope = _geo_scope(latitude, longitude, radius_m)
+
+    async def event_stream():
+        timings = {}
+        try:
+            generation = await query_cache.current_generation(user_id)
+            cached_result = await query_cache.get(
+                user_id, query, scope=cache_scope, generation=generation
+            )
+            if cached_result:
+                intent = RESULT_TYPE_INTENTS.get(cached_result.get("type"), "get_info")
+                yield sse_event("intent", {"intent": intent, "source": "cache"})
+                yield sse_event("photo_ids", {"photo_ids": cached_result.get("photo_ids", [])})
+                if cached_result.get("answer"):
+                    yield sse_event("token", {"text": cached_result["answer"]})
+                cached_result.setdefault("_timings", {})["total"] = time.time() - total_start
+                cached_result["_from_cache"] = True
+                yield sse_event("done", cached_result)
+                return
+
+            asyncio.create_task(save_query_async(user_id, "user", query, int(time.time())))
+
+            # 의도는 확정 즉시 전송 (스트리밍 경로는 추측 실행 없이 확정된 분기만 실행)
+            intent_start = time.time()
+            decision = await intent_classifier.classify(query)
+            timings["intent_detection"] = time.time() - intent_start
+            intent = decision.intent
+            yield sse_event(
+                "intent",
+                {
+                    "intent": intent,
+                    "source": decision.source,
+                    "confidence": round(decision.confidence, 3),
+                },
+            )
+
+            if intent == "find_photo":
+                result = await process_photo_search(
+                    user_id, query, timings, geo_filter=geo_filter
+                )
+                yield sse_event("photo_ids", {"photo_ids": result.get("photo_ids", [])})
+            else:
+                yield sse_event("photo_ids", {"photo_ids": []})
+                result = {}
+                branch = STREAM_BRANCHES.get(intent, stream_info_search)
+                async for kind, data in branch(user_id, query, timings):
+                    if kind == "token":
+                        yield sse_event("token", {"text": data})
+                    else:
+                        result = data
+
+            _finish_result(
+                user_id, query, intent, result, timings, total_start, cache_scope, generation
+            )
+            yield sse_event("done", result)
+
+        except Exception as e:
+            error_time = time.time() - total_start
+            logger.error(
+                f"❌ 스트리밍 처리 중 오류 발생 ({error_time:.3f}초): {str(e)}", exc_info=True
+            )
+            yield sse_event(
+                "error",
+                {
+                    "error": "요청 처리 중 오류가 발생했습니다.",
+                    "detail": str(e),
+                    "processing_time": f"{error_time:.3f}초",
+                },
+            )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/cache/invalidate")
+async def invalidate_user_cache(user_id: str = Form(...)):
+    """사용자 캐시 무효화 (rag 수집 경로에서 호출, Redis 공유 시에는 불필요)"""
+    generation = await query_cache.bump_generation(user_id)
+    return {"user_id": user_id, "generation": generation}
+
+
+@router.get("/intent/stats")
+async def get_intent_stats():
+    """의도 분류 fast-path 비율 및 LLM 대비 혼동 행렬"""
+    return intent_classifier.stats.get_stats()
+
+
+@router.get("/speculation/stats")
+async def get_speculation_stats():
+    """추측 실행 지표 (분기별 시작/적중/낭비 호출 수, 절감된 지연)"""
+    return speculation_stats.get_stats()
+
+
+@router.get("/mcp/stats")
+async def get_mcp_stats():
+    """MCP 호출 지표 (평균 응답 시간, 타임아웃, 회로 차단 상태)"""
+    return mcp_client.get_stats()
+
+
 def log_performance_summary(intent: str, timings: Dict):
     """성능 요약 로깅"""
     if intent == "conversation":
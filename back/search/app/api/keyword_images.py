@@ -1,22 +1,11 @@
 from fastapi import APIRouter, Query
-import psycopg2
-import os
-from dotenv import load_dotenv
+from app.utils.db_pool import acquire_connection
 
-load_dotenv()
 router = APIRouter()
 
-DB_PARAMS = {
-    "host": "3.38.95.110",
-    "port": "5434",
-    "database": os.getenv("POSTGRES_RAG_DB_NAME"),
-    "user": os.getenv("POSTGRES_RAG_USER"),
-    "password": os.getenv("POSTGRES_RAG_PASSWORD"),
-}
-
 
 @router.get("/keyword/images/")
-def get_images_by_keyword(
+async def get_images_by_keyword(
     user_id: str = Query(...),
     keyword: str = Query(...),
     page: int = Query(1, ge=1),
@@ -27,24 +16,19 @@ def get_images_by_keyword(
     """
     try:
         offset = (page - 1) * page_size
-        conn = psycopg2.connect(**DB_PARAMS)
-        cursor = conn.cursor()
 
         query = """
         SELECT image_id
         FROM image_keywords
-        WHERE user_id = %s AND keyword = %s
+        WHERE user_id = $1 AND keyword = $2
         ORDER BY created_at DESC
-        LIMIT %s OFFSET %s;
+        LIMIT $3 OFFSET $4;
 
         """
-        cursor.execute(query, (user_id, keyword, page_size, offset))
-        results = cursor.fetchall()
+        async with acquire_connection() as conn:
+            results = await conn.fetch(query, user_id, keyword, page_size, offset)
         image_ids = [row[0] for row in results]
 
-        cursor.close()
-        conn.close()
-
         return {
             "user_id": user_id,
             "keyword": keyword,
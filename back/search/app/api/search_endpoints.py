@@ -2,9 +2,10 @@ from fastapi import APIRouter, Form, HTTPException
 from typing import Optional, List
 from app.utils.semantic_search import (
     enhance_query_with_personal_context_v2,
-    search_similar_items_enhanced_optimized,
     filter_relevant_items_with_context,
 )
+from app.utils.vector_search import search_similar_items_async
+from app.utils.vector_metadata import time_range_filter
 import time
 import asyncio
 import logging
@@ -51,34 +52,36 @@ async def search_photos(
     user_id: str = Form(...),
     query: str = Form(...),
     top_k: Optional[int] = Form(5),
+    start_time: Optional[int] = Form(None),
+    end_time: Optional[int] = Form(None),
 ):
     """
     사진 벡터에서 검색하여 관련 사진들을 반환
     - 사진 벡터에서만 검색
     - 쿼리 확장을 통한 정확도 향상
+    - start_time / end_time (epoch 초): 촬영 시각 범위로 Pinecone에서 미리 필터링
+      (image_time 메타데이터가 없는 벡터는 제외되므로 호출한 쪽이 범위를 줄 때만 적용)
     """
-    start_time = time.time()
+    request_start = time.time()
     loop = asyncio.get_event_loop()
 
     try:
         # 1. 쿼리 확장 (색상 및 객체 분석 포함)
         expand_start = time.time()
-        expanded_queries = await loop.run_in_executor(
-            executor, enhance_query_with_personal_context_v2, user_id, query
-        )
+        expanded_queries = await enhance_query_with_personal_context_v2(user_id, query)
         logger.info(f"⏱️ 쿼리 확장: {time.time() - expand_start:.3f}초")
         logger.info(f"🔍 확장된 쿼리: {expanded_queries[:3]}")
 
         # 2. 사진 벡터에서 검색
         search_start = time.time()
-        raw_photo_results = await loop.run_in_executor(
-            executor,
-            search_similar_items_enhanced_optimized,
+        photo_search = await search_similar_items_async(
             user_id,
             expanded_queries,
             "photo",  # photo namespace만 검색
             top_k * 2,  # 필터링을 위해 더 많이 가져오기
+            base_filter=time_range_filter(start_time, end_time),
         )
+        raw_photo_results = photo_search.to_dicts()
         logger.info(f"⏱️ 벡터 검색: {time.time() - search_start:.3f}초")
         logger.info(f"📷 검색된 사진 수: {len(raw_photo_results)}")
 
@@ -105,7 +108,7 @@ async def search_photos(
                 )
             )
 
-        total_time = time.time() - start_time
+        total_time = time.time() - request_start
         logger.info(f"⏱️ 전체 검색 시간: {total_time:.3f}초")
 
         return PhotoSearchResponse(
@@ -126,34 +129,35 @@ async def search_info(
     query: str = Form(...),
     top_k: Optional[int] = Form(5),
     include_related_photos: Optional[bool] = Form(True),
+    start_time: Optional[int] = Form(None),
+    end_time: Optional[int] = Form(None),
 ):
     """
     정보 벡터에서 검색하여 관련 정보와 근거 사진 반환
     - 정보 벡터에서 검색
     - 각 정보에 대한 관련 사진도 함께 반환 (옵션)
+    - start_time / end_time (epoch 초): 촬영 시각 범위 필터
     """
-    start_time = time.time()
+    request_start = time.time()
     loop = asyncio.get_event_loop()
 
     try:
         # 1. 쿼리 확장
         expand_start = time.time()
-        expanded_queries = await loop.run_in_executor(
-            executor, enhance_query_with_personal_context_v2, user_id, query
-        )
+        expanded_queries = await enhance_query_with_personal_context_v2(user_id, query)
         logger.info(f"⏱️ 쿼리 확장: {time.time() - expand_start:.3f}초")
         logger.info(f"🔍 확장된 쿼리: {expanded_queries[:3]}")
 
         # 2. 정보 벡터에서 검색
         search_start = time.time()
-        raw_info_results = await loop.run_in_executor(
-            executor,
-            search_similar_items_enhanced_optimized,
+        info_search = await search_similar_items_async(
             user_id,
             expanded_queries,
             "info",  # info namespace만 검색
             top_k * 2,
+            base_filter=time_range_filter(start_time, end_time),
         )
+        raw_info_results = info_search.to_dicts()
         logger.info(f"⏱️ 정보 검색: {time.time() - search_start:.3f}초")
         logger.info(f"📄 검색된 정보 수: {len(raw_info_results)}")
 
@@ -177,9 +181,7 @@ async def search_info(
             photo_search_tasks = []
             for info_item in filtered_info[:top_k]:
                 # 정보 텍스트를 기반으로 관련 사진 검색
-                task = loop.run_in_executor(
-                    executor,
-                    search_similar_items_enhanced_optimized,
+                task = search_similar_items_async(
                     user_id,
                     [info_item.get("text", "")[:100]],  # 정보 텍스트의 일부를 쿼리로
                     "photo",
@@ -197,7 +199,7 @@ async def search_info(
             for i, info_item in enumerate(filtered_info[:top_k]):
                 related_photos = []
                 if i < len(related_photos_results):
-                    for photo in related_photos_results[i][:3]:
+                    for photo in related_photos_results[i].to_dicts()[:3]:
                         related_photos.append(
                             PhotoSearchResult(
                                 id=photo.get("id", "unknown"),
@@ -230,7 +232,7 @@ async def search_info(
                     )
                 )
 
-        total_time = time.time() - start_time
+        total_time = time.time() - request_start
         logger.info(f"⏱️ 전체 검색 시간: {total_time:.3f}초")
 
         return InfoSearchResponse(
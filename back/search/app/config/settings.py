@@ -12,6 +12,11 @@ DB_PARAMS = {
     "password": os.getenv("POSTGRES_RAG_PASSWORD"),
 }
 
+# DB 커넥션 풀 설정
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))
+
 # OpenAI API 설정
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY_2")
 
@@ -32,3 +37,89 @@ ANSWER_GENERATION_MODEL = "gpt-4o-mini"
 MAX_SEARCH_RESULTS = 30
 MAX_DISPLAY_RESULTS = 10
 MAX_CONTEXT_ITEMS = 5
+
+# 임베딩 배치 설정 (동시 요청을 모아 한 번에 호출)
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+EMBEDDING_BATCH_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_BATCH_MAX_CONCURRENCY", "4"))
+
+# 임베딩 캐시 설정 (EMBEDDING_CACHE_DIR 지정 시 디스크에도 저장)
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "")
+
+# 임베딩 모델 설정 (재임베딩 중에는 EMBEDDING_MIGRATING_FROM에 이전 모델 지정, 쉼표 구분)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_MIGRATING_FROM = os.getenv("EMBEDDING_MIGRATING_FROM", "")
+
+# 벡터 저장소 설정 (pinecone / local / replica)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+LOCAL_VECTOR_DIR = os.getenv("LOCAL_VECTOR_DIR", "./vector_data")
+VECTOR_REPLICA_HYDRATE_AFTER = int(os.getenv("VECTOR_REPLICA_HYDRATE_AFTER", "1"))
+# 복제본을 다시 복사하기까지의 시간 (원본 세대로 감지되지 않는 다른 프로세스의 쓰기 대비, 0이면 만료 없음)
+VECTOR_REPLICA_TTL_SECONDS = float(os.getenv("VECTOR_REPLICA_TTL_SECONDS", "300"))
+
+# 벡터 쿼리 동시 실행 수 (공유 스레드풀)
+VECTOR_QUERY_MAX_CONCURRENCY = int(os.getenv("VECTOR_QUERY_MAX_CONCURRENCY", "16"))
+
+# 의도 분류 fast-path (로컬 규칙/n-gram 신뢰도가 임계값 이상이면 LLM 생략)
+# intent_classifier.LLM_FALLBACK_EXAMPLES가 fast-path로 결정될 만큼 낮추면 분류기 생성 실패
+INTENT_FAST_PATH_THRESHOLD = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.85"))
+# fast-path로 결정한 요청 중 LLM과 비교(백그라운드)할 비율
+INTENT_SHADOW_SAMPLE_RATE = float(os.getenv("INTENT_SHADOW_SAMPLE_RATE", "0.05"))
+# 혼동 행렬 로그 출력 주기 (LLM 비교 건수 기준)
+INTENT_CONFUSION_LOG_EVERY = int(os.getenv("INTENT_CONFUSION_LOG_EVERY", "50"))
+
+# 추측 실행: 의도가 LLM으로 넘어갈 때 후보 분기를 미리 시작하고 진 분기는 취소
+SPECULATIVE_EXECUTION = os.getenv("SPECULATIVE_EXECUTION", "true").lower() == "true"
+# 미리 시작할 수 있는 분기 (쉼표 구분: find_photo,get_info,conversation)
+SPECULATIVE_BRANCHES = [
+    b.strip() for b in os.getenv("SPECULATIVE_BRANCHES", "find_photo").split(",") if b.strip()
+]
+# 로컬 분류 확률이 이 값 이상인 분기만 추측 실행
+SPECULATIVE_MIN_PROBABILITY = float(os.getenv("SPECULATIVE_MIN_PROBABILITY", "0.2"))
+# 분당 추측 실행 비용 한도 (비용 단위 = 분기에서 발생하는 LLM 호출 수 추정치)
+SPECULATIVE_BUDGET_PER_MINUTE = float(os.getenv("SPECULATIVE_BUDGET_PER_MINUTE", "60"))
+
+# 질의 결과 캐시 (memory / redis). redis 사용 시 여러 워커와 rag 서비스가 세대 카운터를 공유
+QUERY_CACHE_BACKEND = os.getenv("QUERY_CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "")
+# 임베딩 유사도로 근사 중복 쿼리 매칭
+QUERY_CACHE_SEMANTIC = os.getenv("QUERY_CACHE_SEMANTIC", "true").lower() == "true"
+QUERY_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("QUERY_CACHE_SIMILARITY_THRESHOLD", "0.97"))
+QUERY_CACHE_SEMANTIC_MAX_PER_USER = int(os.getenv("QUERY_CACHE_SEMANTIC_MAX_PER_USER", "200"))
+
+# LLM 키워드 추출/쿼리 확장 메모이제이션 (정규화된 쿼리 기준, 사용자 간 공유)
+LLM_MEMO_MAX_ENTRIES = int(os.getenv("LLM_MEMO_MAX_ENTRIES", "5000"))
+LLM_MEMO_TTL_SECONDS = int(os.getenv("LLM_MEMO_TTL_SECONDS", str(6 * 3600)))
+
+# MCP 서버 호출 (공유 httpx.AsyncClient, keep-alive 커넥션 풀)
+# - MCP_TIMEOUT_SECONDS: 호출 1회 전체 제한 시간 (스트리밍은 전체 응답 기준)
+# - MCP_HTTP2: h2 패키지가 설치되어 있고 서버가 지원할 때만 HTTP/2 사용
+# - 연속 MCP_BREAKER_FAILURE_THRESHOLD회 실패하면 MCP_BREAKER_RESET_SECONDS 동안 바로 실패 처리
+MCP_BASE_URL = os.getenv("MCP_BASE_URL", "http://mcp-api:8050")
+MCP_TIMEOUT_SECONDS = float(os.getenv("MCP_TIMEOUT_SECONDS", "30"))
+MCP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("MCP_CONNECT_TIMEOUT_SECONDS", "3"))
+MCP_MAX_CONNECTIONS = int(os.getenv("MCP_MAX_CONNECTIONS", "100"))
+MCP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MCP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+MCP_HTTP2 = os.getenv("MCP_HTTP2", "true").lower() == "true"
+MCP_BREAKER_FAILURE_THRESHOLD = int(os.getenv("MCP_BREAKER_FAILURE_THRESHOLD", "5"))
+MCP_BREAKER_RESET_SECONDS = float(os.getenv("MCP_BREAKER_RESET_SECONDS", "30"))
+
+# OpenAI 호출 게이트웨이 (공유 AsyncOpenAI 클라이언트, httpx 커넥션 풀)
+# - 예산은 이 서비스가 쓰는 키(OPENAI_API_KEY_2) 기준, 같은 키를 쓰는 프로세스 수로 나눠 설정
+# - LLM_MAX_CONCURRENCY: 동시 호출 수
+# - LLM_TOKENS_PER_MINUTE / LLM_REQUESTS_PER_MINUTE: 분당 토큰/요청 한도 (토큰은 추정치로 차감 후 usage로 보정, 0이면 제한 없음)
+# - LLM_BACKGROUND_RESERVE: 대화 저장/수집 호출이 남겨 두는 예산 비율 (검색 질의 전용)
+# - 429/5xx/타임아웃/연결 오류만 LLM_MAX_RETRIES회 재시도 (min(상한, 기본값 * 2^시도) 안에서 무작위 대기)
+LLM_KEY_NAME = "OPENAI_API_KEY_2"
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_BACKGROUND_RESERVE = float(os.getenv("LLM_BACKGROUND_RESERVE", "0.25"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", "0.5"))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "32"))
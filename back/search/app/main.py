@@ -9,6 +9,9 @@ from app.api.get_image import router as get_image_router
 from app.api.keyword_exists import router as keyword_exists_router
 from app.api.keyword_images import router as keyword_images_router
 from app.api.clipboard_latest import router as clipboard_latest_router
+from app.utils.db_pool import init_db_pool, close_db_pool
+from app.utils.mcp_client import mcp_client
+from app.utils.llm_gateway import llm_gateway
 import logging
 
 app = FastAPI()
@@ -45,6 +48,21 @@ app.include_router(clipboard_latest_router, prefix="/search")
 app.include_router(search_endpoints_router)
 
 
+
+# 애플리케이션 시작 시 DB 커넥션 풀 생성
+@app.on_event("startup")
+async def startup_event():
+    await init_db_pool()
+
+
+# 애플리케이션 종료 시 DB 커넥션 풀, MCP/OpenAI 클라이언트 정리
+@app.on_event("shutdown")
+async def shutdown_event():
+    await mcp_client.close()
+    await llm_gateway.close()
+    await close_db_pool()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -2,53 +2,63 @@ import asyncio
 import logging
 import time
 import json
-from typing import Dict, List
-from app.utils.ai_utils import generate_conversation_response
+from typing import AsyncIterator, Dict, List, Tuple
+from app.utils.ai_utils import (
+    build_conversation_messages,
+    generate_conversation_response,
+    stream_chat_completion,
+)
 from app.utils.async_utils import save_query_async, save_result_async
 from app.utils.chat_vector_store import search_chat_history
-from app.utils.context_helpers import check_if_requires_context, generate_contextualized_conversation_response
+from app.utils.context_helpers import (
+    build_contextualized_conversation_messages,
+    check_if_requires_context,
+    extract_used_history,
+    generate_contextualized_conversation_response,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def check_if_requires_context(query: str) -> bool:
-    """질문이 맥락이 필요한지 겄단히 확인"""
-    # 사용자 정보나 이전 대화를 참조하는 키워드
-    context_keywords = [
-        # 이전 대화 참조
-        "이전", "아까", "방금", "그때", "다시", "그거", "그것", "저번에", "어제", "지난", "전에",
-        # 개인 선호도 참조
-        "좋아하", "좋아해", "좋아", "좋은", "선호하", "선호도", "좋아하는", "우리", "우리는", "우리가", "우리의",
-        # 소유를 나타내는 표현
-        "내", "나의", "나는", "내가", "내가 좋아하는", "내 좋아하는", "내가 선호하는", "내 선호하는",
-        # 관심사/취미 관련
-        "취미", "취미는", "취미가", "관심사", "관심", "관심있", "여가", "여가는", "여가가",
-        # 음식/새우식품 관련
-        "음식", "음식은", "음식을", "음식이", "음식은", "먹을", "먹는", "즐겨먹", "즐겨",
-    ]
+def _load_chat_history(user_id: str, query: str, timings: Dict) -> List[Dict]:
+    """맥락이 필요한 질문이면 이전 대화 기록을 시간순으로 반환"""
+    if not check_if_requires_context(query):
+        return []
+
+    # 이전 대화 기록 검색
+    context_start = time.time()
+    chat_history = search_chat_history(user_id, query, top_k=5)
+    
+    # 이전 대화를 시간순으로 정렬
+    chat_history.sort(key=lambda x: x.get("timestamp", 0))
     
-    # 사용자 정보나 이전 대화에 대한 질문 여부
-    query_lower = query.lower()
-    return any(keyword in query_lower for keyword in context_keywords)
+    timings["context_retrieval"] = time.time() - context_start
+    logger.info(f"🔍 이전 대화 검색: {len(chat_history)}개 ({timings['context_retrieval']:.3f}초)")
+    return chat_history
+
+
+def _conversation_result(
+    query: str, response: str, used_history: List[Dict], chat_history: List[Dict], timings: Dict
+) -> Dict:
+    return {
+        "type": "conversation",
+        "query": query,
+        "answer": response,
+        "context_used": len(used_history) > 0,  # 맥락 사용 여부
+        "photo_ids": [],  # 빈 배열 유지
+        "_timings": timings,
+        "_debug": {
+            "context_count": len(chat_history),
+            "history_used": used_history,
+        } if chat_history else {},
+    }
 
 
 async def process_conversation(user_id: str, query: str, timings: Dict) -> Dict:
     """대화형 메시지 처리 - 사용자의 이전 대화 기록 활용"""
     
-    # 대화 맥락을 필요로 하는지 분석
-    requires_context = check_if_requires_context(query)
-    chat_history = []
-    
-    if requires_context:
-        # 이전 대화 기록 검색
-        context_start = time.time()
-        chat_history = search_chat_history(user_id, query, top_k=5)
-        
-        # 이전 대화를 시간순으로 정렬
-        chat_history.sort(key=lambda x: x.get("timestamp", 0))
-        
-        timings["context_retrieval"] = time.time() - context_start
-        logger.info(f"🔍 이전 대화 검색: {len(chat_history)}개 ({timings['context_retrieval']:.3f}초)")
+    # 대화 맥락을 필요로 하는지 분석 후 이전 대화 기록 검색
+    chat_history = _load_chat_history(user_id, query, timings)
     
     # 대화형 응답 생성
     response_start = time.time()
@@ -67,15 +77,44 @@ async def process_conversation(user_id: str, query: str, timings: Dict) -> Dict:
     logger.info(f"💬 대화 응답 생성 완료 ({timings['conversation_response']:.3f}초)")
 
     # 결과 구성
-    return {
-        "type": "conversation",
-        "query": query,
-        "answer": response,
-        "context_used": len(used_history) > 0,  # 맥락 사용 여부
-        "photo_ids": [],  # 빈 배열 유지
-        "_timings": timings,
-        "_debug": {
-            "context_count": len(chat_history),
-            "history_used": used_history,
-        } if chat_history else {},
-    }
+    return _conversation_result(query, response, used_history, chat_history, timings)
+
+
+async def stream_conversation(
+    user_id: str, query: str, timings: Dict
+) -> AsyncIterator[Tuple[str, object]]:
+    """
+    대화형 응답을 생성되는 대로 전달 → ("token", 조각) ... ("result", 최종 결과)
+
+    맥락 기반 응답은 마지막 줄에 사용한 대화 번호가 붙으므로, 줄이 끝날 때까지 보류했다가
+    번호 목록이 아닌 경우에만 전송
+    """
+    chat_history = _load_chat_history(user_id, query, timings)
+    messages = (
+        build_contextualized_conversation_messages(query, chat_history)
+        if chat_history
+        else build_conversation_messages(query)
+    )
+
+    response_start = time.time()
+    raw, sent = "", 0
+    async for text in stream_chat_completion(messages):
+        if "first_token" not in timings:
+            timings["first_token"] = time.time() - response_start
+        raw += text
+        cut = raw.rfind("\n") if chat_history else len(raw)
+        if cut > sent:
+            yield "token", raw[sent:cut]
+            sent = cut
+
+    if chat_history:
+        response, used_history = extract_used_history(raw, chat_history)
+        # 번호 목록 줄이 제거되지 않았으면 보류한 마지막 줄 전송
+        if response == raw.strip() and raw[sent:].strip():
+            yield "token", raw[sent:].rstrip()
+    else:
+        response, used_history = raw.strip(), []
+
+    timings["conversation_response"] = time.time() - response_start
+    logger.info(f"💬 대화 응답 스트리밍 완료 ({timings['conversation_response']:.3f}초)")
+    yield "result", _conversation_result(query, response, used_history, chat_history, timings)
@@ -2,17 +2,37 @@ import asyncio
 import logging
 import time
 import json
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Optional
 from app.utils.ai_utils import determine_image_query_intent, extract_photo_keywords
 from app.utils.db_utils import search_photos_by_keywords
+from app.utils.date_resolver import resolve_date_range
+from app.utils.geo_utils import GeoFilter
 from app.utils.async_utils import save_query_async, save_result_async
 from app.config.settings import MAX_DISPLAY_RESULTS
 
 logger = logging.getLogger(__name__)
 
+# 애매한 날짜 표현("크리스마스"만 있는 쿼리)은 거르지 않고 범위 안 사진의 점수만 올림
+DATE_MATCH_BOOST = 2.0
 
-async def process_photo_search(user_id: str, query: str, timings: Dict) -> Dict:
-    """사진 검색 처리 - 최소 3개 이상의 키워드 매칭 필요"""
+# 사진이라는 것만 가리키는 키워드 ("어제 찍은 사진" → ["사진"])
+# 날짜/위치 조건이 있으면 이 키워드만으로는 거르지 않고 조건 안의 사진 전체를 반환
+GENERIC_PHOTO_KEYWORDS = {
+    "사진", "이미지", "그림", "캡처", "캡쳐", "스크린샷", "스샷", "촬영", "찍은 사진", "포토", "photo",
+}
+
+
+def _in_range(photo: Dict, date_range) -> bool:
+    return bool(photo["image_time"]) and date_range.contains(
+        datetime.fromisoformat(photo["image_time"])
+    )
+
+
+async def process_photo_search(
+    user_id: str, query: str, timings: Dict, geo_filter: Optional[GeoFilter] = None
+) -> Dict:
+    """사진 검색 처리 - 최소 3개 이상의 키워드 매칭 필요 (geo_filter: 촬영 위치 반경)"""
     # 키워드 추출
     keyword_start = time.time()
     keywords = await extract_photo_keywords(query)
@@ -21,23 +41,58 @@ async def process_photo_search(user_id: str, query: str, timings: Dict) -> Dict:
         f"🔍 추출된 키워드 ({len(keywords)}개): {keywords[:10]} ({timings['keyword_extraction']:.3f}초)"
     )
 
+    # 날짜 표현은 LLM 없이 로컬에서 촬영 시각 범위로 변환
+    # 확실한 표현만 촬영 시각 조건으로 쓰고, 애매한 표현은 순위 가산점으로만 사용
+    date_range = resolve_date_range(query)
+    hard_range = date_range if date_range and date_range.explicit else None
+    if date_range:
+        logger.info(
+            f"📅 날짜 범위: {date_range.start} ~ {date_range.end} ({date_range.expressions}, "
+            f"{'조건' if hard_range else '가산점'})"
+        )
+
+    # 날짜/위치 조건이 있고 키워드가 "사진" 같은 일반어(또는 날짜 표현)뿐이면 조건만으로 검색
+    narrowed = hard_range is not None or geo_filter is not None
+    search_keywords = keywords
+    if narrowed:
+        ignored = {
+            word.replace(" ", "")
+            for word in GENERIC_PHOTO_KEYWORDS | set(date_range.expressions if date_range else [])
+        }
+        search_keywords = [kw for kw in keywords if kw.lower().replace(" ", "") not in ignored]
+        if not search_keywords and keywords:
+            logger.info(f"📅 일반 키워드만 있어 조건 안의 사진 전체 검색: {keywords}")
+
     # DB에서 사진 검색
     db_search_start = time.time()
-    photo_results = await search_photos_by_keywords(user_id, keywords)
+    photo_results = await search_photos_by_keywords(
+        user_id,
+        search_keywords,
+        hard_range.start_datetime if hard_range else None,
+        hard_range.end_datetime if hard_range else None,
+        geo_filter,
+    )
     timings["db_search"] = time.time() - db_search_start
 
+    if date_range and not hard_range:
+        for photo in photo_results:
+            if _in_range(photo, date_range):
+                photo["score"] += DATE_MATCH_BOOST
+
     # 결과 필터링 - 최소 3개 이상의 키워드 매칭 및 높은 점수만 포함
-    min_keyword_match = 3  # 최소 키워드 매칭 개수
-    min_score = 3.0  # 최소 필요 점수
+    # 날짜/위치 범위로 이미 좁혀진 경우 키워드 하나만 맞아도 포함
+    min_keyword_match = 1 if narrowed else 3  # 최소 키워드 매칭 개수
+    min_score = 1.0 if narrowed else 3.0  # 최소 필요 점수
 
     # 기존 검색 결과 수 저장
     total_results = len(photo_results)
 
-    # 필터링 적용
+    # 필터링 적용 (날짜/위치 조건만 있는 쿼리는 조건 안의 사진 전체)
     filtered_results = [
         photo
         for photo in photo_results
-        if photo["match_count"] >= min_keyword_match and photo["score"] >= min_score
+        if (narrowed and not search_keywords)
+        or (photo["match_count"] >= min_keyword_match and photo["score"] >= min_score)
     ]
 
     # 기본 오름차순 정렬 (어차피 SQL에서 정렬되어 오지만 확인용)
@@ -64,6 +119,15 @@ async def process_photo_search(user_id: str, query: str, timings: Dict) -> Dict:
         "type": "photo_search",
         "query": query,
         "keywords": keywords,
+        "date_range": (
+            {
+                "start": date_range.start.isoformat(),
+                "end": date_range.end.isoformat(),
+                "explicit": date_range.explicit,
+            }
+            if date_range
+            else None
+        ),
         "photo_ids": photo_ids,
         "photo_details": filtered_results[:MAX_DISPLAY_RESULTS],  # 상위 N개 상세 정보
         "answer": "",  # photo_search에서는 반드시 빈 문자열로 설정
@@ -0,0 +1,215 @@
+import time
+import asyncio
+import logging
+import threading
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.services.image_service import process_photo_search
+from app.services.info_service import process_info_search
+from app.services.conversation_service import process_conversation
+from app.utils.intent_classifier import IntentDecision, intent_classifier
+from app.utils.geo_utils import GeoFilter
+from app.config.settings import (
+    SPECULATIVE_EXECUTION,
+    SPECULATIVE_BRANCHES,
+    SPECULATIVE_MIN_PROBABILITY,
+    SPECULATIVE_BUDGET_PER_MINUTE,
+)
+
+logger = logging.getLogger(__name__)
+
+# 의도별 처리 분기
+BRANCHES: Dict[str, Callable[[str, str, Dict], Awaitable[Dict]]] = {
+    "find_photo": process_photo_search,
+    "get_info": process_info_search,
+    "conversation": process_conversation,
+}
+
+# 분기별 비용 추정치 (LLM/외부 호출 수 기준)
+BRANCH_COSTS = {"find_photo": 1.0, "get_info": 2.0, "conversation": 1.0}
+
+
+class SpeculationBudget:
+    """분당 비용 한도 (토큰 버킷, 프로세스 전역)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_spend(self, cost: float) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < cost:
+                return False
+            self.tokens -= cost
+            return True
+
+
+class SpeculationStats:
+    """추측 실행 지표 (낭비된 호출 대비 절감된 지연)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {"requests": 0, "budget_skipped": 0}
+        self._branches = {
+            intent: {
+                "started": 0,
+                "won": 0,
+                "wasted": 0,
+                "wasted_cost": 0.0,
+                "wasted_time": 0.0,
+                "saved_time": 0.0,
+            }
+            for intent in BRANCHES
+        }
+
+    def record_request(self, budget_skipped: int):
+        with self._lock:
+            self._totals["requests"] += 1
+            self._totals["budget_skipped"] += budget_skipped
+
+    def record_started(self, intent: str):
+        with self._lock:
+            self._branches[intent]["started"] += 1
+
+    def record_won(self, intent: str, saved: float):
+        with self._lock:
+            self._branches[intent]["won"] += 1
+            self._branches[intent]["saved_time"] += saved
+
+    def record_wasted(self, intent: str, elapsed: float):
+        with self._lock:
+            self._branches[intent]["wasted"] += 1
+            self._branches[intent]["wasted_cost"] += BRANCH_COSTS[intent]
+            self._branches[intent]["wasted_time"] += elapsed
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            branches = {intent: dict(stats) for intent, stats in self._branches.items()}
+            totals = dict(self._totals)
+        for stats in branches.values():
+            stats["avg_saved_ms"] = (
+                round(stats["saved_time"] / stats["won"] * 1000, 1) if stats["won"] else 0.0
+            )
+            stats["saved_time"] = round(stats["saved_time"], 3)
+            stats["wasted_time"] = round(stats["wasted_time"], 3)
+        return {
+            **totals,
+            "enabled": SPECULATIVE_EXECUTION,
+            "branches_allowed": SPECULATIVE_BRANCHES,
+            "budget_per_minute": SPECULATIVE_BUDGET_PER_MINUTE,
+            "wasted_calls": sum(s["wasted_cost"] for s in branches.values()),
+            "saved_seconds": round(sum(s["saved_time"] for s in branches.values()), 3),
+            "branches": branches,
+        }
+
+
+speculation_budget = SpeculationBudget(SPECULATIVE_BUDGET_PER_MINUTE)
+speculation_stats = SpeculationStats()
+
+
+def _plan_branches(probabilities: Dict[str, float]) -> Tuple[List[str], int]:
+    """로컬 확률 순으로 예산 안에서 미리 시작할 분기 선택 → (분기 목록, 예산 부족으로 제외된 수)"""
+    planned, skipped = [], 0
+    for intent in sorted(probabilities, key=probabilities.get, reverse=True):
+        if intent not in SPECULATIVE_BRANCHES or intent not in BRANCHES:
+            continue
+        if probabilities[intent] < SPECULATIVE_MIN_PROBABILITY:
+            continue
+        if speculation_budget.try_spend(BRANCH_COSTS[intent]):
+            planned.append(intent)
+        else:
+            skipped += 1
+    return planned, skipped
+
+
+def _select_branches(geo_filter: Optional[GeoFilter]) -> Dict[str, Callable[..., Awaitable[Dict]]]:
+    """요청 조건을 반영한 분기 목록 (위치 반경은 사진 검색에만 적용)"""
+    if geo_filter is None:
+        return BRANCHES
+    return {**BRANCHES, "find_photo": partial(process_photo_search, geo_filter=geo_filter)}
+
+
+async def _run_branch(
+    branch: Callable[..., Awaitable[Dict]], user_id: str, query: str, timings: Dict
+) -> Tuple[Dict, float]:
+    """분기 실행 → (결과, 완료 시각). 진 분기의 Task를 취소하면 진행 중인 OpenAI(httpx) 호출도 함께 취소됨"""
+    result = await branch(user_id, query, timings)
+    return result, time.time()
+
+
+def _discard(task: asyncio.Task):
+    """진 분기의 예외는 조용히 회수 (경고 로그 방지)"""
+    if not task.cancelled():
+        task.exception()
+
+
+async def dispatch_query(
+    user_id: str, query: str, timings: Dict, geo_filter: Optional[GeoFilter] = None
+) -> Tuple[IntentDecision, Dict]:
+    """
+    의도 파악 후 해당 분기 실행
+
+    로컬 분류로 확정되지 않아 LLM을 기다려야 하는 경우, 후보 분기(키워드 추출 + DB 사진 검색 등)를
+    의도 파악과 동시에 시작하고 의도가 정해지면 나머지 분기는 취소
+    """
+    branches = _select_branches(geo_filter)
+    intent_start = time.time()
+    _, confidence, probabilities = intent_classifier.score(query)
+
+    planned: List[str] = []
+    if SPECULATIVE_EXECUTION and confidence < intent_classifier.threshold:
+        planned, skipped = _plan_branches(probabilities)
+        speculation_stats.record_request(skipped)
+
+    if not planned:
+        decision = await intent_classifier.classify(query)
+        timings["intent_detection"] = time.time() - intent_start
+        branch = branches.get(decision.intent, process_info_search)
+        return decision, await branch(user_id, query, timings)
+
+    branch_timings = {intent: {} for intent in planned}
+    tasks = {
+        intent: asyncio.create_task(
+            _run_branch(branches[intent], user_id, query, branch_timings[intent])
+        )
+        for intent in planned
+    }
+    for intent in planned:
+        speculation_stats.record_started(intent)
+    logger.info(f"🏁 추측 실행 시작: {planned} (로컬 확률 {probabilities})")
+
+    try:
+        decision = await intent_classifier.classify(query)
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    intent_resolved = time.time()
+    timings["intent_detection"] = intent_resolved - intent_start
+
+    winner = tasks.pop(decision.intent, None)
+    for intent, task in tasks.items():
+        task.cancel()
+        task.add_done_callback(_discard)
+        speculation_stats.record_wasted(intent, intent_resolved - intent_start)
+    if tasks:
+        logger.info(f"🗑️ 추측 실행 취소: {list(tasks)} (의도: {decision.intent})")
+
+    if winner is None:
+        branch = branches.get(decision.intent, process_info_search)
+        return decision, await branch(user_id, query, timings)
+
+    result, finished = await winner
+    # 순차 실행 대비 절감 = min(의도 파악 시간, 분기 실행 시간)
+    saved = min(intent_resolved, finished) - intent_start
+    speculation_stats.record_won(decision.intent, saved)
+    timings.update(branch_timings[decision.intent])
+    timings["speculation_saved"] = saved
+    logger.info(f"⚡ 추측 실행 적중: {decision.intent} (절감 {saved:.3f}초)")
+    return decision, result
@@ -1,13 +1,10 @@
-import asyncio
 import json
 import re
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict
 import logging
-from openai import OpenAI
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timedelta
+from app.utils.llm_gateway import llm_gateway
+from app.utils.llm_memo import llm_memo, memo_key
 from app.config.settings import (
-    OPENAI_API_KEY,
     INTENT_MODEL,
     KEYWORD_EXTRACTION_MODEL,
     QUERY_EXPANSION_MODEL,
@@ -16,18 +13,15 @@ from app.config.settings import (
 
 logger = logging.getLogger(__name__)
 
-# OpenAI 클라이언트
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-
-# ThreadPoolExecutor
-executor = ThreadPoolExecutor(max_workers=10)
+# 프롬프트 버전 (프롬프트를 바꾸면 올려서 이전 메모 결과를 사용하지 않도록 함)
+PHOTO_KEYWORD_PROMPT_VERSION = "photo_keywords:v2"
+INFO_EXPANSION_PROMPT_VERSION = "info_expansion:v1"
 
 
 async def determine_image_query_intent(query: str) -> str:
     """질문의 의도를 파악 - 사진 찾기, 정보 요청, 일반 대화 구분"""
 
-    def sync_determine_intent():
-        prompt = f"""
+    prompt = f"""
 사용자의 질문이 다음 중 어느 의도에 해당하는지 분석하세요:
 - "find_photo": 사용자가 사진을 찾고자 함
 - "get_info": 사용자가 텍스트 정보나 설명을 원함
@@ -53,29 +47,26 @@ async def determine_image_query_intent(query: str) -> str:
 응답은 반드시 "find_photo", "get_info", "conversation" 중 하나만 주세요.
 """
 
-        response = openai_client.chat.completions.create(
-            model=INTENT_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 의도 분류 전문가야. 정확하게 분류해줘.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0,
-        )
-
-        return response.choices[0].message.content.strip().lower()
+    content = await llm_gateway.chat(
+        model=INTENT_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 의도 분류 전문가야. 정확하게 분류해줘.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0,
+    )
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_determine_intent)
+    return content.strip().lower()
 
 
 async def extract_photo_keywords(query: str) -> List[str]:
-    """사진 검색을 위한 키워드 추출 - 직접 관련 키워드와 날짜 표현 처리"""
+    """사진 검색을 위한 키워드 추출 - 직접 관련 키워드만 (날짜 표현은 resolve_date_range로 처리)"""
 
-    def sync_extract_keywords():
-        # 1. 키워드 추출 프롬프트
+    async def request_keywords():
+        # 키워드 추출 프롬프트
         prompt = f"""
 다음 질문에서 **사진 검색에 도움이 될 핵심 키워드**를 가능한 많이 추출하세요.
 
@@ -93,7 +84,7 @@ async def extract_photo_keywords(query: str) -> List[str]:
 결과는 JSON 배열로만 출력하세요.
 """
 
-        keyword_response = openai_client.chat.completions.create(
+        keywords_raw = await llm_gateway.chat(
             model=KEYWORD_EXTRACTION_MODEL,
             messages=[
                 {
@@ -105,8 +96,6 @@ async def extract_photo_keywords(query: str) -> List[str]:
             temperature=0.2,
         )
 
-        keywords_raw = keyword_response.choices[0].message.content
-
         # 코드블록 제거
         if "```" in keywords_raw:
             keywords_raw = (
@@ -121,91 +110,9 @@ async def extract_photo_keywords(query: str) -> List[str]:
                 kw.strip() for kw in keywords_raw.strip("[]").split(",") if kw.strip()
             ]
 
-        # 2. 시간 표현이 있는지 확인하고 날짜 추출
-        time_words = [
-            "어제",
-            "오늘",
-            "내일",
-            "그저께",
-            "모레",
-            "지난주",
-            "이번주",
-            "다음주",
-            "지난달",
-            "이번달",
-            "다음달",
-            "작년",
-            "올해",
-            "내년",
-            "전날",
-            "다음날",
-        ]
-
-        has_time_expression = any(word in query for word in time_words)
-
-        date_keywords = []
-        if has_time_expression:
-            # 현재 날짜 가져오기
-            current_date = datetime.now()
-
-            # 날짜 추출 프롬프트
-            date_prompt = f"""
-다음 질문의 시간 표현을 오늘 날짜({current_date.strftime('%Y년 %m월 %d일')})를 기준으로 
-정확한 날짜(YYYY년 MM월 DD일)로 변환하세요.
-
-질문: {query}
-
-반환 규칙:
-1. 날짜만 추출하여 "YYYY년 MM월 DD일" 형식으로 반환
-2. 날짜 범위가 있으면 시작일과 종료일을 "YYYY년 MM월 DD일~YYYY년 MM월 DD일" 형식으로 반환
-3. 날짜 정보가 없으면 빈 배열([])을 반환
-
-예시:
-- "어제 찍은 사진" → (오늘이 2025년 05월 16일일 경우) ["2025년 05월 15일"]
-- "지난주 여행" → ["2025년 05월 05일~2025년 05월 11일"]
-- "이번달 초에 찍은 사진" → ["2025년 05월 01일~2025년 05월 05일"]
-- "작년 크리스마스" → ["2024년 12월 25일"]
-
-JSON 배열로만 반환하세요.
-"""
-
-            date_response = openai_client.chat.completions.create(
-                model=KEYWORD_EXTRACTION_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "날짜 추출 전문가. 질문에서 언급된 시간 표현을 정확한 날짜로 변환. JSON 배열만 반환.",
-                    },
-                    {"role": "user", "content": date_prompt},
-                ],
-                temperature=0.1,
-            )
-
-            date_raw = date_response.choices[0].message.content
-
-            # 코드블록 제거
-            if "```" in date_raw:
-                date_raw = date_raw.replace("```json", "").replace("```", "").strip()
-
-            try:
-                date_data = json.loads(date_raw)
-                date_keywords.extend(date_data)
-            except json.JSONDecodeError:
-                # 파싱 실패시 날짜에 대한 간단한 처리
-                if "어제" in query:
-                    yesterday = current_date - timedelta(days=1)
-                    date_keywords.append(yesterday.strftime("%Y년 %m월 %d일"))
-                elif "오늘" in query:
-                    date_keywords.append(current_date.strftime("%Y년 %m월 %d일"))
-                elif "내일" in query:
-                    tomorrow = current_date + timedelta(days=1)
-                    date_keywords.append(tomorrow.strftime("%Y년 %m월 %d일"))
-
-        # 3. 키워드와 날짜 합치기
-        final_keywords = keywords + date_keywords
-
+        # 날짜 표현은 date_resolver에서 촬영 시각 범위로 변환하므로 키워드에 넣지 않음
         final_keywords_clean = []
-        for item in final_keywords:
+        for item in keywords:
             if isinstance(item, str):
                 final_keywords_clean.append(item.strip())
             elif isinstance(item, list):
@@ -217,14 +124,17 @@ JSON 배열로만 반환하세요.
         # 빈 문자열 제거 후 중복 제거
         return list(set([kw for kw in final_keywords_clean if kw]))
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_extract_keywords)
+    # 같은 (정규화) 쿼리는 사용자와 관계없이 결과 재사용, 동시 요청은 호출 하나로 합침
+    # 결과가 오늘 날짜와 무관하므로 기준 날짜 없이 메모
+    key = memo_key(PHOTO_KEYWORD_PROMPT_VERSION, KEYWORD_EXTRACTION_MODEL, query)
+    keywords = await llm_memo.get_or_compute_async(key, request_keywords)
+    return list(keywords)
 
 
 async def expand_info_query(query: str) -> List[str]:
     """정보 검색을 위한 쿼리 확장"""
 
-    def sync_expand_query():
+    async def request_expanded_queries():
         prompt = f"""
 다음 질문과 관련된 다양한 검색 쿼리를 생성하세요.
 원본 질문의 의미를 유지하면서 동의어, 관련어, 다양한 표현을 사용합니다.
@@ -245,7 +155,7 @@ async def expand_info_query(query: str) -> List[str]:
 JSON 배열로 5-7개의 변형 쿼리를 반환하세요.
 """
 
-        response = openai_client.chat.completions.create(
+        queries_raw = await llm_gateway.chat(
             model=QUERY_EXPANSION_MODEL,
             messages=[
                 {"role": "system", "content": "쿼리 확장 전문가. JSON 배열만 반환."},
@@ -254,21 +164,25 @@ JSON 배열로 5-7개의 변형 쿼리를 반환하세요.
             temperature=0.3,
         )
 
-        queries_raw = response.choices[0].message.content
-
         # 코드블록 제거
         if "```" in queries_raw:
             queries_raw = queries_raw.replace("```json", "").replace("```", "").strip()
 
-        try:
-            expanded = json.loads(queries_raw)
-            expanded.append(query)  # 원본 쿼리 포함
-            return list(set(expanded))[:8]
-        except:
-            return [query]
+        # 파싱 실패는 메모하지 않도록 예외로 전달
+        expanded = json.loads(queries_raw)
+        expanded.append(query)  # 원본 쿼리 포함
+        return list(set(expanded))[:8]
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_expand_query)
+    key = memo_key(INFO_EXPANSION_PROMPT_VERSION, QUERY_EXPANSION_MODEL, query)
+    try:
+        expanded = await llm_memo.get_or_compute_async(key, request_expanded_queries)
+    except (ValueError, AttributeError, TypeError):
+        return [query]
+    # 정규화가 같은 다른 표현으로 저장된 결과일 수 있으므로 원본 쿼리 보장
+    expanded = list(expanded)
+    if query not in expanded:
+        expanded.append(query)
+    return expanded
 
 
 async def generate_info_answer(
@@ -276,20 +190,19 @@ async def generate_info_answer(
 ) -> str:
     """정보 기반 질문에 대한 답변 생성"""
 
-    def sync_generate_answer():
-        # context 정보를 더 체계적으로 정리
-        context_texts = []
-        for i, item in enumerate(context_info[:5]):  # 상위 5개만 사용
-            text = item.get("text", "").strip()
-            if text:
-                context_texts.append(f"{i+1}. {text}")
+    # context 정보를 더 체계적으로 정리
+    context_texts = []
+    for i, item in enumerate(context_info[:5]):  # 상위 5개만 사용
+        text = item.get("text", "").strip()
+        if text:
+            context_texts.append(f"{i+1}. {text}")
 
-        context_text = "\n".join(context_texts)
+    context_text = "\n".join(context_texts)
 
-        if not context_text:
-            return "관련 정보를 찾을 수 없습니다. 다른 질문을 해보세요."
+    if not context_text:
+        return "관련 정보를 찾을 수 없습니다. 다른 질문을 해보세요."
 
-        prompt = f"""
+    prompt = f"""
 사용자의 질문에 대해 아래 제공된 정보를 활용하여 답변하세요.
 정보가 부족하다면 그 사실을 언급하고, 알려진 내용만으로 답변하세요.
 
@@ -308,29 +221,22 @@ async def generate_info_answer(
 답변:
 """
 
-        response = openai_client.chat.completions.create(
-            model=ANSWER_GENERATION_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 제공된 정보를 활용해 정확하고 도움이 되는 답변을 해줘.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
-
-        return response.choices[0].message.content
-
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_generate_answer)
-
-
-async def generate_conversation_response(user_id: str, query: str) -> str:
-    """대화형 질문에 대한 응답 생성"""
-
-    def sync_generate_conversation():
-        prompt = f"""
+    return await llm_gateway.chat(
+        model=ANSWER_GENERATION_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 사용자의 개인 비서야. 제공된 정보를 활용해 정확하고 도움이 되는 답변을 해줘.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.7,
+    )
+
+
+def build_conversation_messages(query: str) -> List[Dict]:
+    """대화형 응답 생성용 메시지 (일반/스트리밍 응답 공용)"""
+    prompt = f"""
 사용자의 일상적인 대화나 개인적인 정보 공유에 적절하게 응답하세요.
 사용자가 선호도, 감정, 경험을 공유할 때 공감하고 자연스럽게 대화를 이어나가세요.
 
@@ -346,23 +252,31 @@ async def generate_conversation_response(user_id: str, query: str) -> str:
 
 응답:
 """
+    return [
+        {
+            "role": "system",
+            "content": "너는 사용자의 개인 비서야. 자연스럽고 친근한 대화를 해줘.",
+        },
+        {"role": "user", "content": prompt},
+    ]
 
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 자연스럽고 친근한 대화를 해줘.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
 
-        return response.choices[0].message.content
+async def generate_conversation_response(user_id: str, query: str) -> str:
+    """대화형 질문에 대한 응답 생성"""
+
+    return await llm_gateway.chat(
+        model="gpt-4o-mini",
+        messages=build_conversation_messages(query),
+        temperature=0.7,
+    )
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_generate_conversation)
+
+async def stream_chat_completion(
+    messages: List[Dict], model: str = "gpt-4o-mini", temperature: float = 0.7
+) -> AsyncIterator[str]:
+    """채팅 응답을 생성되는 대로 조각(str) 단위로 반환"""
+    async for text in llm_gateway.stream_chat(messages, model, temperature):
+        yield text
 
 
 async def generate_enhanced_info_answer(
@@ -370,19 +284,18 @@ async def generate_enhanced_info_answer(
 ) -> tuple[str, List[int]]:
     """개선된 정보 기반 답변 생성 - 사용된 컨텍스트 인덱스 반환 & 불충분한 정보에도 대응"""
 
-    def sync_generate_enhanced_answer():
-        # context 정보를 더 체계적으로 정리
-        context_texts = []
-        for i, item in enumerate(context_info[:5]):  # 상위 5개만 사용
-            text = item.get("text", "").strip()
-            if text:
-                context_texts.append(f"{i+1}. {text}")
+    # context 정보를 더 체계적으로 정리
+    context_texts = []
+    for i, item in enumerate(context_info[:5]):  # 상위 5개만 사용
+        text = item.get("text", "").strip()
+        if text:
+            context_texts.append(f"{i+1}. {text}")
 
-        context_text = "\n".join(context_texts)
+    context_text = "\n".join(context_texts)
 
-        # 사용된 컨텍스트 인덱스를 추적하기 위한 프롬프트 추가
-        if context_text:
-            prompt = f"""
+    # 사용된 컨텍스트 인덱스를 추적하기 위한 프롬프트 추가
+    if context_text:
+        prompt = f"""
 사용자의 질문에 대해 아래 제공된 정보를 활용하여 답변하세요.
 정보가 부족하더라도 최대한 관련된 내용을 추출하여 자연스러운 답변을 구성하세요.
 
@@ -401,9 +314,9 @@ async def generate_enhanced_info_answer(
 
 답변:
 """
-        else:
-            # 컨텍스트가 없는 경우
-            prompt = f"""
+    else:
+        # 컨텍스트가 없는 경우
+        prompt = f"""
 사용자의 질문: "{query}"
 
 질문에 대한 정확한 정보를 찾지 못했지만, 최대한 관련된 내용을 제공해보세요. 
@@ -412,48 +325,45 @@ async def generate_enhanced_info_answer(
 답변:
 """
 
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # 다른 모델로 변경 가능
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 제공된 정보를 활용해 정확하고 도움이 되는 답변을 해줘. 어떤 정보를 사용했는지 표시하라.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
-
-        answer = response.choices[0].message.content.strip()
-
-        # 사용된 컨텍스트 인덱스 추출
-        used_indices = []
-        if context_text:  # 컨텍스트가 있었을 때만 추출
-            # 답변 끝부분에서 번호 목록 추출
-            indices_pattern = r"\b([0-9]+(?:,\s*[0-9]+)*)\b"
-            indices_matches = re.findall(indices_pattern, answer.split("\n")[-1])
-
-            if indices_matches:
-                # 마지막 변에서 받은 것이 리스트의 형태로 도출되면 그걸 사용
-                last_match = indices_matches[-1]
-                for idx_str in last_match.split(","):
-                    try:
-                        idx = int(idx_str.strip()) - 1  # 1-based -> 0-based
-                        if 0 <= idx < len(context_info):
-                            used_indices.append(idx)
-                    except ValueError:
-                        continue
-
-            # 수처리된 마지막 행을 제거 (외부에서 보이지 않게)
-            if used_indices and "\n" in answer:
-                lines = answer.split("\n")
-                if any(
-                    all(c in "0123456789, " for c in line.strip())
-                    for line in lines[-2:]
-                ):
-                    answer = "\n".join(lines[:-1]).strip()
-
-        return answer, used_indices
-
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_generate_enhanced_answer)
+    content = await llm_gateway.chat(
+        model="gpt-4o-mini",  # 다른 모델로 변경 가능
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 사용자의 개인 비서야. 제공된 정보를 활용해 정확하고 도움이 되는 답변을 해줘. 어떤 정보를 사용했는지 표시하라.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.7,
+    )
+
+    answer = content.strip()
+
+    # 사용된 컨텍스트 인덱스 추출
+    used_indices = []
+    if context_text:  # 컨텍스트가 있었을 때만 추출
+        # 답변 끝부분에서 번호 목록 추출
+        indices_pattern = r"\b([0-9]+(?:,\s*[0-9]+)*)\b"
+        indices_matches = re.findall(indices_pattern, answer.split("\n")[-1])
+
+        if indices_matches:
+            # 마지막 변에서 받은 것이 리스트의 형태로 도출되면 그걸 사용
+            last_match = indices_matches[-1]
+            for idx_str in last_match.split(","):
+                try:
+                    idx = int(idx_str.strip()) - 1  # 1-based -> 0-based
+                    if 0 <= idx < len(context_info):
+                        used_indices.append(idx)
+                except ValueError:
+                    continue
+
+        # 수처리된 마지막 행을 제거 (외부에서 보이지 않게)
+        if used_indices and "\n" in answer:
+            lines = answer.split("\n")
+            if any(
+                all(c in "0123456789, " for c in line.strip())
+                for line in lines[-2:]
+            ):
+                answer = "\n".join(lines[:-1]).strip()
+
+    return answer, used_indices
@@ -1,13 +1,10 @@
-import asyncio
 import json
 import re
 from typing import List, Dict, Optional, Tuple
 import logging
-from openai import OpenAI
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from app.utils.llm_gateway import llm_gateway
 from app.config.settings import (
-    OPENAI_API_KEY,
     INTENT_MODEL,
     KEYWORD_EXTRACTION_MODEL,
     QUERY_EXPANSION_MODEL,
@@ -16,18 +13,11 @@ from app.config.settings import (
 
 logger = logging.getLogger(__name__)
 
-# OpenAI 클라이언트
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
-
-# ThreadPoolExecutor
-executor = ThreadPoolExecutor(max_workers=10)
-
 
 async def determine_image_query_intent(query: str) -> str:
     """질문의 의도를 파악 - 사진 찾기, 정보 요청, 일반 대화 구분"""
 
-    def sync_determine_intent():
-        prompt = f"""
+    prompt = f"""
 사용자의 질문이 다음 중 어느 의도에 해당하는지 분석하세요:
 - "find_photo": 사용자가 사진을 찾고자 함
 - "get_info": 사용자가 텍스트 정보나 설명을 원함
@@ -53,30 +43,26 @@ async def determine_image_query_intent(query: str) -> str:
 응답은 반드시 "find_photo", "get_info", "conversation" 중 하나만 주세요.
 """
 
-        response = openai_client.chat.completions.create(
-            model=INTENT_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 의도 분류 전문가야. 정확하게 분류해줘.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0,
-        )
-
-        return response.choices[0].message.content.strip().lower()
+    content = await llm_gateway.chat(
+        model=INTENT_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 의도 분류 전문가야. 정확하게 분류해줘.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0,
+    )
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_determine_intent)
+    return content.strip().lower()
 
 
 async def extract_photo_keywords(query: str) -> List[str]:
     """사진 검색을 위한 키워드 추출 - 직접 관련 키워드와 날짜 표현 처리"""
 
-    def sync_extract_keywords():
-        # 1. 키워드 추출 프롬프트
-        prompt = f"""
+    # 1. 키워드 추출 프롬프트
+    prompt = f"""
 다음 질문에서 **사진 검색에 도움이 될 핵심 키워드**를 가능한 많이 추출하세요.
 
 - 질문과 **직접 관련된 명사 및 형용사** 중심으로 추출
@@ -93,63 +79,61 @@ async def extract_photo_keywords(query: str) -> List[str]:
 결과는 JSON 배열로만 출력하세요.
 """
 
-        keyword_response = openai_client.chat.completions.create(
-            model=KEYWORD_EXTRACTION_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "키워드 추출 전문가. 사진 검색에 직접 관련된 핵심 키워드만 추출. JSON 배열만 반환.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.2,
-        )
-
-        keywords_raw = keyword_response.choices[0].message.content
+    keywords_raw = await llm_gateway.chat(
+        model=KEYWORD_EXTRACTION_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "키워드 추출 전문가. 사진 검색에 직접 관련된 핵심 키워드만 추출. JSON 배열만 반환.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.2,
+    )
 
-        # 코드블록 제거
-        if "```" in keywords_raw:
-            keywords_raw = (
-                keywords_raw.replace("```json", "").replace("```", "").strip()
-            )
+    # 코드블록 제거
+    if "```" in keywords_raw:
+        keywords_raw = (
+            keywords_raw.replace("```json", "").replace("```", "").strip()
+        )
 
-        try:
-            keywords = json.loads(keywords_raw)
-        except json.JSONDecodeError:
-            # JSON 파싱 실패시 간단한 처리
-            keywords = [
-                kw.strip() for kw in keywords_raw.strip("[]").split(",") if kw.strip()
-            ]
-
-        # 2. 시간 표현이 있는지 확인하고 날짜 추출
-        time_words = [
-            "어제",
-            "오늘",
-            "내일",
-            "그저께",
-            "모레",
-            "지난주",
-            "이번주",
-            "다음주",
-            "지난달",
-            "이번달",
-            "다음달",
-            "작년",
-            "올해",
-            "내년",
-            "전날",
-            "다음날",
+    try:
+        keywords = json.loads(keywords_raw)
+    except json.JSONDecodeError:
+        # JSON 파싱 실패시 간단한 처리
+        keywords = [
+            kw.strip() for kw in keywords_raw.strip("[]").split(",") if kw.strip()
         ]
 
-        has_time_expression = any(word in query for word in time_words)
-
-        date_keywords = []
-        if has_time_expression:
-            # 현재 날짜 가져오기
-            current_date = datetime.now()
-
-            # 날짜 추출 프롬프트
-            date_prompt = f"""
+    # 2. 시간 표현이 있는지 확인하고 날짜 추출
+    time_words = [
+        "어제",
+        "오늘",
+        "내일",
+        "그저께",
+        "모레",
+        "지난주",
+        "이번주",
+        "다음주",
+        "지난달",
+        "이번달",
+        "다음달",
+        "작년",
+        "올해",
+        "내년",
+        "전날",
+        "다음날",
+    ]
+
+    has_time_expression = any(word in query for word in time_words)
+
+    date_keywords = []
+    if has_time_expression:
+        # 현재 날짜 가져오기
+        current_date = datetime.now()
+
+        # 날짜 추출 프롬프트
+        date_prompt = f"""
 다음 질문의 시간 표현을 오늘 날짜({current_date.strftime('%Y년 %m월 %d일')})를 기준으로 
 정확한 날짜(YYYY년 MM월 DD일)로 변환하세요.
 
@@ -169,53 +153,47 @@ async def extract_photo_keywords(query: str) -> List[str]:
 JSON 배열로만 반환하세요.
 """
 
-            date_response = openai_client.chat.completions.create(
-                model=KEYWORD_EXTRACTION_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "날짜 추출 전문가. 질문에서 언급된 시간 표현을 정확한 날짜로 변환. JSON 배열만 반환.",
-                    },
-                    {"role": "user", "content": date_prompt},
-                ],
-                temperature=0.1,
-            )
-
-            date_raw = date_response.choices[0].message.content
-
-            # 코드블록 제거
-            if "```" in date_raw:
-                date_raw = date_raw.replace("```json", "").replace("```", "").strip()
+        date_raw = await llm_gateway.chat(
+            model=KEYWORD_EXTRACTION_MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "날짜 추출 전문가. 질문에서 언급된 시간 표현을 정확한 날짜로 변환. JSON 배열만 반환.",
+                },
+                {"role": "user", "content": date_prompt},
+            ],
+            temperature=0.1,
+        )
 
-            try:
-                date_data = json.loads(date_raw)
-                date_keywords.extend(date_data)
-            except json.JSONDecodeError:
-                # 파싱 실패시 날짜에 대한 간단한 처리
-                if "어제" in query:
-                    yesterday = current_date - timedelta(days=1)
-                    date_keywords.append(yesterday.strftime("%Y년 %m월 %d일"))
-                elif "오늘" in query:
-                    date_keywords.append(current_date.strftime("%Y년 %m월 %d일"))
-                elif "내일" in query:
-                    tomorrow = current_date + timedelta(days=1)
-                    date_keywords.append(tomorrow.strftime("%Y년 %m월 %d일"))
+        # 코드블록 제거
+        if "```" in date_raw:
+            date_raw = date_raw.replace("```json", "").replace("```", "").strip()
 
-        # 3. 키워드와 날짜 합치기
-        final_keywords = keywords + date_keywords
+        try:
+            date_data = json.loads(date_raw)
+            date_keywords.extend(date_data)
+        except json.JSONDecodeError:
+            # 파싱 실패시 날짜에 대한 간단한 처리
+            if "어제" in query:
+                yesterday = current_date - timedelta(days=1)
+                date_keywords.append(yesterday.strftime("%Y년 %m월 %d일"))
+            elif "오늘" in query:
+                date_keywords.append(current_date.strftime("%Y년 %m월 %d일"))
+            elif "내일" in query:
+                tomorrow = current_date + timedelta(days=1)
+                date_keywords.append(tomorrow.strftime("%Y년 %m월 %d일"))
 
-        # 중복 제거
-        return list(set(final_keywords))
+    # 3. 키워드와 날짜 합치기
+    final_keywords = keywords + date_keywords
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_extract_keywords)
+    # 중복 제거
+    return list(set(final_keywords))
 
 
 async def expand_info_query(query: str) -> List[str]:
     """정보 검색을 위한 쿼리 확장"""
 
-    def sync_expand_query():
-        prompt = f"""
+    prompt = f"""
 다음 질문과 관련된 다양한 검색 쿼리를 생성하세요.
 원본 질문의 의미를 유지하면서 동의어, 관련어, 다양한 표현을 사용합니다.
 
@@ -235,30 +213,25 @@ async def expand_info_query(query: str) -> List[str]:
 JSON 배열로 5-7개의 변형 쿼리를 반환하세요.
 """
 
-        response = openai_client.chat.completions.create(
-            model=QUERY_EXPANSION_MODEL,
-            messages=[
-                {"role": "system", "content": "쿼리 확장 전문가. JSON 배열만 반환."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,
-        )
-
-        queries_raw = response.choices[0].message.content
-
-        # 코드블록 제거
-        if "```" in queries_raw:
-            queries_raw = queries_raw.replace("```json", "").replace("```", "").strip()
+    queries_raw = await llm_gateway.chat(
+        model=QUERY_EXPANSION_MODEL,
+        messages=[
+            {"role": "system", "content": "쿼리 확장 전문가. JSON 배열만 반환."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+    )
 
-        try:
-            expanded = json.loads(queries_raw)
-            expanded.append(query)  # 원본 쿼리 포함
-            return list(set(expanded))[:8]
-        except:
-            return [query]
+    # 코드블록 제거
+    if "```" in queries_raw:
+        queries_raw = queries_raw.replace("```json", "").replace("```", "").strip()
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_expand_query)
+    try:
+        expanded = json.loads(queries_raw)
+        expanded.append(query)  # 원본 쿼리 포함
+        return list(set(expanded))[:8]
+    except:
+        return [query]
 
 
 async def generate_info_answer(
@@ -266,20 +239,19 @@ async def generate_info_answer(
 ) -> str:
     """정보 기반 질문에 대한 답변 생성"""
 
-    def sync_generate_answer():
-        # context 정보를 더 체계적으로 정리
-        context_texts = []
-        for i, item in enumerate(context_info[:5]):  # 상위 5개만 사용
-            text = item.get("text", "").strip()
-            if text:
-                context_texts.append(f"{i+1}. {text}")
+    # context 정보를 더 체계적으로 정리
+    context_texts = []
+    for i, item in enumerate(context_info[:5]):  # 상위 5개만 사용
+        text = item.get("text", "").strip()
+        if text:
+            context_texts.append(f"{i+1}. {text}")
 
-        context_text = "\n".join(context_texts)
+    context_text = "\n".join(context_texts)
 
-        if not context_text:
-            return "관련 정보를 찾을 수 없습니다. 다른 질문을 해보세요."
+    if not context_text:
+        return "관련 정보를 찾을 수 없습니다. 다른 질문을 해보세요."
 
-        prompt = f"""
+    prompt = f"""
 사용자의 질문에 대해 아래 제공된 정보를 활용하여 답변하세요.
 정보가 부족하다면 그 사실을 언급하고, 알려진 내용만으로 답변하세요.
 
@@ -298,22 +270,17 @@ async def generate_info_answer(
 답변:
 """
 
-        response = openai_client.chat.completions.create(
-            model=ANSWER_GENERATION_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 제공된 정보를 활용해 정확하고 도움이 되는 답변을 해줘.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
-
-        return response.choices[0].message.content
-
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_generate_answer)
+    return await llm_gateway.chat(
+        model=ANSWER_GENERATION_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 사용자의 개인 비서야. 제공된 정보를 활용해 정확하고 도움이 되는 답변을 해줘.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.7,
+    )
 
 
 async def generate_enhanced_info_answer(
@@ -321,19 +288,18 @@ async def generate_enhanced_info_answer(
 ) -> Tuple[str, List[int]]:
     """개선된 정보 기반 답변 생성 - 사용된 컨텍스트 인덱스 반환 & 불충분한 정보에도 대응"""
 
-    def sync_generate_enhanced_answer():
-        # context 정보를 더 체계적으로 정리
-        context_texts = []
-        for i, item in enumerate(context_info[:5]):  # 상위 5개만 사용
-            text = item.get("text", "").strip()
-            if text:
-                context_texts.append(f"{i+1}. {text}")
+    # context 정보를 더 체계적으로 정리
+    context_texts = []
+    for i, item in enumerate(context_info[:5]):  # 상위 5개만 사용
+        text = item.get("text", "").strip()
+        if text:
+            context_texts.append(f"{i+1}. {text}")
 
-        context_text = "\n".join(context_texts)
+    context_text = "\n".join(context_texts)
 
-        # 사용된 컨텍스트 인덱스를 추적하기 위한 프롬프트 추가
-        if context_text:
-            prompt = f"""
+    # 사용된 컨텍스트 인덱스를 추적하기 위한 프롬프트 추가
+    if context_text:
+        prompt = f"""
 사용자의 질문에 대해 아래 제공된 정보를 활용하여 답변하세요.
 정보가 부족하더라도 최대한 관련된 내용을 추출하여 자연스러운 답변을 구성하세요.
 
@@ -352,9 +318,9 @@ async def generate_enhanced_info_answer(
 
 답변:
 """
-        else:
-            # 컨텍스트가 없는 경우
-            prompt = f"""
+    else:
+        # 컨텍스트가 없는 경우
+        prompt = f"""
 사용자의 질문: "{query}"
 
 질문에 대한 정확한 정보를 찾지 못했지만, 최대한 관련된 내용을 제공해보세요. 
@@ -363,58 +329,54 @@ async def generate_enhanced_info_answer(
 답변:
 """
 
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # 다른 모델로 변경 가능
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 제공된 정보를 활용해 정확하고 도움이 되는 답변을 해줘. 어떤 정보를 사용했는지 표시하라.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
+    content = await llm_gateway.chat(
+        model="gpt-4o-mini",  # 다른 모델로 변경 가능
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 사용자의 개인 비서야. 제공된 정보를 활용해 정확하고 도움이 되는 답변을 해줘. 어떤 정보를 사용했는지 표시하라.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.7,
+    )
 
-        answer = response.choices[0].message.content.strip()
-
-        # 사용된 컨텍스트 인덱스 추출
-        used_indices = []
-        if context_text:  # 컨텍스트가 있었을 때만 추출
-            # 답변 끝부분에서 번호 목록 추출
-            indices_pattern = r"\b([0-9]+(?:,\s*[0-9]+)*)\b"
-            indices_matches = re.findall(indices_pattern, answer.split("\n")[-1])
-
-            if indices_matches:
-                # 마지막 변에서 받은 것이 리스트의 형태로 도출되면 그걸 사용
-                last_match = indices_matches[-1]
-                for idx_str in last_match.split(","):
-                    try:
-                        idx = int(idx_str.strip()) - 1  # 1-based -> 0-based
-                        if 0 <= idx < len(context_info):
-                            used_indices.append(idx)
-                    except ValueError:
-                        continue
-
-            # 수처리된 마지막 행을 제거 (외부에서 보이지 않게)
-            if used_indices and "\n" in answer:
-                lines = answer.split("\n")
-                if any(
-                    all(c in "0123456789, " for c in line.strip())
-                    for line in lines[-2:]
-                ):
-                    answer = "\n".join(lines[:-1]).strip()
-
-        return answer, used_indices
-
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_generate_enhanced_answer)
+    answer = content.strip()
+
+    # 사용된 컨텍스트 인덱스 추출
+    used_indices = []
+    if context_text:  # 컨텍스트가 있었을 때만 추출
+        # 답변 끝부분에서 번호 목록 추출
+        indices_pattern = r"\b([0-9]+(?:,\s*[0-9]+)*)\b"
+        indices_matches = re.findall(indices_pattern, answer.split("\n")[-1])
+
+        if indices_matches:
+            # 마지막 변에서 받은 것이 리스트의 형태로 도출되면 그걸 사용
+            last_match = indices_matches[-1]
+            for idx_str in last_match.split(","):
+                try:
+                    idx = int(idx_str.strip()) - 1  # 1-based -> 0-based
+                    if 0 <= idx < len(context_info):
+                        used_indices.append(idx)
+                except ValueError:
+                    continue
+
+        # 수처리된 마지막 행을 제거 (외부에서 보이지 않게)
+        if used_indices and "\n" in answer:
+            lines = answer.split("\n")
+            if any(
+                all(c in "0123456789, " for c in line.strip())
+                for line in lines[-2:]
+            ):
+                answer = "\n".join(lines[:-1]).strip()
+
+    return answer, used_indices
 
 
 async def generate_conversation_response(user_id: str, query: str) -> str:
     """대화형 질문에 대한 응답 생성"""
 
-    def sync_generate_conversation():
-        prompt = f"""
+    prompt = f"""
 사용자의 일상적인 대화나 개인적인 정보 공유에 적절하게 응답하세요.
 사용자가 선호도, 감정, 경험을 공유할 때 공감하고 자연스럽게 대화를 이어나가세요.
 
@@ -431,22 +393,17 @@ async def generate_conversation_response(user_id: str, query: str) -> str:
 응답:
 """
 
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 자연스럽고 친근한 대화를 해줘.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
-
-        return response.choices[0].message.content
-
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_generate_conversation)
+    return await llm_gateway.chat(
+        model="gpt-4o-mini",
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 사용자의 개인 비서야. 자연스럽고 친근한 대화를 해줘.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.7,
+    )
 
 
 async def generate_contextualized_conversation_response(
@@ -454,19 +411,18 @@ async def generate_contextualized_conversation_response(
 ) -> Tuple[str, List[Dict]]:
     """맥락을 고려한 대화형 응답 생성"""
 
-    def sync_generate_contextualized_conversation():
-        # 이전 대화 기록 포맷팅
-        formatted_history = []
-        for i, chat in enumerate(chat_history):
-            role = chat.get("role", "unknown")
-            text = chat.get("text", "")
-            if text:
-                formatted_history.append(f"{i+1}. [{role}] {text}")
+    # 이전 대화 기록 포맷팅
+    formatted_history = []
+    for i, chat in enumerate(chat_history):
+        role = chat.get("role", "unknown")
+        text = chat.get("text", "")
+        if text:
+            formatted_history.append(f"{i+1}. [{role}] {text}")
 
-        context_text = "\n".join(formatted_history)
+    context_text = "\n".join(formatted_history)
 
-        # 응답 생성을 위한 프롬프트
-        prompt = f"""
+    # 응답 생성을 위한 프롬프트
+    prompt = f"""
 사용자의 질문에 대해 이전 대화 기록을 고려하여 답변하세요.
 
 [이전 대화 기록]
@@ -485,47 +441,42 @@ async def generate_contextualized_conversation_response(
 답변:
 """
 
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 이전 대화를 기반으로 맞춤형 답변을 제공해줄. 어떤 정보를 사용했는지 표시하라.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
-
-        answer = response.choices[0].message.content.strip()
-
-        # 사용된 채팅 기록 인덱스 추출
-        used_history = []
-        indices_pattern = r"\b([0-9]+(?:,\s*[0-9]+)*)\b"
-        indices_matches = re.findall(indices_pattern, answer.split("\n")[-1])
-
-        if indices_matches:
-            # 마지막 일치하는 것을 인덱스 목록으로 간주
-            last_match = indices_matches[-1]
-            for idx_str in last_match.split(","):
-                try:
-                    idx = int(idx_str.strip()) - 1  # 1-based -> 0-based
-                    if 0 <= idx < len(chat_history):
-                        used_history.append(chat_history[idx])
-                except ValueError:
-                    continue
+    content = await llm_gateway.chat(
+        model="gpt-4o-mini",
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 사용자의 개인 비서야. 이전 대화를 기반으로 맞춤형 답변을 제공해줄. 어떤 정보를 사용했는지 표시하라.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.7,
+    )
 
-        # 수처리된 마지막 행을 제거 (외부에서 보이지 않게)
-        if used_history and "\n" in answer:
-            lines = answer.split("\n")
-            if any(
-                all(c in "0123456789, " for c in line.strip()) for line in lines[-2:]
-            ):
-                answer = "\n".join(lines[:-1]).strip()
+    answer = content.strip()
 
-        return answer, used_history
+    # 사용된 채팅 기록 인덱스 추출
+    used_history = []
+    indices_pattern = r"\b([0-9]+(?:,\s*[0-9]+)*)\b"
+    indices_matches = re.findall(indices_pattern, answer.split("\n")[-1])
 
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(
-        executor, sync_generate_contextualized_conversation
-    )
+    if indices_matches:
+        # 마지막 일치하는 것을 인덱스 목록으로 간주
+        last_match = indices_matches[-1]
+        for idx_str in last_match.split(","):
+            try:
+                idx = int(idx_str.strip()) - 1  # 1-based -> 0-based
+                if 0 <= idx < len(chat_history):
+                    used_history.append(chat_history[idx])
+            except ValueError:
+                continue
+
+    # 수처리된 마지막 행을 제거 (외부에서 보이지 않게)
+    if used_history and "\n" in answer:
+        lines = answer.split("\n")
+        if any(
+            all(c in "0123456789, " for c in line.strip()) for line in lines[-2:]
+        ):
+            answer = "\n".join(lines[:-1]).strip()
+
+    return answer, used_history
@@ -3,18 +3,29 @@ import logging
 import json
 from concurrent.futures import ThreadPoolExecutor
 from app.utils.chat_vector_store import save_chat_vector_to_pinecone
+from app.utils.llm_gateway import Priority, estimate_text_tokens, llm_gateway
 
 logger = logging.getLogger(__name__)
 executor = ThreadPoolExecutor(max_workers=10)
 
 
-async def save_query_async(user_id: str, role: str, content: str, timestamp: int):
-    """쿼리 저장을 위한 비동기 래퍼"""
-    try:
+async def save_chat_vector_async(user_id: str, role: str, content: str, timestamp: int):
+    """
+    대화 기록 임베딩 저장 (검색 질의보다 낮은 우선순위로 같은 키 예산 사용)
+
+    응답 이후 백그라운드로 실행되므로 예산이 부족하면 검색 질의가 먼저 실행됨
+    """
+    async with llm_gateway.slot(Priority.CHAT_SAVE, estimate_text_tokens(content)):
         loop = asyncio.get_event_loop()
         await loop.run_in_executor(
             executor, save_chat_vector_to_pinecone, user_id, role, content, timestamp
         )
+
+
+async def save_query_async(user_id: str, role: str, content: str, timestamp: int):
+    """쿼리 저장을 위한 비동기 래퍼"""
+    try:
+        await save_chat_vector_async(user_id, role, content, timestamp)
         logger.info(f"✅ 쿼리 저장 완료: {user_id}")
     except Exception as e:
         logger.error(f"❌ 쿼리 저장 실패: {user_id} - {str(e)}")
@@ -23,10 +34,7 @@ async def save_query_async(user_id: str, role: str, content: str, timestamp: int
 async def save_result_async(user_id: str, role: str, content: str, timestamp: int):
     """결과 저장을 위한 비동기 래퍼"""
     try:
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            executor, save_chat_vector_to_pinecone, user_id, role, content, timestamp
-        )
+        await save_chat_vector_async(user_id, role, content, timestamp)
         logger.info(f"✅ 결과 저장 완료: {user_id}")
     except Exception as e:
         logger.error(f"❌ 결과 저장 실패: {user_id} - {str(e)}")
@@ -1,64 +1,359 @@
+import re
+import json
+import time
+import heapq
 import hashlib
-from datetime import datetime, timedelta
 import logging
-from typing import Dict, Optional
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.utils.embedding import get_text_embedding_async
+from app.config.settings import (
+    CACHE_TTL_SECONDS,
+    MAX_CACHE_SIZE,
+    QUERY_CACHE_BACKEND,
+    REDIS_URL,
+    QUERY_CACHE_SEMANTIC,
+    QUERY_CACHE_SIMILARITY_THRESHOLD,
+    QUERY_CACHE_SEMANTIC_MAX_PER_USER,
+)
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis 백엔드를 쓰지 않으면 필요 없음
+    redis_asyncio = None
 
 logger = logging.getLogger(__name__)
 
-# 캐시 저장소
-cache: Dict[str, Dict] = {}
-
-
-def get_cache_key(user_id: str, query: str) -> str:
-    """캐시 키 생성"""
-    cache_data = f"image:{user_id}:{query}"
-    return hashlib.md5(cache_data.encode()).hexdigest()
-
-
-def get_from_cache(key: str, ttl_seconds: int) -> Optional[Dict]:
-    """캐시에서 데이터 가져오기"""
-    if key in cache:
-        cached_data = cache[key]
-        if datetime.now() < cached_data["expires_at"]:
-            logger.info(f"✅ 캐시 히트: {key}")
-            return cached_data["data"]
-        else:
-            del cache[key]
-            logger.info(f"🗑️ 만료된 캐시 삭제: {key}")
-    return None
-
-
-def set_cache(key: str, data: Dict, ttl_seconds: int, max_cache_size: int):
-    """캐시에 데이터 저장"""
-    if len(cache) >= max_cache_size:
-        oldest_key = min(cache.keys(), key=lambda k: cache[k]["created_at"])
-        del cache[oldest_key]
-        logger.info(f"🗑️ 캐시 크기 초과로 오래된 항목 제거: {oldest_key}")
-
-    cache[key] = {
-        "data": data,
-        "created_at": datetime.now(),
-        "expires_at": datetime.now() + timedelta(seconds=ttl_seconds),
-    }
-    logger.info(f"💾 캐시 저장: {key}")
-
-
-def get_cache_status():
-    """캐시 상태 반환"""
-    current_time = datetime.now()
-    valid_count = sum(1 for data in cache.values() if current_time < data["expires_at"])
-    expired_count = len(cache) - valid_count
-
-    return {
-        "total_items": len(cache),
-        "valid_items": valid_count,
-        "expired_items": expired_count,
-    }
-
-
-def clear_cache() -> int:
-    """캐시 초기화 및 삭제된 항목 수 반환"""
-    cache_size = len(cache)
-    cache.clear()
-    logger.info(f"🗑️ 캐시 초기화: {cache_size}개 항목 삭제")
-    return cache_size
+# 정규화 시 제거할 문장 끝 표현 ("헬로키티 사진 보여줘" ≈ "헬로키티 사진")
+TRAILING_PHRASES = re.compile(r"\s*(좀|을|를)?\s*(보여\s*줘|보여\s*주세요|찾아\s*줘|찾아\s*주세요|알려\s*줘|알려\s*주세요)$")
+
+
+def normalize_query(query: str) -> str:
+    """근사 중복 쿼리 판별용 정규화 (유니코드/대소문자/공백/문장부호/요청 어미)"""
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    text = " ".join(text.split())
+    return TRAILING_PHRASES.sub("", text).strip() or text
+
+
+class MemoryCacheBackend:
+    """
+    프로세스 내 LRU + TTL 캐시
+
+    - OrderedDict로 조회/저장/제거 모두 O(1) (조회 시 맨 뒤로 이동, 초과 시 맨 앞 제거)
+    - 만료 시각 힙으로 저장할 때마다 만료 항목을 정리 (읽기 전까지 남아 있지 않음)
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._expiry: List[Tuple[float, str]] = []
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def _purge_expired(self, now: float):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            item = self._items.get(key)
+            # 같은 키가 다시 저장됐으면 힙의 이전 기록은 무시
+            if item is not None and item[1] == expires_at:
+                del self._items[key]
+                self.expirations += 1
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.time():
+                del self._items[key]
+                self.expirations += 1
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    async def set(self, key: str, value: str, ttl_seconds: int):
+        with self._lock:
+            now = time.time()
+            self._purge_expired(now)
+            expires_at = now + ttl_seconds
+            self._items[key] = (value, expires_at)
+            self._items.move_to_end(key)
+            heapq.heappush(self._expiry, (expires_at, key))
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+            # 덮어쓴 키의 힙 기록이 쌓이지 않도록 주기적으로 재구성
+            if len(self._expiry) > self.max_size * 2:
+                self._expiry = [(v[1], k) for k, v in self._items.items()]
+                heapq.heapify(self._expiry)
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def clear(self) -> int:
+        with self._lock:
+            size = len(self._items)
+            self._items.clear()
+            self._expiry.clear()
+            return size
+
+    async def purge_expired(self) -> int:
+        with self._lock:
+            before = len(self._items)
+            self._purge_expired(time.time())
+            return before - len(self._items)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "items": len(self._items),
+                "max_size": self.max_size,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class RedisCacheBackend:
+    """여러 워커/서비스가 공유하는 Redis 캐시 (TTL은 Redis가 관리, LRU는 maxmemory-policy)"""
+
+    def __init__(self, url: str, prefix: str = "qcache:"):
+        if redis_asyncio is None:
+            raise RuntimeError("QUERY_CACHE_BACKEND=redis 사용 시 redis 패키지가 필요합니다.")
+        self.client = redis_asyncio.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.url = url
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int):
+        await self.client.set(self.prefix + key, value, ex=ttl_seconds)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(self.prefix + key)
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self.client.get(self.prefix + key) or 0)
+
+    async def clear(self) -> int:
+        deleted = 0
+        async for key in self.client.scan_iter(match=f"{self.prefix}r:*"):
+            deleted += await self.client.delete(key)
+        return deleted
+
+    async def purge_expired(self) -> int:
+        return 0
+
+    def get_stats(self) -> Dict:
+        return {"backend": "redis", "url": self.url.split("@")[-1]}
+
+
+class _SemanticIndex:
+    """사용자별 최근 쿼리 임베딩 (유사 쿼리를 기존 캐시 키로 연결)"""
+
+    def __init__(self, max_per_user: int):
+        self.max_per_user = max_per_user
+        self._entries: Dict[str, "OrderedDict[str, np.ndarray]"] = {}
+        self._lock = threading.Lock()
+
+    def add(self, scope_key: str, normalized: str, vector: List[float]):
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        if norm == 0:
+            return
+        with self._lock:
+            entries = self._entries.setdefault(scope_key, OrderedDict())
+            entries[normalized] = array / norm
+            entries.move_to_end(normalized)
+            while len(entries) > self.max_per_user:
+                entries.popitem(last=False)
+
+    def has(self, scope_key: str) -> bool:
+        return bool(self._entries.get(scope_key))
+
+    def find(self, scope_key: str, vector: List[float], threshold: float) -> Optional[str]:
+        with self._lock:
+            entries = self._entries.get(scope_key)
+            if not entries:
+                return None
+            keys = list(entries.keys())
+            matrix = np.stack(list(entries.values()))
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return None
+        scores = matrix @ (query / norm)
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= threshold else None
+
+    def drop_user(self, user_id: str):
+        with self._lock:
+            for scope_key in [k for k in self._entries if k.startswith(f"{user_id}\x00")]:
+                del self._entries[scope_key]
+
+
+class QueryCache:
+    """
+    사용자 질의 결과 캐시
+
+    - 키: scope / user_id / 사용자 세대(generation) / 정규화된 쿼리
+    - 새 사진이 저장되면 rag 수집 경로에서 사용자 세대를 올려 이전 결과를 무효화
+      (이전 세대 항목은 조회되지 않고 TTL/LRU로 정리)
+    - 정규화 결과가 같거나, 임베딩 유사도가 임계값 이상이면 같은 결과 재사용
+    """
+
+    def __init__(self, backend, ttl_seconds: int, semantic: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.semantic = semantic
+        self.semantic_index = _SemanticIndex(QUERY_CACHE_SEMANTIC_MAX_PER_USER)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "errors": 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    async def current_generation(self, user_id: str) -> int:
+        """
+        사용자 세대 조회
+
+        요청 시작 시 읽은 값을 get/set에 넘기면, 처리 중에 업로드가 들어와도
+        이전 세대 결과가 새 세대로 저장되지 않음 (저장소 오류 시 -1 → 캐시 미사용)
+        """
+        try:
+            return await self.backend.get_counter(f"gen:{user_id}")
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"⚠️ 캐시 세대 조회 실패: {str(e)}")
+            return -1
+
+    @staticmethod
+    def _result_key(scope: str, user_id: str, generation: int, normalized: str) -> str:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"r:{scope}:{user_id}:{generation}:{digest}"
+
+    async def get(
+        self, user_id: str, query: str, scope: str = "image", generation: Optional[int] = None
+    ) -> Optional[Dict]:
+        """캐시 조회 (정규화 일치 → 임베딩 유사 쿼리 순)"""
+        try:
+            if generation is None:
+                generation = await self.current_generation(user_id)
+            if generation < 0:
+                self._count("misses")
+                return None
+            normalized = normalize_query(query)
+            raw = await self.backend.get(self._result_key(scope, user_id, generation, normalized))
+            if raw is not None:
+                self._count("hits")
+                logger.info(f"✅ 캐시 히트: {scope}/{user_id} '{normalized}'")
+                return json.loads(raw)
+
+            if self.semantic:
+                similar = await self._find_similar(user_id, query, scope, generation)
+                if similar is not None:
+                    raw = await self.backend.get(self._result_key(scope, user_id, generation, similar))
+                    if raw is not None:
+                        self._count("semantic_hits")
+                        logger.info(f"✅ 유사 쿼리 캐시 히트: '{normalized}' ≈ '{similar}'")
+                        return json.loads(raw)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"⚠️ 캐시 조회 실패: {str(e)}")
+        self._count("misses")
+        return None
+
+    async def set(
+        self,
+        user_id: str,
+        query: str,
+        result: Dict,
+        scope: str = "image",
+        generation: Optional[int] = None,
+    ):
+        try:
+            if generation is None:
+                generation = await self.current_generation(user_id)
+            if generation < 0:
+                return
+            normalized = normalize_query(query)
+            await self.backend.set(
+                self._result_key(scope, user_id, generation, normalized),
+                json.dumps(result, ensure_ascii=False, default=str),
+                self.ttl_seconds,
+            )
+            self._count("sets")
+            if self.semantic:
+                vector = await self._embed(query)
+                self.semantic_index.add(f"{user_id}\x00{scope}\x00{generation}", normalized, vector)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"⚠️ 캐시 저장 실패: {str(e)}")
+
+    async def _embed(self, query: str) -> List[float]:
+        # 임베딩 캐시/배치를 그대로 사용 (같은 쿼리는 API 호출 없음)
+        return await get_text_embedding_async(query)
+
+    async def _find_similar(self, user_id: str, query: str, scope: str, generation: int) -> Optional[str]:
+        scope_key = f"{user_id}\x00{scope}\x00{generation}"
+        if not self.semantic_index.has(scope_key):
+            return None
+        vector = await self._embed(query)
+        return self.semantic_index.find(scope_key, vector, QUERY_CACHE_SIMILARITY_THRESHOLD)
+
+    async def bump_generation(self, user_id: str) -> int:
+        """사용자 세대 증가 → 해당 사용자의 기존 캐시 결과 무효화"""
+        generation = await self.backend.incr(f"gen:{user_id}")
+        self.semantic_index.drop_user(user_id)
+        self._count("invalidations")
+        logger.info(f"🔄 사용자 캐시 무효화: {user_id} (세대 {generation})")
+        return generation
+
+    async def clear(self) -> int:
+        return await self.backend.clear()
+
+    async def purge_expired(self) -> int:
+        return await self.backend.purge_expired()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["semantic_hits"] + stats["misses"]
+        hit_rate = (stats["hits"] + stats["semantic_hits"]) / lookups if lookups else 0.0
+        return {
+            **stats,
+            "hit_rate": round(hit_rate, 3),
+            "ttl_seconds": self.ttl_seconds,
+            "semantic": self.semantic,
+            "similarity_threshold": QUERY_CACHE_SIMILARITY_THRESHOLD,
+            **self.backend.get_stats(),
+        }
+
+
+def create_cache_backend(backend: str, max_size: int, redis_url: str):
+    """설정값(memory/redis)에 따라 캐시 저장소 생성"""
+    if backend == "redis" and redis_url:
+        logger.info("🧰 질의 캐시: Redis 사용")
+        return RedisCacheBackend(redis_url)
+    return MemoryCacheBackend(max_size)
+
+
+# 프로세스 전역 질의 캐시
+query_cache = QueryCache(
+    create_cache_backend(QUERY_CACHE_BACKEND, MAX_CACHE_SIZE, REDIS_URL),
+    CACHE_TTL_SECONDS,
+    QUERY_CACHE_SEMANTIC,
+)
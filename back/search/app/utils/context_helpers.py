@@ -1,11 +1,8 @@
 import asyncio
 import re
 from typing import List, Dict, Tuple, Optional
-from app.utils.ai_utils import openai_client
 from app.utils.chat_vector_store import search_chat_history
-
-# 공통 실행기 재사용
-from app.utils.ai_utils import executor
+from app.utils.llm_gateway import llm_gateway
 
 
 def check_if_requires_context(query: str) -> bool:
@@ -50,22 +47,20 @@ async def get_chat_context(user_id: str, query: str) -> Tuple[List[Dict], Dict]:
     return chat_history, timings
 
 
-async def generate_contextualized_conversation_response(user_id: str, query: str, chat_history: List[Dict]) -> Tuple[str, List[Dict]]:
-    """맥락을 고려한 대화형 응답 생성"""
+def build_contextualized_conversation_messages(query: str, chat_history: List[Dict]) -> List[Dict]:
+    """이전 대화 기록을 포함한 대화형 응답 메시지 (일반/스트리밍 응답 공용)"""
+    # 이전 대화 기록 포맷팅
+    formatted_history = []
+    for i, chat in enumerate(chat_history):
+        role = chat.get("role", "unknown")
+        text = chat.get("text", "")
+        if text:
+            formatted_history.append(f"{i+1}. [{role}] {text}")
 
-    def sync_generate_contextualized_response():
-        # 이전 대화 기록 포맷팅
-        formatted_history = []
-        for i, chat in enumerate(chat_history):
-            role = chat.get("role", "unknown")
-            text = chat.get("text", "")
-            if text:
-                formatted_history.append(f"{i+1}. [{role}] {text}")
-        
-        context_text = "\n".join(formatted_history)
-        
-        # 응답 생성을 위한 프롬프트
-        prompt = f"""
+    context_text = "\n".join(formatted_history)
+
+    # 응답 생성을 위한 프롬프트
+    prompt = f"""
 사용자의 질문에 대해 이전 대화 기록을 고려하여 답변하세요.
 
 [이전 대화 기록]
@@ -83,47 +78,59 @@ async def generate_contextualized_conversation_response(user_id: str, query: str
 
 답변:
 """
+    return [
+        {
+            "role": "system",
+            "content": "너는 사용자의 개인 비서야. 이전 대화를 기반으로 맞춤형 답변을 제공해줄. 어떤 정보를 사용했는지 표시하라.",
+        },
+        {"role": "user", "content": prompt},
+    ]
+
+
+def is_index_list_line(line: str) -> bool:
+    """답변 끝에 붙는 사용한 대화 번호 목록 줄인지 확인 (예: "1, 3, 5")"""
+    return all(c in '0123456789, ' for c in line.strip())
+
+
+def extract_used_history(answer: str, chat_history: List[Dict]) -> Tuple[str, List[Dict]]:
+    """답변 마지막 줄의 번호 목록으로 사용된 대화 기록을 찾고, 목록 줄은 답변에서 제거"""
+    answer = answer.strip()
+
+    # 사용된 채팅 기록 인덱스 추출
+    used_history = []
+    indices_pattern = r'\b([0-9]+(?:,\s*[0-9]+)*)\b'
+    indices_matches = re.findall(indices_pattern, answer.split('\n')[-1])
+    
+    if indices_matches:
+        # 마지막 일치하는 것을 인덱스 목록으로 간주
+        last_match = indices_matches[-1]
+        for idx_str in last_match.split(','):
+            try:
+                idx = int(idx_str.strip()) - 1  # 1-based -> 0-based
+                if 0 <= idx < len(chat_history):
+                    used_history.append(chat_history[idx])
+            except ValueError:
+                continue
+    
+    # 수처리된 마지막 행을 제거 (외부에서 보이지 않게)
+    if used_history and '\n' in answer:
+        lines = answer.split('\n')
+        if any(is_index_list_line(line) for line in lines[-2:]):
+            answer = '\n'.join(lines[:-1]).strip()
+    
+    return answer, used_history
+
+
+async def generate_contextualized_conversation_response(user_id: str, query: str, chat_history: List[Dict]) -> Tuple[str, List[Dict]]:
+    """맥락을 고려한 대화형 응답 생성"""
+
+    content = await llm_gateway.chat(
+        model="gpt-4o-mini",
+        messages=build_contextualized_conversation_messages(query, chat_history),
+        temperature=0.7,
+    )
 
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 이전 대화를 기반으로 맞춤형 답변을 제공해줄. 어떤 정보를 사용했는지 표시하라.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
-
-        answer = response.choices[0].message.content.strip()
-        
-        # 사용된 채팅 기록 인덱스 추출
-        used_history = []
-        indices_pattern = r'\b([0-9]+(?:,\s*[0-9]+)*)\b'
-        indices_matches = re.findall(indices_pattern, answer.split('\n')[-1])
-        
-        if indices_matches:
-            # 마지막 일치하는 것을 인덱스 목록으로 간주
-            last_match = indices_matches[-1]
-            for idx_str in last_match.split(','):
-                try:
-                    idx = int(idx_str.strip()) - 1  # 1-based -> 0-based
-                    if 0 <= idx < len(chat_history):
-                        used_history.append(chat_history[idx])
-                except ValueError:
-                    continue
-        
-        # 수처리된 마지막 행을 제거 (외부에서 보이지 않게)
-        if used_history and '\n' in answer:
-            lines = answer.split('\n')
-            if any(all(c in '0123456789, ' for c in line.strip()) for line in lines[-2:]):
-                answer = '\n'.join(lines[:-1]).strip()
-        
-        return answer, used_history
-
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_generate_contextualized_response)
+    return extract_used_history(content, chat_history)
 
 
 async def generate_contextualized_info_answer(
@@ -131,27 +138,26 @@ async def generate_contextualized_info_answer(
 ) -> Tuple[str, List[int], List[Dict]]:
     """맥락과 정보를 모두 고려한 답변 생성"""
 
-    def sync_generate_contextualized_info():
-        # 정보 컨텍스트 포맷팅
-        info_texts = []
-        for i, item in enumerate(context_info[:5]):  # 상위 5개 정보만 사용
-            text = item.get("text", "").strip()
-            if text:
-                info_texts.append(f"정보{i+1}: {text}")
-        
-        # 대화 컨텍스트 포맷팅
-        chat_texts = []
-        for i, chat in enumerate(chat_history[:3]):  # 상위 3개 대화만 사용
-            role = chat.get("role", "unknown")
-            text = chat.get("text", "")
-            if text:
-                chat_texts.append(f"대화{i+1}: [{role}] {text}")
-        
-        info_context = "\n\n".join(info_texts)
-        chat_context = "\n".join(chat_texts)
-        
-        # 프롬프트 구성
-        prompt = f"""
+    # 정보 컨텍스트 포맷팅
+    info_texts = []
+    for i, item in enumerate(context_info[:5]):  # 상위 5개 정보만 사용
+        text = item.get("text", "").strip()
+        if text:
+            info_texts.append(f"정보{i+1}: {text}")
+    
+    # 대화 컨텍스트 포맷팅
+    chat_texts = []
+    for i, chat in enumerate(chat_history[:3]):  # 상위 3개 대화만 사용
+        role = chat.get("role", "unknown")
+        text = chat.get("text", "")
+        if text:
+            chat_texts.append(f"대화{i+1}: [{role}] {text}")
+    
+    info_context = "\n\n".join(info_texts)
+    chat_context = "\n".join(chat_texts)
+    
+    # 프롬프트 구성
+    prompt = f"""
 사용자의 질문에 대해 제공된 정보와 이전 대화 맥락을 모두 고려하여 답변하세요.
 
 [검색된 정보]
@@ -172,53 +178,50 @@ async def generate_contextualized_info_answer(
 
 답변:
 """
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "너는 사용자의 개인 비서야. 제공된 정보와 맥락을 활용해 정확하고 개인화된 답변을 제공해줘.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-        )
-        
-        answer = response.choices[0].message.content.strip()
-        
-        # 사용된 정보와 대화 인덱스 추출
-        used_info_indices = []
-        used_chat_indices = []
-        
-        # 정보 인덱스 추출
-        info_pattern = r'정보(\d+)'
-        info_matches = re.findall(info_pattern, answer.split('\n')[-1])
-        for idx_str in info_matches:
-            try:
-                idx = int(idx_str) - 1  # 1-based -> 0-based
-                if 0 <= idx < len(context_info):
-                    used_info_indices.append(idx)
-            except ValueError:
-                continue
-        
-        # 대화 인덱스 추출
-        chat_pattern = r'대화(\d+)'
-        chat_matches = re.findall(chat_pattern, answer.split('\n')[-1])
-        for idx_str in chat_matches:
-            try:
-                idx = int(idx_str) - 1  # 1-based -> 0-based
-                if 0 <= idx < len(chat_history):
-                    used_chat_indices.append(chat_history[idx])
-            except ValueError:
-                continue
-        
-        # 마지막 행 제거
-        if (used_info_indices or used_chat_indices) and '\n' in answer:
-            lines = answer.split('\n')
-            answer = '\n'.join(lines[:-1]).strip()
-        
-        return answer, used_info_indices, used_chat_indices
     
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_generate_contextualized_info)
+    content = await llm_gateway.chat(
+        model="gpt-4o-mini",
+        messages=[
+            {
+                "role": "system",
+                "content": "너는 사용자의 개인 비서야. 제공된 정보와 맥락을 활용해 정확하고 개인화된 답변을 제공해줘.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.7,
+    )
+    
+    answer = content.strip()
+    
+    # 사용된 정보와 대화 인덱스 추출
+    used_info_indices = []
+    used_chat_indices = []
+    
+    # 정보 인덱스 추출
+    info_pattern = r'정보(\d+)'
+    info_matches = re.findall(info_pattern, answer.split('\n')[-1])
+    for idx_str in info_matches:
+        try:
+            idx = int(idx_str) - 1  # 1-based -> 0-based
+            if 0 <= idx < len(context_info):
+                used_info_indices.append(idx)
+        except ValueError:
+            continue
+    
+    # 대화 인덱스 추출
+    chat_pattern = r'대화(\d+)'
+    chat_matches = re.findall(chat_pattern, answer.split('\n')[-1])
+    for idx_str in chat_matches:
+        try:
+            idx = int(idx_str) - 1  # 1-based -> 0-based
+            if 0 <= idx < len(chat_history):
+                used_chat_indices.append(chat_history[idx])
+        except ValueError:
+            continue
+    
+    # 마지막 행 제거
+    if (used_info_indices or used_chat_indices) and '\n' in answer:
+        lines = answer.split('\n')
+        answer = '\n'.join(lines[:-1]).strip()
+    
+    return answer, used_info_indices, used_chat_indices
@@ -0,0 +1,483 @@
+# app/utils/date_resolver.py
+
+import re
+import calendar
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Callable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DateSpan = Tuple[date, date]
+
+# 사용자 기준 시간대 (촬영 시각도 한국 시간으로 저장됨)
+KST = ZoneInfo("Asia/Seoul")
+
+WEEKDAYS = {"월": 0, "화": 1, "수": 2, "목": 3, "금": 4, "토": 5, "일": 6}
+
+# 고유어 수사 (한 달 전, 두 주 전 ...)
+NATIVE_NUMBERS = {
+    "한": 1, "하루": 1, "두": 2, "이틀": 2, "세": 3, "사흘": 3, "네": 4, "나흘": 4,
+    "다섯": 5, "닷새": 5, "여섯": 6, "엿새": 6, "일곱": 7, "이레": 7,
+    "여덟": 8, "아홉": 9, "열": 10, "열흘": 10,
+}
+
+# 기준 날짜에서 떨어진 단위 수 (지난주 = -1, 지지난달 = -2 ...)
+RELATIVE_OFFSETS = {
+    "지지난": -2, "지난": -1, "저번": -1, "이번": 0, "요번": 0, "다음": 1, "담": 1,
+}
+YEAR_WORDS = {
+    "재작년": -2, "작년": -1, "지난해": -1, "작년도": -1, "올해": 0, "금년": 0, "내년": 1,
+}
+
+# 양력 기념일 (월, 일)
+SOLAR_HOLIDAYS = {
+    "새해 첫날": (1, 1), "새해": (1, 1),
+    "발렌타인데이": (2, 14), "밸런타인데이": (2, 14),
+    "삼일절": (3, 1), "화이트데이": (3, 14),
+    "어린이날": (5, 5), "어버이날": (5, 8), "스승의날": (5, 15), "스승의 날": (5, 15),
+    "현충일": (6, 6), "제헌절": (7, 17), "광복절": (8, 15),
+    "개천절": (10, 3), "한글날": (10, 9), "할로윈": (10, 31), "핼러윈": (10, 31),
+    "빼빼로데이": (11, 11),
+    "크리스마스 이브": (12, 24), "크리스마스이브": (12, 24),
+    "크리스마스": (12, 25), "성탄절": (12, 25),
+}
+
+# 음력 명절 (양력 환산표, 당일 기준 앞뒤 하루를 연휴로 봄)
+LUNAR_HOLIDAYS = {
+    "설날": {
+        2018: (2, 16), 2019: (2, 5), 2020: (1, 25), 2021: (2, 12), 2022: (2, 1),
+        2023: (1, 22), 2024: (2, 10), 2025: (1, 29), 2026: (2, 17), 2027: (2, 7),
+        2028: (1, 27), 2029: (2, 13), 2030: (2, 3),
+    },
+    "추석": {
+        2018: (9, 24), 2019: (9, 13), 2020: (10, 1), 2021: (9, 21), 2022: (9, 10),
+        2023: (9, 29), 2024: (9, 17), 2025: (10, 6), 2026: (9, 25), 2027: (9, 15),
+        2028: (10, 3), 2029: (9, 22), 2030: (9, 12),
+    },
+    "부처님오신날": {
+        2018: (5, 22), 2019: (5, 12), 2020: (4, 30), 2021: (5, 19), 2022: (5, 8),
+        2023: (5, 27), 2024: (5, 15), 2025: (5, 5), 2026: (5, 24), 2027: (5, 13),
+        2028: (5, 2), 2029: (5, 20), 2030: (5, 9),
+    },
+}
+LUNAR_ALIASES = {
+    "설날": "설날", "설 연휴": "설날", "설연휴": "설날", "구정": "설날",
+    "추석": "추석", "한가위": "추석", "추석 연휴": "추석", "추석연휴": "추석",
+    "부처님오신날": "부처님오신날", "석가탄신일": "부처님오신날",
+}
+LUNAR_HOLIDAY_SPREAD = {"설날": 1, "추석": 1, "부처님오신날": 0}
+
+# 일반 명사와 겹치는 표현("크리스마스 트리", "주말농장", "1/2 컵", "오늘의 운세",
+# "지난 주문", "이번 주소", "다음 주차", "지난 달리기", "이번 달력", "3월호")은
+# 뒤에 조사가 붙거나 사진/촬영을 가리키는 단어가 이어질 때만 날짜로 봄
+TEMPORAL_PARTICLES = (
+    "에서", "에는", "에도", "부터", "까지", "즈음", "쯤", "경", "에", "엔", "은", "는", "도", "때",
+    "이랑", "랑", "하고", "동안", "내내",
+)
+TEMPORAL_FOLLOWERS = ("사진", "찍", "때", "쯤", "즈음", "무렵", "당일")
+
+
+class DateRange(BaseModel):
+    """쿼리에서 해석한 촬영 날짜 범위 (양 끝 포함)"""
+
+    start: date
+    end: date
+    expressions: List[str]
+    # 모든 표현이 확실한 날짜인지 (False면 쿼리 끝의 "크리스마스"처럼 주제일 수도 있는 표현 포함)
+    explicit: bool = True
+
+    @property
+    def start_datetime(self) -> datetime:
+        return datetime.combine(self.start, time.min)
+
+    @property
+    def end_datetime(self) -> datetime:
+        return datetime.combine(self.end, time.max)
+
+    def to_epoch_range(self) -> Tuple[int, int]:
+        """Pinecone time_range_filter용 (epoch 초, 한국 시간 기준)"""
+        return (
+            int(self.start_datetime.replace(tzinfo=KST).timestamp()),
+            int(self.end_datetime.replace(tzinfo=KST).timestamp()),
+        )
+
+    def contains(self, moment: datetime) -> bool:
+        return self.start_datetime <= moment <= self.end_datetime
+
+
+# ---------------------------------------------------------------------------
+# 날짜 계산 도우미
+# ---------------------------------------------------------------------------
+
+
+def _to_number(token: str) -> int:
+    if token.isdigit():
+        return int(token)
+    return NATIVE_NUMBERS.get(token.strip(), 1)
+
+
+def _month_span(year: int, month: int) -> DateSpan:
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def _shift_month(year: int, month: int, offset: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + offset
+    return index // 12, index % 12 + 1
+
+
+def _week_span(day: date, offset: int = 0) -> DateSpan:
+    """월요일 시작 주"""
+    monday = day - timedelta(days=day.weekday()) + timedelta(weeks=offset)
+    return monday, monday + timedelta(days=6)
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _apply_part(span: DateSpan, part: Optional[str], unit: str) -> DateSpan:
+    """초/중순/말 적용 (월: 1~10일/11~20일/21일~말일, 연: 1~2월/5~8월/11~12월, 주: 월~수/목~금/토~일)"""
+    if not part:
+        return span
+    start, end = span
+    part = {"초순": "초", "하순": "말", "말경": "말"}.get(part, part)
+    if unit == "month":
+        if part == "초":
+            return start, start.replace(day=10)
+        if part == "중순":
+            return start.replace(day=11), start.replace(day=20)
+        return start.replace(day=21), end
+    if unit == "year":
+        if part == "초":
+            return start, _month_span(start.year, 2)[1]
+        if part == "중순":
+            return date(start.year, 5, 1), date(start.year, 8, 31)
+        return date(start.year, 11, 1), end
+    if unit == "week":
+        if part == "초":
+            return start, start + timedelta(days=2)
+        if part == "중순":
+            return start + timedelta(days=3), start + timedelta(days=4)
+        return start + timedelta(days=5), end
+    return span
+
+
+def _past_year(today: date, month: int, day: int = 1) -> int:
+    """연도 없는 날짜는 가장 최근의 과거로 해석 (사진은 이미 찍힌 것이므로)"""
+    candidate = _safe_date(today.year, month, day)
+    if candidate is not None and candidate > today:
+        return today.year - 1
+    return today.year
+
+
+def _resolve_year(token: Optional[str], today: date) -> Optional[int]:
+    if not token:
+        return None
+    token = token.strip()
+    if token in YEAR_WORDS:
+        return today.year + YEAR_WORDS[token]
+    match = re.match(r"(\d{2,4})\s*년?$", token)
+    if match:
+        year = int(match.group(1))
+        return year + 2000 if year < 100 else year
+    return None
+
+
+def _is_hangul(char: str) -> bool:
+    return "가" <= char <= "힣"
+
+
+def _match_strength(text: str, m: re.Match, guard: Optional[str]) -> Optional[bool]:
+    """
+    일반 명사와 겹치는 표현이 날짜로 쓰였는지 확인 → 확실함(True) / 애매함(False) / 날짜 아님(None)
+
+    - guard "word": 다른 단어의 일부가 아니면 날짜 ("내일러", "오늘의 운세" 제외)
+    - guard "unit": "word"와 같되 "의"도 조사로 봄 ("지난주의 회의"는 날짜, "다음 주차", "이번 달력" 제외)
+    - guard "context": 조사나 사진/촬영 단어가 이어지거나 연도가 붙어야 확실한 날짜,
+      쿼리 끝에 홀로 있으면 애매함 ("크리스마스 트리", "새해 카드", "1/2 컵" 제외)
+    """
+    if guard is None:
+        return True
+    start, end = m.start(), m.end()
+    if start > 0 and _is_hangul(text[start - 1]):
+        return None
+
+    rest = text[end:]
+    particles = TEMPORAL_PARTICLES + ("의",) if guard == "unit" else TEMPORAL_PARTICLES
+    for particle in particles:
+        if rest.startswith(particle) and not _is_hangul(rest[len(particle) : len(particle) + 1]):
+            return True
+    if rest and _is_hangul(rest[0]):
+        return None
+    if guard in ("word", "unit"):
+        return True
+
+    if m.re.groupindex.get("prefix") and m.group("prefix"):
+        return True
+    following = rest.strip(" \t,.?!~")
+    if not following:
+        return False
+    return True if following.startswith(TEMPORAL_FOLLOWERS) else None
+
+
+# ---------------------------------------------------------------------------
+# 표현별 규칙
+# ---------------------------------------------------------------------------
+
+NUM = r"(\d+|한|두|세|네|다섯|여섯|일곱|여덟|아홉|열)"
+DAY_WORDS = r"(하루|이틀|사흘|나흘|닷새|엿새|이레|열흘)"
+# 초/중순/말 뒤에 조사 외의 글자가 오면 다른 단어 ("올해 초밥")
+PART = r"(?:\s*(초순|초|중순|하순|말경|말)(?!(?![에의쯤경까부])[가-힣]))?"
+YEAR_PREFIX = r"((?:\d{4}|\d{2})\s*년|재작년|작년도|작년|지난해|올해|금년|내년)"
+REL = r"(지지난|지난|저번|이번|요번|다음|담)"
+HOLIDAY_NAMES = "|".join(
+    re.escape(name)
+    for name in sorted(list(SOLAR_HOLIDAYS) + list(LUNAR_ALIASES), key=len, reverse=True)
+)
+
+
+def _rule_year_month_day(m: re.Match, today: date) -> Optional[DateSpan]:
+    year = _resolve_year(m.group(1), today)
+    day = _safe_date(year, int(m.group(2)), int(m.group(3)))
+    return (day, day) if day else None
+
+
+def _rule_year_month(m: re.Match, today: date) -> Optional[DateSpan]:
+    year = _resolve_year(m.group(1), today)
+    month = int(m.group(2))
+    if not 1 <= month <= 12:
+        return None
+    return _apply_part(_month_span(year, month), m.group(3), "month")
+
+
+def _rule_month_day(m: re.Match, today: date) -> Optional[DateSpan]:
+    month, day_of_month = int(m.group(1)), int(m.group(2))
+    day = _safe_date(_past_year(today, month, day_of_month), month, day_of_month)
+    return (day, day) if day else None
+
+
+def _rule_holiday(m: re.Match, today: date) -> Optional[DateSpan]:
+    name = m.group(2)
+    year = _resolve_year(m.group("prefix"), today)
+
+    if name in LUNAR_ALIASES:
+        table = LUNAR_HOLIDAYS[LUNAR_ALIASES[name]]
+        spread = timedelta(days=LUNAR_HOLIDAY_SPREAD[LUNAR_ALIASES[name]])
+
+        def span_for(y: int) -> Optional[DateSpan]:
+            if y not in table:
+                return None
+            center = date(y, *table[y])
+            return center - spread, center + spread
+
+        if year is None:
+            year = today.year
+            current = span_for(year)
+            if current is not None and current[0] > today:
+                year -= 1
+        span = span_for(year)
+        if span is None:
+            logger.warning(f"⚠️ {name} 날짜표에 없는 연도: {year}")
+        return span
+
+    month, day_of_month = SOLAR_HOLIDAYS[name]
+    if year is None:
+        year = _past_year(today, month, day_of_month)
+    day = date(year, month, day_of_month)
+    return day, day
+
+
+def _rule_week_weekday(m: re.Match, today: date) -> Optional[DateSpan]:
+    monday, _ = _week_span(today, RELATIVE_OFFSETS[m.group(1)])
+    day = monday + timedelta(days=WEEKDAYS[m.group(2)])
+    return day, day
+
+
+def _rule_week_weekend(m: re.Match, today: date) -> Optional[DateSpan]:
+    monday, sunday = _week_span(today, RELATIVE_OFFSETS[m.group(1)])
+    return monday + timedelta(days=5), sunday
+
+
+def _rule_weekday(m: re.Match, today: date) -> Optional[DateSpan]:
+    """요일만 있으면 오늘 포함 가장 최근의 그 요일"""
+    diff = (today.weekday() - WEEKDAYS[m.group(1)]) % 7
+    day = today - timedelta(days=diff)
+    return day, day
+
+
+def _rule_weekend(m: re.Match, today: date) -> Optional[DateSpan]:
+    """'주말'만 있으면 가장 최근 주말 (오늘이 주말이면 이번 주말)"""
+    monday, sunday = _week_span(today)
+    if today.weekday() < 5:
+        monday, sunday = monday - timedelta(weeks=1), sunday - timedelta(weeks=1)
+    return monday + timedelta(days=5), sunday
+
+
+def _rule_relative_week(m: re.Match, today: date) -> Optional[DateSpan]:
+    return _apply_part(_week_span(today, RELATIVE_OFFSETS[m.group(1)]), m.group(2), "week")
+
+
+def _rule_relative_month(m: re.Match, today: date) -> Optional[DateSpan]:
+    year, month = _shift_month(today.year, today.month, RELATIVE_OFFSETS[m.group(1)])
+    return _apply_part(_month_span(year, month), m.group(2), "month")
+
+
+def _rule_relative_year(m: re.Match, today: date) -> Optional[DateSpan]:
+    year = today.year + YEAR_WORDS[m.group(1)]
+    return _apply_part((date(year, 1, 1), date(year, 12, 31)), m.group(2), "year")
+
+
+def _rule_year_part_word(m: re.Match, today: date) -> Optional[DateSpan]:
+    """연초/연말/월초/월말 (기준 단위가 아직 오지 않았으면 직전 것)"""
+    word = m.group(1)
+    if word in ("연초", "연말"):
+        part = "초" if word == "연초" else "말"
+        span = _apply_part((date(today.year, 1, 1), date(today.year, 12, 31)), part, "year")
+        if span[0] > today:
+            span = _apply_part(
+                (date(today.year - 1, 1, 1), date(today.year - 1, 12, 31)), part, "year"
+            )
+        return span
+    part = "초" if word == "월초" else "말"
+    span = _apply_part(_month_span(today.year, today.month), part, "month")
+    if span[0] > today:
+        year, month = _shift_month(today.year, today.month, -1)
+        span = _apply_part(_month_span(year, month), part, "month")
+    return span
+
+
+def _rule_numeric_year(m: re.Match, today: date) -> Optional[DateSpan]:
+    year = _resolve_year(m.group(1), today)
+    if year is None or not 1900 <= year <= today.year + 1:
+        return None
+    return _apply_part((date(year, 1, 1), date(year, 12, 31)), m.group(2), "year")
+
+
+def _rule_month(m: re.Match, today: date) -> Optional[DateSpan]:
+    month = int(m.group(1))
+    if not 1 <= month <= 12:
+        return None
+    year = _past_year(today, month)
+    return _apply_part(_month_span(year, month), m.group(2), "month")
+
+
+def _rule_days_ago(m: re.Match, today: date) -> Optional[DateSpan]:
+    amount = _to_number(m.group(1))
+    sign = -1 if m.group(2) == "전" else 1
+    day = today + timedelta(days=sign * amount)
+    return day, day
+
+
+def _rule_weeks_ago(m: re.Match, today: date) -> Optional[DateSpan]:
+    amount = 1 if m.group(1) is None else _to_number(m.group(1))
+    sign = -1 if m.group(2) == "전" else 1
+    return _week_span(today, sign * amount)
+
+
+def _rule_months_ago(m: re.Match, today: date) -> Optional[DateSpan]:
+    amount = _to_number(m.group(1))
+    sign = -1 if m.group(2) == "전" else 1
+    year, month = _shift_month(today.year, today.month, sign * amount)
+    return _month_span(year, month)
+
+
+def _rule_years_ago(m: re.Match, today: date) -> Optional[DateSpan]:
+    amount = _to_number(m.group(1))
+    sign = -1 if m.group(2) == "전" else 1
+    year = today.year + sign * amount
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def _fixed_day(offset: int) -> Callable[[re.Match, date], DateSpan]:
+    def rule(m: re.Match, today: date) -> DateSpan:
+        day = today + timedelta(days=offset)
+        return day, day
+
+    return rule
+
+
+# 구체적인 표현부터 검사 (매칭된 부분은 지워서 뒤 규칙과 겹치지 않게 함)
+# 세 번째 값은 일반 명사와 겹치는 표현의 확인 방식 (_match_strength)
+Rule = Tuple[re.Pattern, Callable[[re.Match, date], Optional[DateSpan]], Optional[str]]
+RULES: List[Rule] = [
+    (re.compile(r"(\d{4})\s*[.\-/]\s*(\d{1,2})\s*[.\-/]\s*(\d{1,2})"), _rule_year_month_day, None),
+    (re.compile(YEAR_PREFIX + r"\s*(\d{1,2})\s*월\s*(\d{1,2})\s*일"), _rule_year_month_day, None),
+    (re.compile(YEAR_PREFIX + r"\s*(\d{1,2})\s*월" + PART), _rule_year_month, None),
+    (
+        re.compile(r"(?P<prefix>" + YEAR_PREFIX[1:-1] + r")?\s*(" + HOLIDAY_NAMES + r")"),
+        _rule_holiday,
+        "context",
+    ),
+    (re.compile(r"(\d{1,2})\s*월\s*(\d{1,2})\s*일"), _rule_month_day, None),
+    (re.compile(r"(?<![\d/])(\d{1,2})\s*/\s*(\d{1,2})(?![\d/])"), _rule_month_day, "context"),
+    (re.compile(REL + r"\s*주\s*([월화수목금토일])\s*요일"), _rule_week_weekday, None),
+    (re.compile(REL + r"\s*주\s*말(?!\s*[에의]?\s*[초중])"), _rule_week_weekend, "unit"),
+    (re.compile(REL + r"\s*주" + PART), _rule_relative_week, "unit"),
+    (re.compile(REL + r"\s*달" + PART), _rule_relative_month, "unit"),
+    (re.compile(r"(재작년|작년도|작년|지난해|올해|금년|내년)" + PART), _rule_relative_year, None),
+    (re.compile(r"(연초|연말|월초|월말)"), _rule_year_part_word, None),
+    (re.compile(r"((?:19|20)\d{2}\s*년)" + PART), _rule_numeric_year, None),
+    (re.compile(r"(?<!\d)(\d{1,2})\s*월(?:\s*달)?(?![요화])" + PART), _rule_month, "unit"),
+    (re.compile(r"([월화수목금토일])\s*요일"), _rule_weekday, None),
+    (re.compile(r"주말"), _rule_weekend, "context"),
+    (re.compile(r"(\d+)\s*일\s*(전|후|뒤)"), _rule_days_ago, None),
+    (re.compile(DAY_WORDS + r"\s*(전|후|뒤)"), _rule_days_ago, None),
+    (re.compile(r"(?:(" + NUM[1:-1] + r")\s*주일?|일주일)\s*(전|후|뒤)"), _rule_weeks_ago, None),
+    (re.compile(NUM + r"\s*(?:개월|달)\s*(전|후|뒤)"), _rule_months_ago, None),
+    (re.compile(NUM + r"\s*년\s*(전|후|뒤)"), _rule_years_ago, None),
+    (re.compile(r"그그저께|그끄저께"), _fixed_day(-3), "word"),
+    (re.compile(r"엊그제|엊그저께|그저께|그제"), _fixed_day(-2), "word"),
+    (re.compile(r"어제|어저께"), _fixed_day(-1), "word"),
+    (re.compile(r"오늘|금일"), _fixed_day(0), "word"),
+    (re.compile(r"내일"), _fixed_day(1), "word"),
+    (re.compile(r"모레"), _fixed_day(2), "word"),
+]
+
+
+def resolve_date_range(query: str, today: Optional[date] = None) -> Optional[DateRange]:
+    """
+    쿼리의 한국어 시간 표현을 촬영 날짜 범위로 변환 (LLM 호출 없음)
+
+    - 여러 표현이 있으면 모두 포함하는 범위 ("지난주 월요일부터 수요일까지")
+    - 시간 표현이 없으면 None
+    - 기준 날짜는 한국 시간의 오늘
+    """
+    today = today or datetime.now(KST).date()
+    text = query
+    spans: List[DateSpan] = []
+    expressions: List[str] = []
+    explicit = True
+
+    for pattern, rule, guard in RULES:
+        consumed = []
+        for match in list(pattern.finditer(text)):
+            strength = _match_strength(text, match, guard)
+            if strength is None:
+                continue
+            consumed.append(match)
+            try:
+                span = rule(match, today)
+            except (ValueError, KeyError, TypeError):
+                span = None
+            if span is None:
+                continue
+            spans.append(span)
+            expressions.append(match.group(0).strip())
+            explicit = explicit and strength
+        # 매칭된 부분은 같은 길이의 공백으로 지워 위치 유지
+        for match in consumed:
+            text = text[: match.start()] + " " * len(match.group(0)) + text[match.end() :]
+
+    if not spans:
+        return None
+
+    start = min(span[0] for span in spans)
+    end = max(span[1] for span in spans)
+    return DateRange(start=start, end=end, expressions=expressions, explicit=explicit)
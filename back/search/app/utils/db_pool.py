@@ -0,0 +1,112 @@
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+import asyncpg
+from app.config.settings import (
+    DB_PARAMS,
+    DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE,
+    DB_POOL_ACQUIRE_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 전역 커넥션 풀 (startup 이벤트에서 생성)
+pool: Optional[asyncpg.Pool] = None
+
+# 커넥션 체크아웃 지표
+pool_metrics = {
+    "checkouts": 0,
+    "waiting": 0,
+    "timeouts": 0,
+    "total_wait_time": 0.0,
+    "max_wait_time": 0.0,
+}
+
+
+async def init_db_pool() -> asyncpg.Pool:
+    """DB 커넥션 풀 생성 (애플리케이션 시작 시 1회)"""
+    global pool
+    if pool is not None:
+        return pool
+
+    pool_start = time.time()
+    pool = await asyncpg.create_pool(
+        host=DB_PARAMS["host"],
+        port=int(DB_PARAMS["port"]),
+        database=DB_PARAMS["database"],
+        user=DB_PARAMS["user"],
+        password=DB_PARAMS["password"],
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+    )
+    logger.info(
+        f"✅ DB 커넥션 풀 생성 완료 (min={DB_POOL_MIN_SIZE}, max={DB_POOL_MAX_SIZE}): {time.time() - pool_start:.3f}초"
+    )
+    return pool
+
+
+async def close_db_pool():
+    """DB 커넥션 풀 종료"""
+    global pool
+    if pool is None:
+        return
+    await pool.close()
+    pool = None
+    logger.info("🗑️ DB 커넥션 풀 종료")
+
+
+@asynccontextmanager
+async def acquire_connection():
+    """풀에서 커넥션을 빌려오고 대기 시간을 기록"""
+    if pool is None:
+        raise RuntimeError("DB 커넥션 풀이 초기화되지 않았습니다.")
+
+    wait_start = time.perf_counter()
+    pool_metrics["waiting"] += 1
+    try:
+        connection = await pool.acquire(timeout=DB_POOL_ACQUIRE_TIMEOUT)
+    except Exception:
+        pool_metrics["timeouts"] += 1
+        raise
+    finally:
+        pool_metrics["waiting"] -= 1
+
+    wait_time = time.perf_counter() - wait_start
+    pool_metrics["checkouts"] += 1
+    pool_metrics["total_wait_time"] += wait_time
+    pool_metrics["max_wait_time"] = max(pool_metrics["max_wait_time"], wait_time)
+
+    try:
+        yield connection
+    finally:
+        await pool.release(connection)
+
+
+def get_pool_stats() -> Dict:
+    """커넥션 풀 상태 및 체크아웃 지표 반환"""
+    checkouts = pool_metrics["checkouts"]
+    stats = {
+        "initialized": pool is not None,
+        "checkouts": checkouts,
+        "waiting": pool_metrics["waiting"],
+        "timeouts": pool_metrics["timeouts"],
+        "avg_wait_ms": (
+            round(pool_metrics["total_wait_time"] / checkouts * 1000, 3)
+            if checkouts
+            else 0.0
+        ),
+        "max_wait_ms": round(pool_metrics["max_wait_time"] * 1000, 3),
+    }
+    if pool is not None:
+        stats.update(
+            {
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "in_use": pool.get_size() - pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": pool.get_max_size(),
+            }
+        )
+    return stats
@@ -1,98 +1,253 @@
-import asyncio
-import psycopg2
 import logging
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor
-from app.config.settings import DB_PARAMS, MAX_SEARCH_RESULTS
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from app.config.settings import MAX_SEARCH_RESULTS
+from app.utils.db_pool import acquire_connection
+from app.utils.geo_utils import GeoFilter
 
 logger = logging.getLogger(__name__)
-executor = ThreadPoolExecutor(max_workers=10)
-
-
-async def search_photos_by_keywords(user_id: str, keywords: List[str]) -> List[Dict]:
-    """키워드로 DB에서 사진 검색 - 매치 점수 포함"""
-
-    def sync_search_photos():
-        connection = psycopg2.connect(**DB_PARAMS)
-        cursor = connection.cursor()
-
-        try:
-            # 개선된 검색 쿼리 - 매치 점수와 정보 포함
-            query = """
-            WITH keyword_matches AS (
-            SELECT 
-                i.access_id,
-                i.image_time,
-                i.caption,
-                ik.keyword,
-                CASE 
-                    WHEN ik.keyword = ANY(%s) THEN 1.0
-                    ELSE 0.5
-                END as match_score
-            FROM images i
-            JOIN image_keywords ik 
-                ON i.access_id = ik.image_id AND i.user_id = ik.user_id  -- ✅ 핵심 수정
-            WHERE i.user_id = %s 
-            AND (
-                ik.keyword = ANY(%s)
-                OR EXISTS (
-                    SELECT 1 FROM unnest(%s::text[]) AS search_kw
-                    WHERE ik.keyword ILIKE '%%' || search_kw || '%%'
-                )
+
+# 사진 검색 쿼리
+# - 정확 일치는 (user_id, keyword) 복합 인덱스를 사용
+# - 부분 일치는 ILIKE ANY(패턴 배열)로 pg_trgm GIN 인덱스를 사용
+# - 키워드를 먼저 좁힌 뒤 images와 조인
+PHOTO_SEARCH_QUERY = """
+WITH keyword_matches AS (
+    SELECT
+        ik.image_id,
+        ik.keyword,
+        CASE
+            WHEN ik.keyword = ANY($1::text[]) THEN 1.0
+            ELSE 0.5
+        END AS match_score
+    FROM image_keywords ik
+    WHERE ik.user_id = $2
+    AND (
+        ik.keyword = ANY($1::text[])
+        OR ik.keyword ILIKE ANY($3::text[])
+    )
+),
+aggregated AS (
+    SELECT
+        image_id,
+        COUNT(DISTINCT keyword) AS keyword_count,
+        SUM(match_score) AS total_score,
+        STRING_AGG(DISTINCT keyword, ', ') AS matched_keywords
+    FROM keyword_matches
+    GROUP BY image_id
+)
+SELECT
+    i.access_id,
+    i.caption,
+    a.keyword_count,
+    a.total_score,
+    a.matched_keywords,
+    i.image_time
+FROM aggregated a
+JOIN images i
+    ON i.user_id = $2 AND i.access_id = a.image_id
+ORDER BY a.total_score DESC, a.keyword_count DESC, i.image_time DESC NULLS LAST
+LIMIT $4;
+"""
+
+# 시간/반경 조건이 있는 사진 검색 쿼리
+# - (user_id, image_time), (user_id, geohash) 인덱스로 후보 사진을 먼저 좁힌 뒤 키워드 점수 계산
+# - {candidate_source}, {candidate_conditions}는 build_candidate_filter가 채움 ($5부터 사용)
+FILTERED_PHOTO_SEARCH_QUERY = """
+WITH candidate_images AS (
+    SELECT i.access_id, i.caption, i.image_time
+    FROM {candidate_source}
+    WHERE i.user_id = $2
+    {candidate_conditions}
+),
+keyword_matches AS (
+    SELECT
+        ik.image_id,
+        ik.keyword,
+        CASE
+            WHEN ik.keyword = ANY($1::text[]) THEN 1.0
+            ELSE 0.5
+        END AS match_score
+    FROM image_keywords ik
+    JOIN candidate_images c
+        ON c.access_id = ik.image_id
+    WHERE ik.user_id = $2
+    AND (
+        ik.keyword = ANY($1::text[])
+        OR ik.keyword ILIKE ANY($3::text[])
+    )
+),
+aggregated AS (
+    SELECT
+        image_id,
+        COUNT(DISTINCT keyword) AS keyword_count,
+        SUM(match_score) AS total_score,
+        STRING_AGG(DISTINCT keyword, ', ') AS matched_keywords
+    FROM keyword_matches
+    GROUP BY image_id
+)
+SELECT
+    c.access_id,
+    c.caption,
+    a.keyword_count,
+    a.total_score,
+    a.matched_keywords,
+    c.image_time
+FROM aggregated a
+JOIN candidate_images c
+    ON c.access_id = a.image_id
+ORDER BY a.total_score DESC, a.keyword_count DESC, c.image_time DESC NULLS LAST
+LIMIT $4;
+"""
+
+# 키워드 없이 시간/반경 조건만 있는 쿼리 ("어제 찍은 사진") - 조건 안의 사진을 최신순으로
+FILTERED_PHOTO_LIST_QUERY = """
+SELECT
+    i.access_id,
+    i.caption,
+    0 AS keyword_count,
+    0.0 AS total_score,
+    '' AS matched_keywords,
+    i.image_time
+FROM {candidate_source}
+WHERE i.user_id = $1
+{candidate_conditions}
+ORDER BY i.image_time DESC NULLS LAST
+LIMIT $2;
+"""
+
+# 반경 조건 (하버사인 거리, m)
+HAVERSINE_CONDITION = """AND i.latitude IS NOT NULL
+    AND 2 * 6371000 * ASIN(LEAST(1, SQRT(
+        POWER(SIN(RADIANS(i.latitude - ${lat}) / 2), 2)
+        + COS(RADIANS(${lat})) * COS(RADIANS(i.latitude))
+        * POWER(SIN(RADIANS(i.longitude - ${lon}) / 2), 2)
+    ))) <= ${radius}"""
+
+
+def build_candidate_filter(
+    first_param: int,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    geo_filter: Optional[GeoFilter] = None,
+) -> Tuple[Dict[str, str], List]:
+    """
+    후보 사진 조건 SQL 조각과 파라미터 생성 → ({candidate_source, candidate_conditions}, 파라미터)
+
+    반경 조건은 원을 덮는 geohash 접두사마다 [접두사, 접두사 + '{') 범위로 인덱스를 탄 뒤
+    정확한 거리로 한 번 더 거름 ('{'는 geohash 문자('z')보다 큰 첫 문자)
+    """
+    source = "images i"
+    conditions, params = [], []
+
+    def next_param(value) -> int:
+        params.append(value)
+        return first_param + len(params) - 1
+
+    if start_time is not None:
+        conditions.append(f"AND i.image_time >= ${next_param(start_time)}")
+    if end_time is not None:
+        conditions.append(f"AND i.image_time <= ${next_param(end_time)}")
+
+    if geo_filter is not None:
+        cells = geo_filter.covering_cells()
+        if cells:
+            cells_param = next_param(cells)
+            source = (
+                f"unnest(${cells_param}::text[]) AS cell\n"
+                "    JOIN images i\n"
+                "        ON i.geohash >= cell COLLATE \"C\"\n"
+                "        AND i.geohash < (cell || '{') COLLATE \"C\""
+            )
+        conditions.append(
+            HAVERSINE_CONDITION.format(
+                lat=next_param(geo_filter.latitude),
+                lon=next_param(geo_filter.longitude),
+                radius=next_param(geo_filter.radius_m),
             )
-        ),
-        aggregated AS (
-            SELECT 
-                access_id,
-                image_time,
-                caption,
-                COUNT(DISTINCT keyword) as keyword_count,
-                SUM(match_score) as total_score,
-                STRING_AGG(DISTINCT keyword, ', ') as matched_keywords
-            FROM keyword_matches
-            GROUP BY access_id, image_time, caption
         )
-        SELECT 
-            access_id,
-            caption,
-            keyword_count,
-            total_score,
-            matched_keywords,
-            image_time
-        FROM aggregated
-        ORDER BY total_score DESC, keyword_count DESC, image_time DESC
-        LIMIT %s;
-
-            """
-
-            cursor.execute(
-                query, (keywords, user_id, keywords, keywords, MAX_SEARCH_RESULTS)
+
+    return (
+        {"candidate_source": source, "candidate_conditions": "\n    ".join(conditions)},
+        params,
+    )
+
+
+def build_like_patterns(keywords: List[str]) -> List[str]:
+    """부분 일치 검색용 ILIKE 패턴 생성 (와일드카드 문자 이스케이프)"""
+    patterns = []
+    for keyword in keywords:
+        escaped = (
+            keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        patterns.append(f"%{escaped}%")
+    return patterns
+
+
+async def search_photos_by_keywords(
+    user_id: str,
+    keywords: List[str],
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    geo_filter: Optional[GeoFilter] = None,
+) -> List[Dict]:
+    """
+    키워드로 DB에서 사진 검색 - 매치 점수 포함
+
+    - start_time / end_time: 촬영 시각 범위
+    - geo_filter: 촬영 위치 반경
+    (조건이 있으면 키워드 점수 계산 전에 후보 사진을 먼저 좁힘)
+    """
+    has_filter = start_time is not None or end_time is not None or geo_filter is not None
+
+    async with acquire_connection() as connection:
+        if not has_filter:
+            results = await connection.fetch(
+                PHOTO_SEARCH_QUERY,
+                keywords,
+                user_id,
+                build_like_patterns(keywords),
+                MAX_SEARCH_RESULTS,
+            )
+        elif not keywords:
+            fragments, filter_params = build_candidate_filter(
+                3, start_time, end_time, geo_filter
+            )
+            results = await connection.fetch(
+                FILTERED_PHOTO_LIST_QUERY.format(**fragments),
+                user_id,
+                MAX_SEARCH_RESULTS,
+                *filter_params,
             )
-            results = cursor.fetchall()
-
-            # 결과를 딕셔너리 리스트로 변환
-            photo_results = []
-            for row in results:
-                photo_results.append(
-                    {
-                        "access_id": row[0],
-                        "caption": row[1],
-                        "match_count": row[2],
-                        "score": float(row[3]),
-                        "matched_keywords": row[4],
-                        "image_time": row[5].isoformat() if row[5] else None,
-                    }
-                )
-
-                logger.info(
-                    f"📷 사진: {row[0]}, 점수: {row[3]:.1f}, 매치: {row[2]}개, 키워드: {row[4]}"
-                )
-
-            return photo_results
-
-        finally:
-            cursor.close()
-            connection.close()
-
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(executor, sync_search_photos)
+        else:
+            fragments, filter_params = build_candidate_filter(
+                5, start_time, end_time, geo_filter
+            )
+            results = await connection.fetch(
+                FILTERED_PHOTO_SEARCH_QUERY.format(**fragments),
+                keywords,
+                user_id,
+                build_like_patterns(keywords),
+                MAX_SEARCH_RESULTS,
+                *filter_params,
+            )
+
+    # 결과를 딕셔너리 리스트로 변환
+    photo_results = []
+    for row in results:
+        photo_results.append(
+            {
+                "access_id": row[0],
+                "caption": row[1],
+                "match_count": row[2],
+                "score": float(row[3]),
+                "matched_keywords": row[4],
+                "image_time": row[5].isoformat() if row[5] else None,
+            }
+        )
+
+        logger.info(
+            f"📷 사진: {row[0]}, 점수: {row[3]:.1f}, 매치: {row[2]}개, 키워드: {row[4]}"
+        )
+
+    return photo_results
@@ -1,18 +1,126 @@
 # app/utils/embedding.py
 
 import os
+import asyncio
+from typing import Dict, Optional
 from dotenv import load_dotenv
 from openai import OpenAI
+from app.config.settings import (
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+    EMBEDDING_BATCH_MAX_CONCURRENCY,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_DIR,
+)
+from app.utils.embedding_batcher import EmbeddingBatcher
+from app.utils.embedding_cache import EmbeddingCache
+from app.utils.embedding_registry import (
+    ACTIVE_EMBEDDING_MODEL,
+    QUERY_EMBEDDING_MODELS,
+    get_model_info,
+    model_filter,
+)
 
 load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY_2"))
 
+# 모델별 배치 처리기 (동시 요청을 모아 한 번에 임베딩)
+batchers: Dict[str, EmbeddingBatcher] = {}
 
-def get_text_embedding(text: str) -> list[float]:
+
+def get_batcher(model: str = ACTIVE_EMBEDDING_MODEL) -> EmbeddingBatcher:
+    if model not in batchers:
+        batchers[model] = EmbeddingBatcher(
+            client,
+            model=model,
+            dimensions=get_model_info(model)["request_dimensions"],
+            max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS,
+            max_concurrent_batches=EMBEDDING_BATCH_MAX_CONCURRENCY,
+        )
+    return batchers[model]
+
+
+batcher = get_batcher(ACTIVE_EMBEDDING_MODEL)
+
+# 같은 문장 재임베딩 방지 (메모리 LRU + 선택적 디스크 저장)
+embedding_cache = EmbeddingCache(EMBEDDING_CACHE_MAX_BYTES, EMBEDDING_CACHE_DIR)
+
+
+def get_text_embedding(text: str, model: str = ACTIVE_EMBEDDING_MODEL) -> list[float]:
     if not text.strip():
         raise ValueError("입력이 비어 있습니다.")
 
-    response = client.embeddings.create(
-        model="text-embedding-3-small", input=[text]  # input은 리스트로 전달해야 함
-    )
-    return response.data[0].embedding
+    cached = embedding_cache.get(model, text)
+    if cached is not None:
+        return cached
+
+    embedding = get_batcher(model).embed(text)
+    embedding_cache.put(model, text, embedding)
+    return embedding
+
+
+async def get_text_embedding_async(
+    text: str, model: str = ACTIVE_EMBEDDING_MODEL
+) -> list[float]:
+    """이벤트 루프를 막지 않고 배치 임베딩 결과 대기"""
+    if not text.strip():
+        raise ValueError("입력이 비어 있습니다.")
+
+    cached = embedding_cache.get(model, text)
+    if cached is not None:
+        return cached
+
+    embedding = await asyncio.wrap_future(get_batcher(model).submit(text))
+    embedding_cache.put(model, text, embedding)
+    return embedding
+
+
+def get_text_embeddings(
+    texts: list[str], model: str = ACTIVE_EMBEDDING_MODEL
+) -> list[list[float]]:
+    """여러 문장 임베딩 (캐시에 없는 문장만 요청, 입력 순서 유지)"""
+    embeddings = [embedding_cache.get(model, text) for text in texts]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+    if missing:
+        model_batcher = get_batcher(model)
+        futures = [model_batcher.submit(texts[i]) for i in missing]
+        for i, future in zip(missing, futures):
+            embeddings[i] = future.result()
+            embedding_cache.put(model, texts[i], embeddings[i])
+
+    return embeddings
+
+
+def query_by_text(
+    index,
+    namespace: str,
+    text: str,
+    top_k: int,
+    filter: Optional[Dict] = None,
+    include_metadata: bool = True,
+) -> list:
+    """
+    저장 시 사용한 임베딩 모델과 같은 모델로 검색
+
+    재임베딩 중에는 이전 모델 벡터도 해당 모델로 검색해 id 기준 최고 점수로 병합
+    """
+    all_matches = {}
+    for model in QUERY_EMBEDDING_MODELS:
+        response = index.query(
+            vector=get_text_embedding(text, model),
+            namespace=namespace,
+            top_k=top_k,
+            filter=model_filter(model, filter),
+            include_metadata=include_metadata,
+        )
+        for match in response["matches"]:
+            match_id = match["id"]
+            if (
+                match_id not in all_matches
+                or match["score"] > all_matches[match_id]["score"]
+            ):
+                all_matches[match_id] = match
+
+    return sorted(all_matches.values(), key=lambda x: x["score"], reverse=True)[:top_k]
@@ -0,0 +1,230 @@
+# app/utils/embedding_cache.py
+
+import os
+import re
+import json
+import mmap
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def get_embedding_key(model: str, text: str) -> tuple[str, str]:
+    """(모델, sha256(텍스트)) 형태의 캐시 키 생성"""
+    return model, hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _ModelVectorFile:
+    """
+    모델별 float32 벡터 파일 (행 단위 append, 읽기는 mmap)
+
+    - {model}.f32 : 벡터 데이터 (dim * 4 바이트씩 연속 저장)
+    - {model}.idx : "sha256 다이제스트 행번호" 한 줄씩
+    - {model}.json: 차원 정보
+    벡터를 먼저 쓰고 인덱스를 나중에 씀. 중간에 종료되면 인덱스가 없는 행이나 잘린 꼬리가 남을 수 있어
+    행 번호를 인덱스에 직접 기록하고, 열 때와 쓰기 전에 잘린 꼬리를 잘라냄
+    """
+
+    def __init__(self, directory: str, model: str):
+        safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", model)
+        self.vector_path = os.path.join(directory, f"{safe_name}.f32")
+        self.index_path = os.path.join(directory, f"{safe_name}.idx")
+        self.meta_path = os.path.join(directory, f"{safe_name}.json")
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_rows = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, encoding="utf-8") as f:
+            self.dim = json.load(f)["dim"]
+
+        vector_rows = self._truncate_vectors()
+        self._truncate_index()
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                for line_number, line in enumerate(f):
+                    parts = line.split()
+                    if not parts:
+                        continue
+                    try:
+                        # 행 번호가 없는 줄은 이전 형식 (줄 순서 = 행 순서)
+                        row = int(parts[1]) if len(parts) > 1 else line_number
+                    except ValueError:
+                        continue
+                    # 벡터가 다 써지지 않은 행은 무시
+                    if row < vector_rows:
+                        self.rows[parts[0]] = row
+        logger.info(f"💽 임베딩 디스크 캐시 로드: {self.vector_path} ({len(self.rows)}개)")
+
+    def _truncate_vectors(self) -> int:
+        """벡터 파일을 완전한 행 단위로 맞춤 (잘린 마지막 행 제거) → 행 수"""
+        if not os.path.exists(self.vector_path):
+            return 0
+        row_bytes = self.dim * 4
+        size = os.path.getsize(self.vector_path)
+        if size % row_bytes:
+            logger.warning(f"⚠️ 임베딩 디스크 캐시 잘린 행 제거: {self.vector_path}")
+            with open(self.vector_path, "r+b") as f:
+                f.truncate(size - size % row_bytes)
+        return size // row_bytes
+
+    def _truncate_index(self):
+        """인덱스 파일의 끝나지 않은 마지막 줄 제거 (다음 줄과 붙지 않도록)"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r+b") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def _remap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if os.path.getsize(self.vector_path) == 0:
+            return
+        with open(self.vector_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_rows = len(self._mmap) // (self.dim * 4)
+
+    def get(self, digest: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self.rows.get(digest)
+            if row is None:
+                return None
+            if self._mmap is None or row >= self._mapped_rows:
+                self._remap()
+            start = row * self.dim * 4
+            return np.frombuffer(
+                self._mmap, dtype=np.float32, count=self.dim, offset=start
+            ).copy()
+
+    def put(self, digest: str, vector: np.ndarray):
+        with self._lock:
+            if digest in self.rows:
+                return
+            if self.dim is None:
+                self.dim = int(vector.shape[0])
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"dim": self.dim}, f)
+            if vector.shape[0] != self.dim:
+                return
+
+            row = self._truncate_vectors()
+            with open(self.vector_path, "ab") as f:
+                f.write(vector.astype(np.float32).tobytes())
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(f"{digest} {row}\n")
+            self.rows[digest] = row
+
+
+class EmbeddingCache:
+    """
+    임베딩 캐시: (모델, sha256(텍스트)) -> float32 벡터
+
+    - 메모리: 바이트 예산(max_bytes) 기반 LRU
+    - 디스크(선택): 모델별 mmap float32 파일, 재시작 후에도 유지
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: str = ""):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._memory: "OrderedDict[tuple[str, str], np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._files: Dict[str, _ModelVectorFile] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _get_file(self, model: str) -> Optional[_ModelVectorFile]:
+        if not self.disk_dir:
+            return None
+        with self._lock:
+            if model not in self._files:
+                self._files[model] = _ModelVectorFile(self.disk_dir, model)
+            return self._files[model]
+
+    def _remember(self, key: tuple[str, str], vector: np.ndarray):
+        """메모리 LRU에 저장 (예산 초과 시 오래된 항목부터 제거)"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = vector
+            self._bytes += vector.nbytes
+            while self._bytes > self.max_bytes and self._memory:
+                _, evicted = self._memory.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._stats["evictions"] += 1
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = get_embedding_key(model, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                return vector.tolist()
+
+        model_file = self._get_file(model)
+        if model_file is not None:
+            vector = model_file.get(key[1])
+            if vector is not None:
+                self._remember(key, vector)
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                return vector.tolist()
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, model: str, text: str, embedding: List[float]):
+        key = get_embedding_key(model, text)
+        vector = np.asarray(embedding, dtype=np.float32)
+        self._remember(key, vector)
+
+        model_file = self._get_file(model)
+        if model_file is not None:
+            try:
+                model_file.put(key[1], vector)
+            except OSError as e:
+                logger.warning(f"⚠️ 임베딩 디스크 캐시 저장 실패: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        """히트/미스 및 메모리 사용량 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+            items = len(self._memory)
+            used_bytes = self._bytes
+            disk_items = {model: len(f.rows) for model, f in self._files.items()}
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": round((stats["hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0,
+            "items": items,
+            "bytes": used_bytes,
+            "max_bytes": self.max_bytes,
+            "disk_dir": self.disk_dir or None,
+            "disk_items": disk_items,
+        }
+
+    def clear(self) -> int:
+        """메모리 캐시 초기화 (디스크 저장소는 유지)"""
+        with self._lock:
+            cleared = len(self._memory)
+            self._memory.clear()
+            self._bytes = 0
+        return cleared
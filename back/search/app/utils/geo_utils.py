@@ -0,0 +1,75 @@
+# app/utils/geo_utils.py
+
+import math
+from typing import List, Optional
+from pydantic import BaseModel
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# rag 서비스가 images.geohash에 저장하는 정밀도
+GEOHASH_PRECISION = 9
+
+METERS_PER_DEGREE = 111_320
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """위도/경도 → geohash (rag 서비스 geo_utils와 같은 규칙)"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        target, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (target[0] + target[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            target[0] = mid
+        else:
+            target[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def _cell_size_meters(precision: int, latitude: float) -> float:
+    """geohash 셀의 짧은 변 길이 (m)"""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    height = 180 / 2**lat_bits * METERS_PER_DEGREE
+    width = 360 / 2**lon_bits * METERS_PER_DEGREE * math.cos(math.radians(latitude))
+    return min(height, width)
+
+
+class GeoFilter(BaseModel):
+    """반경 검색 조건 (중심 위도/경도, 반경 m)"""
+
+    latitude: float
+    longitude: float
+    radius_m: float
+
+    def covering_cells(self) -> Optional[List[str]]:
+        """
+        반경 원을 덮는 geohash 접두사 목록 (images.geohash 인덱스 범위 검색용)
+
+        셀 한 변이 반경 이상인 가장 정밀한 자릿수를 골라 원의 외접 사각형 3x3 지점의 셀을 모음
+        → 최대 9개 접두사. 반경이 너무 크면 None (거리 조건만 사용)
+        """
+        precision = 0
+        for candidate in range(GEOHASH_PRECISION, 0, -1):
+            if _cell_size_meters(candidate, self.latitude) >= self.radius_m:
+                precision = candidate
+                break
+        if precision == 0:
+            return None
+
+        dlat = self.radius_m / METERS_PER_DEGREE
+        dlon = self.radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(self.latitude)), 1e-6))
+        cells = set()
+        for sy in (-1, 0, 1):
+            for sx in (-1, 0, 1):
+                lat = min(max(self.latitude + sy * dlat, -90.0), 90.0)
+                lon = (self.longitude + sx * dlon + 180) % 360 - 180
+                cells.add(encode_geohash(lat, lon, precision))
+        return sorted(cells)
@@ -0,0 +1,331 @@
+# app/utils/intent_classifier.py
+
+import re
+import math
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from app.config.settings import (
+    INTENT_FAST_PATH_THRESHOLD,
+    INTENT_SHADOW_SAMPLE_RATE,
+    INTENT_CONFUSION_LOG_EVERY,
+)
+from app.utils.ai_utils import determine_image_query_intent
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("find_photo", "get_info", "conversation")
+
+# 규칙별 가중치: (의도, 정규식, 가중치)
+INTENT_RULES: List[Tuple[str, "re.Pattern", float]] = [
+    # 사진 검색 지시어는 다른 신호보다 우선
+    ("find_photo", re.compile(r"사진|이미지|캡처|캡쳐|스크린샷|스샷|짤|찍은|찍었던|촬영"), 2.5),
+    ("find_photo", re.compile(r"보여\s*줘|보여\s*주|찾아\s*줘|찾아\s*주|어딨|보고\s*싶"), 1.5),
+    # 정보 요청 (의문형/설명 요청)
+    ("get_info", re.compile(r"\?$|뭐야|뭐지|뭔가요|무엇|누구|언제|얼마|몇\s*[시개번월일명]|어때|어떻게|왜\b|왜\s"), 1.2),
+    ("get_info", re.compile(r"알려\s*줘|알려\s*주|설명|뜻|의미|정의|방법|이유|차이|번호|주소|비밀번호|일정"), 1.2),
+    # 일반 대화 (감정/선호/인사 표현)
+    ("conversation", re.compile(r"^(나는|난|내가|저는|전|제가)\s|^나\s"), 0.8),
+    (
+        "conversation",
+        re.compile(r"싫어|좋아해|좋아한|사랑해|기분|행복|슬퍼|우울|피곤|졸려|배고파|심심|힘들|짜증|고마워|감사|안녕|ㅋㅋ|ㅎㅎ|ㅠ"),
+        1.5,
+    ),
+]
+
+# 서술어/어미가 없는 짧은 명사구 ("헬로키티", "에어컨", "빨간 인형")는 사진 검색
+SENTENCE_ENDING = re.compile(r"[?!.]|(다|요|까|야|해|줘|지|니|네|어|아|래|게|자|라)$")
+NOUN_PHRASE = re.compile(r"^[\w\s]{1,20}$")
+NOUN_PHRASE_WEIGHT = 1.5
+
+# 정보를 묻는 명사 ("유효기간", "주차 위치", "약속 장소", "엄마 생일", "회의 내용")가 들어간 명사구는
+# 사진/정보 요청 모두 가능하므로 명사구 가중치를 주지 않음 (n-gram 점수만으로는 확신 못 해 LLM 호출)
+INFO_NOUN = re.compile(
+    r"유효\s*기간|기한|만료|시간|시각|날짜|요일|언제|얼마|몇"
+    r"|위치|장소|주소|어디|날씨|기온"
+    r"|가격|요금|금액|비용|잔액|번호|비밀번호|와이파이|wifi|계좌|코드"
+    r"|생일|기념일|일정|약속|예약|마감|영업|도착|배송|출발|방법|내용|결과|이름|연락처|용량|사이즈"
+)
+
+# fast-path로 결정하면 안 되는 질문 (분류기 생성 시 점검, 하나라도 fast-path면 생성 실패)
+LLM_FALLBACK_EXAMPLES = [
+    "스타벅스 기프티콘 유효기간",
+    "주차 위치",
+    "약 먹는 시간",
+    "오늘 날씨",
+    "엄마 생일",
+    "약속 장소",
+    "택배 도착일",
+    "회의 장소",
+    "스타벅스 와이파이",
+    "지난주 회의 내용",
+]
+
+# 문자 n-gram 점수기의 기준 예문 (LLM 프롬프트 예시와 같은 분포)
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "find_photo": [
+        "헬로키티", "헬로키티 사진", "에어컨", "빨간 인형", "강아지 사진 보여줘",
+        "바다에서 찍은 사진", "작년 여름 여행 사진", "기프티콘", "스타벅스 쿠폰",
+        "케이크 사진 찾아줘", "영수증 캡처", "고양이", "벚꽃", "생일 파티", "명함",
+    ],
+    "get_info": [
+        "헬로키티는 누구야?", "요즘 날씨가 어때?", "와이파이 비밀번호 뭐야",
+        "회의 일정 알려줘", "택배 송장번호 알려줘", "계좌번호가 뭐였지",
+        "이 약은 하루에 몇 번 먹어?", "병원 예약 언제야", "주차 위치가 어디였지",
+        "쿠폰 유효기간 언제까지야", "가게 전화번호 알려줘", "이게 무슨 뜻이야",
+    ],
+    "conversation": [
+        "나는 순두부찌개 싫어해", "오늘 기분이 좋아", "배고파", "심심하다",
+        "고마워", "안녕", "요즘 너무 피곤해", "난 고양이가 좋아",
+        "오늘 회사에서 힘들었어", "주말에 뭐 할까 고민이야", "ㅋㅋㅋ 웃기다",
+    ],
+}
+
+# 신뢰도 구간 (혼동 행렬 집계용 하한값)
+CONFIDENCE_BUCKETS = [0.0, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95]
+
+
+class IntentDecision(BaseModel):
+    """의도 분류 결과"""
+
+    intent: str
+    confidence: float
+    source: str  # "fast" (로컬 규칙/n-gram) 또는 "llm"
+    scores: Dict[str, float]
+    elapsed_ms: float
+
+
+def _char_ngrams(text: str, sizes=(1, 2, 3)) -> Counter:
+    normalized = " " + " ".join(text.lower().split()) + " "
+    grams = Counter()
+    for n in sizes:
+        for i in range(len(normalized) - n + 1):
+            grams[normalized[i : i + n]] += 1
+    return grams
+
+
+class NgramScorer:
+    """문자 n-gram 나이브 베이즈 (예문이 적어 라플라스 스무딩 사용)"""
+
+    def __init__(self, examples: Dict[str, List[str]], alpha: float = 0.5):
+        self.alpha = alpha
+        self.counts: Dict[str, Counter] = {}
+        self.totals: Dict[str, int] = {}
+        vocabulary = set()
+        for intent, texts in examples.items():
+            counter = Counter()
+            for text in texts:
+                counter.update(_char_ngrams(text))
+            self.counts[intent] = counter
+            self.totals[intent] = sum(counter.values())
+            vocabulary.update(counter)
+        self.vocab_size = len(vocabulary)
+
+    def posterior(self, text: str) -> Dict[str, float]:
+        """의도별 사후 확률 (n-gram 수로 정규화해 문장 길이에 따른 과신 방지)"""
+        grams = _char_ngrams(text)
+        size = max(sum(grams.values()), 1)
+        log_scores = {}
+        for intent, counter in self.counts.items():
+            denominator = self.totals[intent] + self.alpha * self.vocab_size
+            log_likelihood = sum(
+                count * math.log((counter.get(gram, 0) + self.alpha) / denominator)
+                for gram, count in grams.items()
+            )
+            log_scores[intent] = log_likelihood / size
+        best = max(log_scores.values())
+        exp_scores = {k: math.exp((v - best) * 4) for k, v in log_scores.items()}
+        total = sum(exp_scores.values())
+        return {k: v / total for k, v in exp_scores.items()}
+
+
+class IntentStats:
+    """fast-path 비율과 LLM 라벨 대비 혼동 행렬 (임계값 조정용)"""
+
+    def __init__(self, log_every: int = 50):
+        self.log_every = log_every
+        self._lock = threading.Lock()
+        self._counts = {"fast": 0, "llm": 0, "shadow": 0}
+        self._fast_time = 0.0
+        # (신뢰도 구간 하한, 로컬 예측, LLM 라벨) → 건수
+        self._confusion: Counter = Counter()
+
+    def record_decision(self, source: str, elapsed_ms: float):
+        with self._lock:
+            self._counts[source] += 1
+            self._fast_time += elapsed_ms
+
+    def record_comparison(self, predicted: str, confidence: float, llm_intent: str, shadow: bool):
+        bucket = max(b for b in CONFIDENCE_BUCKETS if confidence >= b)
+        with self._lock:
+            self._confusion[(bucket, predicted, llm_intent)] += 1
+            if shadow:
+                self._counts["shadow"] += 1
+            compared = sum(self._confusion.values())
+        if self.log_every and compared % self.log_every == 0:
+            self.log_confusion()
+
+    def _matrix(self, min_confidence: float = 0.0) -> Dict[str, Dict[str, int]]:
+        matrix = {p: {l: 0 for l in INTENTS} for p in INTENTS}
+        for (bucket, predicted, llm_intent), count in self._confusion.items():
+            if bucket >= min_confidence and predicted in matrix and llm_intent in matrix[predicted]:
+                matrix[predicted][llm_intent] += count
+        return matrix
+
+    def _threshold_table(self) -> List[Dict]:
+        """임계값별 커버리지(fast-path 비율)와 LLM 일치율"""
+        total = sum(self._confusion.values())
+        table = []
+        for threshold in CONFIDENCE_BUCKETS:
+            covered = agreed = 0
+            for (bucket, predicted, llm_intent), count in self._confusion.items():
+                if bucket >= threshold:
+                    covered += count
+                    agreed += count if predicted == llm_intent else 0
+            table.append(
+                {
+                    "threshold": threshold,
+                    "coverage": round(covered / total, 3) if total else 0.0,
+                    "agreement": round(agreed / covered, 3) if covered else 0.0,
+                    "samples": covered,
+                }
+            )
+        return table
+
+    def log_confusion(self):
+        with self._lock:
+            matrix = self._matrix()
+            table = self._threshold_table()
+        rows = "\n".join(
+            f"  {p:<12} " + " ".join(f"{matrix[p][l]:>6}" for l in INTENTS) for p in INTENTS
+        )
+        thresholds = ", ".join(
+            f"{t['threshold']}: {t['agreement']:.2f}/{t['coverage']:.2f}" for t in table
+        )
+        logger.info(
+            f"📊 의도 분류 혼동 행렬 (행: 로컬 예측, 열: LLM {'/'.join(INTENTS)})\n{rows}\n"
+            f"  임계값별 일치율/커버리지: {thresholds}"
+        )
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+            decisions = counts["fast"] + counts["llm"]
+            return {
+                **counts,
+                "fast_path_rate": round(counts["fast"] / decisions, 3) if decisions else 0.0,
+                "avg_local_ms": round(self._fast_time / decisions, 4) if decisions else 0.0,
+                "threshold": INTENT_FAST_PATH_THRESHOLD,
+                "confusion": self._matrix(),
+                "thresholds": self._threshold_table(),
+            }
+
+
+class IntentClassifier:
+    """
+    단계형 의도 분류기
+
+    1) 정규식 규칙 + 명사구 판별 + 문자 n-gram 점수를 합산 (마이크로초 단위)
+    2) 신뢰도가 임계값 이상이면 바로 결정, 아니면 LLM(determine_image_query_intent) 호출
+    3) LLM 라벨과 로컬 예측을 비교해 혼동 행렬 기록
+    """
+
+    def __init__(
+        self,
+        threshold: float = INTENT_FAST_PATH_THRESHOLD,
+        shadow_rate: float = INTENT_SHADOW_SAMPLE_RATE,
+    ):
+        self.threshold = threshold
+        self.shadow_rate = shadow_rate
+        self.scorer = NgramScorer(SEED_EXAMPLES)
+        self.stats = IntentStats(INTENT_CONFUSION_LOG_EVERY)
+        self._check_fallback_examples()
+
+    def _check_fallback_examples(self):
+        """정보 요청 명사구가 fast-path로 결정되지 않고 LLM으로 넘어가는지 점검 (규칙 회귀 시 시작 실패)"""
+        decided = []
+        for query in LLM_FALLBACK_EXAMPLES:
+            intent, confidence, _ = self.score(query)
+            if confidence >= self.threshold:
+                decided.append(f"'{query}' → {intent} ({confidence:.3f})")
+        if decided:
+            raise ValueError(
+                f"LLM으로 넘겨야 할 예문이 fast-path로 결정됨 (임계값 {self.threshold}): "
+                + ", ".join(decided)
+            )
+
+    def score(self, query: str) -> Tuple[str, float, Dict[str, float]]:
+        """로컬 점수 계산 → (의도, 신뢰도, 의도별 확률)"""
+        text = query.strip()
+        scores = dict(self.scorer.posterior(text))
+        for intent, pattern, weight in INTENT_RULES:
+            if pattern.search(text):
+                scores[intent] += weight
+        if (
+            NOUN_PHRASE.match(text)
+            and not SENTENCE_ENDING.search(text)
+            and not INFO_NOUN.search(text)
+        ):
+            scores["find_photo"] += NOUN_PHRASE_WEIGHT
+
+        # 점수 차이를 확률로 변환 (규칙 하나가 맞으면 0.9 이상)
+        best = max(scores.values())
+        exp_scores = {k: math.exp((v - best) * 3) for k, v in scores.items()}
+        total = sum(exp_scores.values())
+        probabilities = {k: round(v / total, 4) for k, v in exp_scores.items()}
+        intent = max(probabilities, key=probabilities.get)
+        return intent, probabilities[intent], probabilities
+
+    async def _compare_with_llm(self, query: str, predicted: str, confidence: float):
+        """fast-path 결정을 백그라운드에서 LLM과 비교 (응답 지연 없음)"""
+        try:
+            llm_intent = normalize_intent(await determine_image_query_intent(query))
+            self.stats.record_comparison(predicted, confidence, llm_intent, shadow=True)
+        except Exception as e:
+            logger.warning(f"⚠️ 의도 비교용 LLM 호출 실패: {str(e)}")
+
+    async def classify(self, query: str) -> IntentDecision:
+        start = time.perf_counter()
+        predicted, confidence, probabilities = self.score(query)
+        local_ms = (time.perf_counter() - start) * 1000
+
+        if confidence >= self.threshold:
+            self.stats.record_decision("fast", local_ms)
+            if self.shadow_rate and random.random() < self.shadow_rate:
+                asyncio.create_task(self._compare_with_llm(query, predicted, confidence))
+            return IntentDecision(
+                intent=predicted,
+                confidence=confidence,
+                source="fast",
+                scores=probabilities,
+                elapsed_ms=local_ms,
+            )
+
+        llm_intent = normalize_intent(await determine_image_query_intent(query))
+        self.stats.record_decision("llm", local_ms)
+        self.stats.record_comparison(predicted, confidence, llm_intent, shadow=False)
+        return IntentDecision(
+            intent=llm_intent,
+            confidence=confidence,
+            source="llm",
+            scores=probabilities,
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+
+
+def normalize_intent(raw: Optional[str]) -> str:
+    """LLM 응답에서 의도 라벨만 추출 (따옴표/설명 포함 응답 대비, 기본값 get_info)"""
+    text = (raw or "").lower()
+    for intent in INTENTS:
+        if intent in text:
+            return intent
+    return "get_info"
+
+
+# 프로세스 전역 분류기
+intent_classifier = IntentClassifier()
@@ -0,0 +1,135 @@
+# app/utils/llm_memo.py
+
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.config.settings import LLM_MEMO_MAX_ENTRIES, LLM_MEMO_TTL_SECONDS
+from app.utils.cache_utils import normalize_query
+
+logger = logging.getLogger(__name__)
+
+MemoKey = Tuple[str, str, str, str]
+
+
+class LeaderCancelled(Exception):
+    """먼저 호출한 요청이 취소됨 → 기다리던 요청이 직접 호출"""
+
+
+def memo_key(name: str, model: str, query: str, reference_date: Optional[str] = None) -> MemoKey:
+    """
+    메모 키 = (프롬프트 이름/버전, 모델, 정규화된 쿼리, 기준 날짜)
+
+    "어제", "지난주"처럼 날짜에 따라 결과가 달라지는 쿼리는 기준 날짜를 키에 포함
+    """
+    return name, model, normalize_query(query), reference_date or ""
+
+
+class LLMMemo:
+    """
+    LLM 응답 메모이제이션 (사용자 간 공유)
+
+    - 크기 제한 LRU + TTL
+    - 같은 키의 동시 요청은 진행 중인 호출 하나를 함께 기다림 (stampede 방지)
+    - 기다리던 요청 하나가 취소되어도 공유 Future는 유지, 실패한 결과는 저장하지 않음
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[MemoKey, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[MemoKey, Future] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, name: str, field: str):
+        stats = self._stats.setdefault(
+            name, {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        )
+        stats[field] += 1
+
+    def _lookup(self, key: MemoKey) -> Tuple[bool, Any, Optional[Future], bool]:
+        """(히트 여부, 값, 기다릴 Future, 직접 호출해야 하는지)"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[1] > time.time():
+                self._items.move_to_end(key)
+                self._count(key[0], "hits")
+                return True, item[0], None, False
+            if item is not None:
+                del self._items[key]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self._count(key[0], "coalesced")
+                return False, None, future, False
+
+            future = Future()
+            self._inflight[key] = future
+            self._count(key[0], "misses")
+            return False, None, future, True
+
+    def _store(self, key: MemoKey, future: Future, value: Any):
+        with self._lock:
+            self._items[key] = (value, time.time() + self.ttl_seconds)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+            self._inflight.pop(key, None)
+        if not future.done():
+            future.set_result(value)
+
+    def _fail(self, key: MemoKey, future: Future, error: BaseException):
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._count(key[0], "errors")
+        if not future.done():
+            future.set_exception(error)
+
+    async def get_or_compute_async(self, key: MemoKey, func: Callable[[], Awaitable[Any]]) -> Any:
+        """asyncio 호출용 (히트 시 스레드풀을 거치지 않음)"""
+        hit, value, future, is_leader = self._lookup(key)
+        if hit:
+            return value
+        if not is_leader:
+            try:
+                # shield: 기다리던 요청이 취소되어도 다른 요청이 함께 기다리는 Future는 취소하지 않음
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except LeaderCancelled:
+                # 먼저 호출한 요청이 취소되면 직접 호출
+                return await func()
+        try:
+            value = await func()
+        except asyncio.CancelledError:
+            self._fail(key, future, LeaderCancelled())
+            raise
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._store(key, future, value)
+        return value
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            prompts = {name: dict(stats) for name, stats in self._stats.items()}
+            size = len(self._items)
+            inflight = len(self._inflight)
+        for stats in prompts.values():
+            lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+            stats["hit_rate"] = (
+                round((stats["hits"] + stats["coalesced"]) / lookups, 3) if lookups else 0.0
+            )
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "inflight": inflight,
+            "prompts": prompts,
+        }
+
+
+# 프로세스 전역 LLM 메모
+llm_memo = LLMMemo(LLM_MEMO_MAX_ENTRIES, LLM_MEMO_TTL_SECONDS)
@@ -0,0 +1,246 @@
+# app/utils/mcp_client.py
+
+import time
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+import httpx
+from app.utils.sse import iter_sse_events
+from app.config.settings import (
+    MCP_BASE_URL,
+    MCP_TIMEOUT_SECONDS,
+    MCP_CONNECT_TIMEOUT_SECONDS,
+    MCP_MAX_CONNECTIONS,
+    MCP_MAX_KEEPALIVE_CONNECTIONS,
+    MCP_HTTP2,
+    MCP_BREAKER_FAILURE_THRESHOLD,
+    MCP_BREAKER_RESET_SECONDS,
+)
+
+try:
+    import h2  # noqa: F401  (httpx HTTP/2 지원에 필요)
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PATH = "/api/search/"
+SEARCH_STREAM_PATH = "/api/search/stream"
+
+
+class McpError(Exception):
+    """MCP 호출 실패 (상태 코드 오류, 잘못된 응답)"""
+
+
+class McpTimeout(McpError):
+    """호출 제한 시간 초과"""
+
+
+class McpUnavailable(McpError):
+    """연결 실패 또는 회로 차단 중"""
+
+
+class CircuitBreaker:
+    """
+    연속 실패 횟수 기반 회로 차단기
+
+    - closed: 정상 호출
+    - open: failure_threshold회 연속 실패 후 reset_timeout 동안 호출하지 않고 바로 실패
+    - half_open: reset_timeout이 지나면 시험 호출 1개만 허용 → 성공 시 closed, 실패 시 다시 open
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"rejected": 0, "opened": 0}
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """결과와 무관하게 끝난 호출 (취소 등) - 시험 호출 기회만 반납"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self._stats["opened"] += 1
+                    logger.warning(
+                        f"🚫 MCP 회로 차단 ({self.failures}회 연속 실패, {self.reset_timeout:.0f}초)"
+                    )
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures, **self._stats}
+
+
+class McpClient:
+    """
+    MCP 서버 공용 비동기 클라이언트
+
+    - httpx.AsyncClient 하나를 프로세스 전체에서 공유 (keep-alive, 커넥션 수 제한)
+    - 호출마다 전체 제한 시간(deadline) 적용
+    - 연속 실패 시 회로 차단기로 MCP 서버 복구 전까지 바로 실패 처리
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        connect_timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        http2: bool,
+        breaker: CircuitBreaker,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.breaker = breaker
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stats = {"requests": 0, "errors": 0, "timeouts": 0, "total_time": 0.0}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                ),
+                headers={"accept": "application/json"},
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def _call(self, deadline: Optional[float]):
+        """
+        회로 차단 확인, 제한 시간 적용, 성공/실패 기록 (예외는 McpError 계열로 변환)
+
+        deadline=None이면 전체 제한 시간을 걸지 않음 (스트리밍은 이벤트 사이에서 직접 확인)
+        """
+        if not self.breaker.allow():
+            raise McpUnavailable("MCP 회로 차단 중")
+
+        start = time.perf_counter()
+        self._stats["requests"] += 1
+        try:
+            async with asyncio.timeout(deadline):
+                yield self._get_client()
+        except (TimeoutError, httpx.TimeoutException) as e:
+            self._stats["timeouts"] += 1
+            self.breaker.record_failure()
+            raise McpTimeout(f"MCP 응답 제한 시간 초과 ({time.perf_counter() - start:.3f}초)") from e
+        except httpx.TransportError as e:
+            self._stats["errors"] += 1
+            self.breaker.record_failure()
+            raise McpUnavailable(f"MCP 서버 연결 오류: {str(e) or type(e).__name__}") from e
+        except McpError:
+            self._stats["errors"] += 1
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # 요청 취소, 스트림 중단 등은 MCP 서버 상태와 무관
+            self.breaker.release()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            self._stats["total_time"] += time.perf_counter() - start
+
+    async def search(self, query: str, deadline: Optional[float] = None) -> str:
+        """MCP 검색 → 답변 문자열 (실패 시 McpError 계열 예외)"""
+        async with self._call(deadline or self.timeout) as client:
+            response = await client.post(SEARCH_PATH, json={"query": query})
+            if response.status_code != 200:
+                raise McpError(f"상태 코드 {response.status_code}, 응답: {response.text[:200]}")
+            try:
+                return response.json().get("answer", "")
+            except ValueError as e:
+                raise McpError(f"잘못된 응답 형식: {str(e)}") from e
+
+    async def stream_search(
+        self, query: str, deadline: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        MCP 스트리밍 검색 → (event, data) SSE 이벤트
+
+        이벤트를 기다리는 동안은 읽기 제한 시간, 전체 스트림은 deadline을 이벤트 사이에서 확인
+        (호출한 쪽이 이벤트를 처리하는 중에 취소되지 않도록 asyncio.timeout을 걸지 않음)
+        """
+        expires = time.monotonic() + (deadline or self.timeout)
+        async with self._call(None) as client:
+            async with client.stream("POST", SEARCH_STREAM_PATH, json={"query": query}) as response:
+                if response.status_code != 200:
+                    raise McpError(f"상태 코드 {response.status_code}")
+                async for event, data in iter_sse_events(response.aiter_lines()):
+                    if event == "error":
+                        raise McpError(data.get("message", "MCP 스트리밍 오류"))
+                    yield event, data
+                    if time.monotonic() > expires:
+                        raise McpTimeout("MCP 스트리밍 제한 시간 초과")
+
+    def get_stats(self) -> Dict:
+        requests = self._stats["requests"]
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "requests": requests,
+            "errors": self._stats["errors"],
+            "timeouts": self._stats["timeouts"],
+            "avg_ms": round(self._stats["total_time"] / requests * 1000, 1) if requests else 0.0,
+            "max_connections": self.max_connections,
+            "breaker": self.breaker.get_stats(),
+        }
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# 프로세스 전역 MCP 클라이언트
+mcp_client = McpClient(
+    MCP_BASE_URL,
+    MCP_TIMEOUT_SECONDS,
+    MCP_CONNECT_TIMEOUT_SECONDS,
+    MCP_MAX_CONNECTIONS,
+    MCP_MAX_KEEPALIVE_CONNECTIONS,
+    MCP_HTTP2,
+    CircuitBreaker(MCP_BREAKER_FAILURE_THRESHOLD, MCP_BREAKER_RESET_SECONDS),
+)
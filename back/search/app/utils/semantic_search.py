@@ -1,18 +1,23 @@
-import os
-import re
-from dotenv import load_dotenv
-from app.utils.embedding import get_text_embedding
-from pinecone import Pinecone
-from openai import OpenAI
+from app.utils.vector_search import search_similar_items_sync
 from app.utils.chat_vector_store import search_chat_history
+from app.utils.llm_memo import llm_memo, memo_key
+from app.utils.llm_gateway import llm_gateway
 import json
 
-load_dotenv()
+CONTEXT_EXPANSION_MODEL = "gpt-4o-mini"
+# 프롬프트 버전 (프롬프트를 바꾸면 올려서 이전 메모 결과를 사용하지 않도록 함)
+CONTEXT_EXPANSION_PROMPT_VERSION = "context_expansion:v1"
 
-pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-index = pc.Index(os.getenv("PINECONE_INDEX_NAME"))
 
-openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY_2"))
+async def _request_llm_queries(prompt: str) -> list[str]:
+    """확장 쿼리 LLM 호출 (JSON 파싱 실패 시 예외 → 메모하지 않음)"""
+    content = await llm_gateway.chat(
+        model=CONTEXT_EXPANSION_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.7,
+        max_tokens=300,
+    )
+    return json.loads(content.strip())
 
 
 def determine_query_intent(query: str) -> str:
@@ -123,7 +128,7 @@ def determine_query_intent(query: str) -> str:
     return "photo_search"
 
 
-def enhance_query_with_personal_context_v2(user_id: str, query: str) -> list[str]:
+async def enhance_query_with_personal_context_v2(user_id: str, query: str) -> list[str]:
     """개선된 쿼리 확장 - 색상과 객체 분리 및 다양한 조합 생성"""
 
     # 1. 색상과 객체 분리 추출
@@ -275,15 +280,16 @@ def enhance_query_with_personal_context_v2(user_id: str, query: str) -> list[str
         JSON 리스트 형태로 반환해주세요.
         """
 
-    response = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=300,
-    )
-
     try:
-        llm_queries = json.loads(response.choices[0].message.content.strip())
+        # 같은 (정규화) 쿼리는 사용자와 관계없이 결과 재사용, 동시 요청은 호출 하나로 합침
+        key = memo_key(
+            f"{CONTEXT_EXPANSION_PROMPT_VERSION}:{'photo' if is_photo_search else 'info'}",
+            CONTEXT_EXPANSION_MODEL,
+            query,
+        )
+        llm_queries = await llm_memo.get_or_compute_async(
+            key, lambda: _request_llm_queries(prompt)
+        )
 
         # 중복 제거 및 결합
         all_queries = base_queries + llm_queries
@@ -327,77 +333,17 @@ def search_similar_items_enhanced(
 def search_similar_items_enhanced_optimized(
     user_id: str, queries: list[str], target: str, top_k: int = 5
 ) -> list[dict]:
-    """최적화된 벡터 검색 - 임베딩 재사용 및 배치 처리"""
+    """최적화된 벡터 검색 - 임베딩 재사용 및 배치 처리 (공유 쿼리 풀 사용)"""
     namespace = f"{user_id}_{target}"
 
     # 디버깅을 위한 로깅 추가
     print(f"🔍 검색 중: namespace={namespace}, queries={queries[:3]}, target={target}")
 
-    # 1. 쿼리 수 조정 (색상+객체 조합은 더 많은 쿼리 사용)
-    max_queries = 5 if len(queries) > 5 else len(queries)
-    all_texts = queries[:max_queries]
-
-    # 2. 배치 임베딩 생성
-    response = openai.embeddings.create(model="text-embedding-ada-002", input=all_texts)
-    vectors = [item.embedding for item in response.data]
-
-    # 3. 병렬 Pinecone 쿼리
-    all_results = {}
-    import concurrent.futures
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_queries) as executor:
-        futures = []
-        for i, vector in enumerate(vectors):
-            future = executor.submit(
-                index.query,
-                vector=vector,
-                namespace=namespace,
-                top_k=top_k * 2,  # 더 많은 후보 확보
-                include_metadata=True,
-            )
-            futures.append((i, future))
-
-        # 결과 수집 및 병합
-        for i, future in futures:
-            response = future.result()
-            print(f"✅ 쿼리 {i} 결과: {len(response['matches'])}개 매치")
-
-            for match in response["matches"]:
-                match_id = match["id"]
-                # 높은 점수로 업데이트
-                if (
-                    match_id not in all_results
-                    or match["score"] > all_results[match_id]["score"]
-                ):
-                    all_results[match_id] = match
-
-    print(f"📊 총 수집된 결과: {len(all_results)}개")
-
-    # 4. 결과 정렬 및 반환
-    sorted_matches = sorted(
-        all_results.values(), key=lambda x: x["score"], reverse=True
-    )[:top_k]
-
-    results = []
-    for match in sorted_matches:
-        full_text = match["metadata"].get("text", "")
-        if ": " in full_text:
-            image_id, description = full_text.split(": ", 1)
-        else:
-            image_id, description = "unknown", full_text
-
-        image_id = re.sub(r"\s*\([^)]*\)", "", image_id).strip()
-
-        results.append(
-            {
-                "score": round(match["score"], 3),
-                "id": image_id,
-                "text": description,
-            }
-        )
+    # 쿼리 수 조정 (색상+객체 조합은 더 많은 쿼리 사용), id 기준 최고 점수로 병합
+    result = search_similar_items_sync(user_id, queries, target, top_k, max_queries=5)
 
-    print(f"🎯 최종 반환 결과: {len(results)}개")
-    return results
+    print(f"🎯 최종 반환 결과: {len(result.matches)}개")
+    return result.to_dicts()
 
 
 def filter_relevant_items_with_context(
@@ -515,7 +461,7 @@ def filter_relevant_chat_history(query: str, history: list[dict]) -> list[dict]:
     return history[:3]  # 최근 3개만 반환
 
 
-def generate_answer_by_intent(
+async def generate_answer_by_intent(
     user_id: str,
     query: str,
     info_results: list[dict],
@@ -573,14 +519,14 @@ def generate_answer_by_intent(
 찾은 내용이 없다면 그렇게 알려주고, 있다면 간단히 요약해서 설명해주세요.
 """
 
-    response = openai.chat.completions.create(
+    content = await llm_gateway.chat(
         model="gpt-4o-mini",
         messages=[{"role": "user", "content": prompt}],
         max_tokens=300,
         temperature=0.5,
     )
 
-    answer = response.choices[0].message.content.strip()
+    answer = content.strip()
 
     return {
         "answer": answer,
@@ -0,0 +1,25 @@
+# app/utils/sse.py
+
+import json
+from typing import AsyncIterator, Dict, Tuple
+
+
+def sse_event(event: str, data: Dict) -> str:
+    """SSE 이벤트 한 개 (data는 JSON 한 줄)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def iter_sse_events(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[str, Dict]]:
+    """SSE 응답 줄 → (event, data) (event가 없으면 "message")"""
+    event, data_lines = "message", []
+    async for line in lines:
+        if not line:
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+    if data_lines:
+        yield event, json.loads("\n".join(data_lines))
@@ -2,8 +2,17 @@ import os
 from uuid import uuid4
 from dotenv import load_dotenv
 from pinecone import Pinecone
-from app.utils.embedding import get_text_embedding
+from app.utils.embedding import get_text_embedding, query_by_text
+from app.utils.vector_backend import create_vector_backend
+from app.config.settings import (
+    VECTOR_BACKEND,
+    LOCAL_VECTOR_DIR,
+    VECTOR_REPLICA_HYDRATE_AFTER,
+    VECTOR_REPLICA_TTL_SECONDS,
+)
+from app.utils.embedding_registry import embedding_metadata
 import time
+from typing import Dict, Optional
 
 # .env 파일 로드 (이미 있지만 확실히 하기 위해 유지)
 load_dotenv()
@@ -16,21 +25,37 @@ pinecone_index_name = os.getenv("PINECONE_INDEX_NAME")
 print(f"DEBUG: PINECONE_API_KEY 존재: {'있음' if pinecone_api_key else '없음'}")
 print(f"DEBUG: PINECONE_INDEX_NAME 존재: {'있음' if pinecone_index_name else '없음'}")
 
-# 환경 변수가 없는 경우 대비
-if not pinecone_api_key:
-    raise ValueError("Pinecone API 키가 환경 변수에 설정되어 있지 않습니다.")
-
-if not pinecone_index_name:
-    raise ValueError("Pinecone 인덱스 이름이 환경 변수에 설정되어 있지 않습니다.")
-
-# Pinecone 클라이언트 초기화
-pc = Pinecone(api_key=pinecone_api_key)
-index = pc.Index(pinecone_index_name)
-
-
-def save_text_to_pinecone(user_id: str, text: str, target: str) -> str:
+# 벡터 저장소 초기화 (local 모드는 Pinecone 없이 동작)
+if VECTOR_BACKEND == "local":
+    pinecone_index = None
+else:
+    # 환경 변수가 없는 경우 대비
+    if not pinecone_api_key:
+        raise ValueError("Pinecone API 키가 환경 변수에 설정되어 있지 않습니다.")
+
+    if not pinecone_index_name:
+        raise ValueError("Pinecone 인덱스 이름이 환경 변수에 설정되어 있지 않습니다.")
+
+    # Pinecone 클라이언트 초기화
+    pc = Pinecone(api_key=pinecone_api_key)
+    pinecone_index = pc.Index(pinecone_index_name)
+
+# pinecone: Pinecone만 사용 / local: 로컬 NumPy 저장소 / replica: Pinecone + 로컬 읽기 복제본
+index = create_vector_backend(
+    pinecone_index,
+    VECTOR_BACKEND,
+    LOCAL_VECTOR_DIR,
+    VECTOR_REPLICA_HYDRATE_AFTER,
+    VECTOR_REPLICA_TTL_SECONDS,
+)
+
+
+def save_text_to_pinecone(
+    user_id: str, text: str, target: str, metadata: Optional[Dict] = None
+) -> str:
     """
     user_id와 target (photo/text)에 따라 지정된 네임스페이스로 텍스트 저장
+    (metadata: 구조화 메타데이터, 없으면 text만 저장)
     """
     namespace = f"{user_id}_{target}"
     vector = get_text_embedding(text)
@@ -40,7 +65,10 @@ def save_text_to_pinecone(user_id: str, text: str, target: str) -> str:
             {
                 "id": str(uuid4()),
                 "values": vector,
-                "metadata": {"text": text},
+                "metadata": {
+                    **(metadata or {"text": text}),
+                    **embedding_metadata(),
+                },
             }
         ],
         namespace=namespace,
@@ -54,19 +82,13 @@ def search_chat_history_with_time_decay(
 ) -> list[dict]:
     """시간 가중치가 적용된 대화 기록 검색"""
     namespace = f"{user_id}_chat"
-    vector = get_text_embedding(query)
-
-    response = index.query(
-        vector=vector,
-        namespace=namespace,
-        top_k=top_k * 2,  # 더 많이 가져와서 시간 가중치 적용
-        include_metadata=True,
-    )
+    # 더 많이 가져와서 시간 가중치 적용
+    matches = query_by_text(index, namespace, query, top_k * 2)
 
     current_time = int(time.time())
 
     results = []
-    for match in response["matches"]:
+    for match in matches:
         timestamp = match["metadata"].get("timestamp", 0)
         time_diff = current_time - timestamp
 
@@ -0,0 +1,129 @@
+"""
+임베딩 배치 처리 마이크로 벤치마크 (단건 호출 vs EmbeddingBatcher)
+
+로컬에 가짜 embeddings 서버(/v1/embeddings)를 띄우고, 같은 수의 동시 호출자로
+1) 요청마다 input=[text] 단건 호출
+2) EmbeddingBatcher로 요청을 모아 호출
+각각의 초당 처리량(req/s)과 서버가 받은 HTTP 요청 수를 출력합니다.
+가짜 서버는 "기본 지연 + 텍스트당 지연"을 흉내 내며 OpenAI API는 호출하지 않습니다.
+
+실행 (back/search 디렉터리에서):
+    python -m benchmarks.embedding_batch_benchmark --requests 2000 --concurrency 64
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from openai import OpenAI
+from app.utils.embedding_batcher import EmbeddingBatcher
+
+EMBEDDING_DIM = 1536
+
+
+class FakeEmbeddingsHandler(BaseHTTPRequestHandler):
+    """OpenAI embeddings 응답 형식을 흉내 내는 핸들러"""
+
+    base_latency = 0.03
+    per_item_latency = 0.0002
+    request_count = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+
+        with FakeEmbeddingsHandler.lock:
+            FakeEmbeddingsHandler.request_count += 1
+        time.sleep(self.base_latency + self.per_item_latency * len(texts))
+
+        body = json.dumps(
+            {
+                "object": "list",
+                "data": [
+                    {
+                        "object": "embedding",
+                        "index": i,
+                        "embedding": [float(len(text) % 7)] * EMBEDDING_DIM,
+                    }
+                    for i, text in enumerate(texts)
+                ],
+                "model": payload["model"],
+                "usage": {"prompt_tokens": len(texts), "total_tokens": len(texts)},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeEmbeddingsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(label: str, embed, texts: list[str], concurrency: int):
+    """동시 호출자 concurrency명으로 texts 전체를 임베딩하고 처리량 출력"""
+    FakeEmbeddingsHandler.request_count = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(embed, texts))
+    elapsed = time.perf_counter() - start
+    print(
+        f"⏱️ {label}: {len(texts) / elapsed:.1f} req/s "
+        f"({elapsed:.2f}초, HTTP 요청 {FakeEmbeddingsHandler.request_count}회)"
+    )
+    return len(texts) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 배치 처리 벤치마크")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--max-concurrent-batches", type=int, default=4)
+    parser.add_argument("--base-latency-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    FakeEmbeddingsHandler.base_latency = args.base_latency_ms / 1000
+    server = start_fake_server()
+    client = OpenAI(
+        api_key="fake",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        max_retries=0,
+    )
+    model = "text-embedding-3-small"
+    texts = [f"벤치마크 문장 {i}" for i in range(args.requests)]
+
+    def single(text):
+        return client.embeddings.create(model=model, input=[text]).data[0].embedding
+
+    batcher = EmbeddingBatcher(
+        client,
+        model=model,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_concurrent_batches=args.max_concurrent_batches,
+    )
+
+    try:
+        before = run("단건 호출", single, texts, args.concurrency)
+        after = run("배치 호출", batcher.embed, texts, args.concurrency)
+        print(f"📊 처리량 개선: {after / before:.1f}배, 배치 통계: {batcher.get_stats()}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
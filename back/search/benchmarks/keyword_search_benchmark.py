@@ -0,0 +1,247 @@
+"""
+키워드 사진 검색 벤치마크 (기존 unnest+ILIKE 쿼리 vs trigram/GIN 인덱스 쿼리)
+
+별도 스키마(keyword_bench)에 image_keywords 100만 행을 시딩한 뒤
+1) 기존 인덱스(idx_keyword) + 기존 쿼리
+2) 마이그레이션 인덱스 + 신규 쿼리
+각각의 p50/p99 지연 시간을 출력합니다. 운영 테이블은 건드리지 않습니다.
+
+실행 (back/search 디렉터리에서):
+    BENCH_DATABASE_URL=postgresql://user:pw@localhost:5434/rag \
+        python -m benchmarks.keyword_search_benchmark --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+import asyncpg
+from app.utils.db_utils import PHOTO_SEARCH_QUERY, build_like_patterns
+
+BENCH_SCHEMA = "keyword_bench"
+MIGRATION_PATH = (
+    Path(__file__).resolve().parents[2]
+    / "rag"
+    / "db"
+    / "migrations"
+    / "001_keyword_search_indexes.sql"
+)
+
+# 기존 검색 쿼리 (비교 기준)
+LEGACY_PHOTO_SEARCH_QUERY = """
+WITH keyword_matches AS (
+    SELECT
+        i.access_id,
+        i.image_time,
+        i.caption,
+        ik.keyword,
+        CASE
+            WHEN ik.keyword = ANY($1::text[]) THEN 1.0
+            ELSE 0.5
+        END as match_score
+    FROM images i
+    JOIN image_keywords ik
+        ON i.access_id = ik.image_id AND i.user_id = ik.user_id
+    WHERE i.user_id = $2
+    AND (
+        ik.keyword = ANY($1::text[])
+        OR EXISTS (
+            SELECT 1 FROM unnest($1::text[]) AS search_kw
+            WHERE ik.keyword ILIKE '%' || search_kw || '%'
+        )
+    )
+),
+aggregated AS (
+    SELECT
+        access_id,
+        image_time,
+        caption,
+        COUNT(DISTINCT keyword) as keyword_count,
+        SUM(match_score) as total_score,
+        STRING_AGG(DISTINCT keyword, ', ') as matched_keywords
+    FROM keyword_matches
+    GROUP BY access_id, image_time, caption
+)
+SELECT access_id, caption, keyword_count, total_score, matched_keywords, image_time
+FROM aggregated
+ORDER BY total_score DESC, keyword_count DESC, image_time DESC
+LIMIT $3;
+"""
+
+SCHEMA_DDL = """
+CREATE TABLE images (
+    id SERIAL PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    access_id TEXT NOT NULL,
+    caption TEXT,
+    image_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, access_id)
+);
+
+CREATE TABLE image_keywords (
+    id SERIAL PRIMARY KEY,
+    image_id TEXT,
+    user_id TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id, image_id) REFERENCES images(user_id, access_id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_keyword ON image_keywords(keyword);
+"""
+
+# 시딩용 어휘 (실제 캡션 키워드와 비슷한 분포)
+BASE_WORDS = [
+    "커피", "카페", "스타벅스", "기프티콘", "교환권", "선물", "노트북", "회의",
+    "영수증", "와이파이", "비밀번호", "에어컨", "헬로키티", "인형", "장난감",
+    "케이크", "생일", "바다", "해변", "산", "등산", "강아지", "고양이", "자동차",
+    "번호판", "음식", "순두부찌개", "김치찌개", "라면", "치킨", "피자", "꽃",
+    "꽃다발", "하늘", "노을", "야경", "지하철", "버스", "공항", "호텔", "여행",
+    "서울특별시", "부산광역시", "강서구", "송정동", "해운대구", "오전", "오후", "저녁",
+]
+
+
+def build_vocabulary(size: int) -> list[str]:
+    """기본 어휘 + 합성 키워드로 어휘 생성"""
+    vocabulary = list(BASE_WORDS)
+    suffixes = ["사진", "풍경", "메뉴", "간판", "화면", "스크린샷", "기록", "티켓"]
+    while len(vocabulary) < size:
+        word = random.choice(BASE_WORDS)
+        vocabulary.append(f"{word}{random.choice(suffixes)}{len(vocabulary)}")
+    return vocabulary
+
+
+async def seed(connection, rows: int, users: int, keywords_per_image: int):
+    """벤치마크 스키마 생성 및 데이터 시딩"""
+    await connection.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+    await connection.execute(f"CREATE SCHEMA {BENCH_SCHEMA};")
+    await connection.execute(SCHEMA_DDL)
+
+    vocabulary = build_vocabulary(5000)
+    image_count = rows // keywords_per_image
+    base_time = datetime(2025, 1, 1)
+
+    images = []
+    for n in range(image_count):
+        user_id = f"user{n % users}"
+        image_time = base_time + timedelta(minutes=n)
+        images.append((user_id, str(100000 + n), "벤치마크 캡션", image_time))
+    await connection.copy_records_to_table(
+        "images",
+        records=images,
+        columns=["user_id", "access_id", "caption", "image_time"],
+        schema_name=BENCH_SCHEMA,
+    )
+
+    keyword_rows = []
+    for user_id, access_id, _, image_time in images:
+        for keyword in random.sample(vocabulary, keywords_per_image):
+            keyword_rows.append((user_id, access_id, keyword, image_time))
+    await connection.copy_records_to_table(
+        "image_keywords",
+        records=keyword_rows,
+        columns=["user_id", "image_id", "keyword", "created_at"],
+        schema_name=BENCH_SCHEMA,
+    )
+    await connection.execute("ANALYZE images; ANALYZE image_keywords;")
+    print(
+        f"🌱 시딩 완료: 이미지 {len(images)}개, 키워드 {len(keyword_rows)}행, 사용자 {users}명"
+    )
+
+
+async def apply_migration(connection):
+    """마이그레이션 SQL을 문장 단위로 실행 (CONCURRENTLY는 트랜잭션 밖에서만 가능)"""
+    lines = [
+        line
+        for line in MIGRATION_PATH.read_text(encoding="utf-8").splitlines()
+        if not line.strip().startswith("--")
+    ]
+    for statement in "\n".join(lines).split(";"):
+        if statement.strip():
+            await connection.execute(statement)
+
+
+async def measure(connection, label: str, run_query, users: int, iterations: int):
+    """랜덤 사용자/키워드 조합으로 쿼리를 반복 실행하고 p50/p99 출력"""
+    latencies = []
+    for _ in range(iterations):
+        user_id = f"user{random.randrange(users)}"
+        keywords = random.sample(BASE_WORDS, random.randint(3, 8))
+        start = time.perf_counter()
+        await run_query(user_id, keywords)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    p50 = latencies[int(len(latencies) * 0.50)]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"⏱️ {label}: p50 {p50:.2f}ms, p99 {p99:.2f}ms, 평균 {statistics.mean(latencies):.2f}ms ({iterations}회)"
+    )
+    return p50, p99
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="키워드 사진 검색 벤치마크")
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--keywords-per-image", type=int, default=40)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--limit", type=int, default=30)
+    parser.add_argument("--keep", action="store_true", help="벤치마크 스키마 유지")
+    args = parser.parse_args()
+
+    if not args.dsn:
+        raise SystemExit("BENCH_DATABASE_URL 또는 --dsn 이 필요합니다.")
+
+    random.seed(42)
+    connection = await asyncpg.connect(args.dsn)
+    try:
+        # 확장은 public 스키마에 설치해 벤치마크 스키마 삭제와 분리
+        await connection.execute(
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public;"
+        )
+        await connection.execute(f"SET search_path TO {BENCH_SCHEMA}, public;")
+        await seed(connection, args.rows, args.users, args.keywords_per_image)
+
+        async def legacy_query(user_id, keywords):
+            await connection.fetch(
+                LEGACY_PHOTO_SEARCH_QUERY, keywords, user_id, args.limit
+            )
+
+        async def indexed_query(user_id, keywords):
+            await connection.fetch(
+                PHOTO_SEARCH_QUERY,
+                keywords,
+                user_id,
+                build_like_patterns(keywords),
+                args.limit,
+            )
+
+        before = await measure(
+            connection, "기존 (unnest+ILIKE)", legacy_query, args.users, args.iterations
+        )
+
+        migration_start = time.perf_counter()
+        await apply_migration(connection)
+        print(f"🛠️ 마이그레이션 적용: {time.perf_counter() - migration_start:.1f}초")
+
+        after = await measure(
+            connection, "신규 (trigram/GIN)", indexed_query, args.users, args.iterations
+        )
+
+        print(
+            f"📊 개선 비율: p50 {before[0] / after[0]:.1f}배, p99 {before[1] / after[1]:.1f}배"
+        )
+    finally:
+        if not args.keep:
+            await connection.execute(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;")
+        await connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())